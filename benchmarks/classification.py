@@ -0,0 +1,129 @@
+"""
+Benchmark ABC/XYZ classification of a large catalog.
+
+Builds a temporary database with the given number of products and sale
+movements, then times each stage of utils.analytics.classification: the
+chunked columnar reads, the bulk classification and the executemany
+write-back (first run, where every class is new, and a repeat run, where
+nothing changes). A per-product Python implementation is timed on a sample
+and extrapolated for comparison.
+
+Usage:
+    python -m benchmarks.classification [--products 1000000] [--movements 3000000] [--weeks 52]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from database.models import ClassificationRun, Product, StockMovement
+from utils.analytics.classification import (ABC_CLASSES, ABC_LIMITS, XYZ_LIMITS, classify,
+                                            run_classification, write_classes)
+from utils.analytics.loading import load_sales, read_columns
+
+
+def build_database(path, products, movements, weeks, seed=0):
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    for model in (Product, StockMovement, ClassificationRun):
+        conn.execute(model.create_table_query())
+    for query in StockMovement.create_index_queries():
+        conn.execute(query)
+
+    prices = rng.integers(50, 50_000, size=products)
+    stock = rng.integers(0, 500, size=products)
+    conn.executemany(
+        "INSERT INTO products (product_id, name, category, price, stock_quantity) VALUES (?, ?, 'Bench', ?, ?)",
+        ((product_id, f"Product {product_id}", int(price), int(quantity))
+         for product_id, price, quantity in zip(range(1, products + 1), prices, stock))
+    )
+
+    # Skewed popularity, so the value curve has a real A/B/C shape
+    product_ids = np.minimum(rng.zipf(1.3, size=movements), products)
+    product_ids = rng.permutation(products)[product_ids - 1] + 1
+    start = datetime.utcnow() - timedelta(weeks=weeks)
+    seconds = np.sort(rng.integers(0, weeks * 7 * 86400, size=movements))
+    quantities = rng.integers(1, 5, size=movements)
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, movement_type, quantity, created_at) VALUES (?, 'sale', ?, ?)",
+        ((int(product_id), -int(quantity), (start + timedelta(seconds=int(offset))).strftime("%Y-%m-%d %H:%M:%S"))
+         for product_id, quantity, offset in zip(product_ids, quantities, seconds))
+    )
+    conn.commit()
+    return conn
+
+
+def classify_row_by_row(rows, weekly_sales):
+    """The same classes computed one product at a time in plain Python"""
+    values = []
+    for (product_id, price, _), weeks in zip(rows, weekly_sales):
+        values.append((sum(weeks) * price, product_id))
+    total = sum(value for value, _ in values)
+    classes = {}
+    running = 0.0
+    for value, product_id in sorted(values, reverse=True):
+        share_before = running / total if total else 1.0
+        running += value
+        if value <= 0:
+            classes[product_id] = "C"
+        else:
+            classes[product_id] = ABC_CLASSES[sum(share_before >= limit for limit in ABC_LIMITS)]
+    for (product_id, _, _), weeks in zip(rows, weekly_sales):
+        mean = sum(weeks) / len(weeks)
+        std = (sum((units - mean) ** 2 for units in weeks) / len(weeks)) ** 0.5
+        variation = std / mean if mean else float("inf")
+        classes[product_id] += "XYZ"[sum(variation > limit for limit in XYZ_LIMITS)]
+    return classes
+
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f"{label:<28}{time.perf_counter() - start:>10.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized ABC/XYZ classification")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--movements", type=int, default=3_000_000)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--sample", type=int, default=20_000, help="products in the row-by-row comparison")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        print(f"Building {args.products:,} products, {args.movements:,} sale movements...")
+        conn = build_database(path, args.products, args.movements, args.weeks)
+
+        columns = timed("read product columns", read_columns, conn,
+                        "SELECT product_id, price, stock_quantity FROM products ORDER BY product_id", (), 3)
+        product_ids = columns[:, 0].copy()
+        weekly = timed("load weekly sales", load_sales, conn, product_ids, args.weeks, 7)
+        result = timed("classify", classify, product_ids, columns[:, 1], columns[:, 2], weekly)
+        unclassified = np.zeros(len(product_ids), dtype=np.int64)
+        with conn:
+            changed = timed("write classes (all new)", write_classes, conn, result, unclassified, unclassified)
+        print(f"{'':<28}{changed:>10,} rows")
+        timed("full run (no changes)", run_classification, conn, args.weeks)
+
+        sample = min(args.sample, args.products)
+        rows = columns[:sample].tolist()
+        sample_weeks = weekly[:sample].tolist()
+        start = time.perf_counter()
+        classify_row_by_row(rows, sample_weeks)
+        looped = (time.perf_counter() - start) * args.products / sample
+        print(f"{'row-by-row classify (est.)':<28}{looped:>10.3f} s")
+
+        print("Stock value by class: " + ", ".join(
+            f"{letter} {value / 100:,.0f}" for letter, value in result.value_by_class().items()
+        ))
+        print("Class matrix: " + ", ".join(f"{key} {count:,}" for key, count in result.matrix().items()))
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
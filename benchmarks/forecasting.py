@@ -0,0 +1,120 @@
+"""
+Benchmark catalog-wide demand forecasting.
+
+Times utils.analytics.forecasting.plan_reorders on a synthetic sales array
+against a per-product Python loop computing the same figures on a sample
+(extrapolated to the full catalog), and times loading sales from a SQLite
+ledger with the given number of sale movements.
+
+Usage:
+    python -m benchmarks.forecasting [--products 100000] [--days 365] [--movements 1000000]
+"""
+import argparse
+import math
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from statistics import NormalDist
+import numpy as np
+from database.models import Product, StockMovement
+from utils.analytics.forecasting import load_catalog, load_daily_sales, plan_reorders
+
+
+def synthetic_sales(products, days, seed=0):
+    """Poisson daily demand with a gamma-distributed rate per product"""
+    rng = np.random.default_rng(seed)
+    rates = rng.gamma(1.0, 2.0, size=(products, 1))
+    sales = rng.poisson(rates, size=(products, days)).astype(np.float32)
+    stock = rng.integers(0, 100, size=products)
+    return np.arange(1, products + 1), stock, sales
+
+
+def plan_one_product(stock, sales, lead_time_days=7, review_days=7, service_level=0.95,
+                     window=28, alpha=0.3):
+    """plan_reorders for a single product, written as plain Python"""
+    z = NormalDist().inv_cdf(service_level)
+    recent = sales[-window:]
+    recent_average = sum(recent) / len(recent)
+    level = sales[0]
+    for units in sales[1:]:
+        level = alpha * units + (1 - alpha) * level
+    mean = sum(sales) / len(sales)
+    std = math.sqrt(sum((units - mean) ** 2 for units in sales) / (len(sales) - 1))
+    safety_stock = math.ceil(z * std * math.sqrt(lead_time_days))
+    reorder_level = math.ceil(level * lead_time_days) + safety_stock
+    order_up_to = math.ceil(level * (lead_time_days + review_days)) + safety_stock
+    suggested = max(order_up_to - stock, 0) if stock <= reorder_level and order_up_to > 0 else 0
+    return recent_average, level, std, safety_stock, reorder_level, suggested
+
+
+def build_ledger(products, days, movements, seed=0):
+    """In-memory database with ``movements`` sale movements spread over ``days``"""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.execute(Product.create_table_query())
+    conn.execute(StockMovement.create_table_query())
+    for query in StockMovement.create_index_queries():
+        conn.execute(query)
+    conn.executemany(
+        "INSERT INTO products (product_id, name, category, price, stock_quantity) VALUES (?, ?, 'Bench', 100, ?)",
+        ((product_id, f"Product {product_id}", product_id % 100) for product_id in range(1, products + 1))
+    )
+
+    start = datetime.utcnow() - timedelta(days=days - 1)
+    product_ids = rng.integers(1, products + 1, size=movements)
+    # The ledger is appended as sales happen, so rows are in time order
+    seconds = np.sort(rng.integers(0, (days - 1) * 86400, size=movements))
+    quantities = rng.integers(1, 5, size=movements)
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, movement_type, quantity, created_at) VALUES (?, 'sale', ?, ?)",
+        (
+            (int(product_id), -int(quantity), (start + timedelta(seconds=int(offset))).strftime("%Y-%m-%d %H:%M:%S"))
+            for product_id, quantity, offset in zip(product_ids, quantities, seconds)
+        )
+    )
+    conn.commit()
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized demand forecasting")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sample", type=int, default=2_000, help="products timed in the Python loop")
+    parser.add_argument("--movements", type=int, default=1_000_000,
+                        help="sale movements in the ledger load test (0 to skip)")
+    args = parser.parse_args()
+
+    product_ids, stock, sales = synthetic_sales(args.products, args.days)
+    print(f"{args.products:,} products x {args.days} days "
+          f"({sales.nbytes / 1e6:.0f} MB of float32 sales)")
+
+    start = time.perf_counter()
+    plan = plan_reorders(product_ids, stock, sales)
+    vectorized = time.perf_counter() - start
+    print(f"{'vectorized plan':<24}{vectorized:>10.3f} s")
+
+    sample = min(args.sample, args.products)
+    rows = sales[:sample].tolist()
+    start = time.perf_counter()
+    reference = [plan_one_product(int(stock[i]), rows[i]) for i in range(sample)]
+    looped = (time.perf_counter() - start) * args.products / sample
+    print(f"{'python loop (est.)':<24}{looped:>10.3f} s   ({looped / vectorized:,.0f}x slower)")
+
+    mismatches = sum(
+        1 for i, row in enumerate(reference)
+        if row[5] != plan.suggested_quantity[i] or abs(row[1] - plan.forecast[i]) > 1e-3
+    )
+    print(f"{'sample mismatches':<24}{mismatches:>10}")
+
+    if args.movements:
+        conn = build_ledger(args.products, args.days, args.movements)
+        start = time.perf_counter()
+        loaded_ids, _ = load_catalog(conn)
+        loaded = load_daily_sales(conn, loaded_ids, args.days)
+        print(f"{'load from ledger':<24}{time.perf_counter() - start:>10.3f} s   "
+              f"({args.movements:,} movements, {int(loaded.sum()):,} units)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark the scanner's QR decoder backends.
+
+Generates a corpus of QR codes carrying product payloads, applies rotation,
+blur, noise and scale distortions, and reports throughput and detection rate
+for each backend.
+
+Usage:
+    python -m benchmarks.qr_decoders [--samples 20] [--repeat 3] [--backends pyzbar opencv]
+"""
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+import qrcode
+from utils.qr_code.decoders import DECODERS, create_decoder
+
+FRAME_SIZE = (640, 360)  # Matches the scanner's capture resolution
+
+
+def make_payload(index):
+    return json.dumps({
+        "product_id": index,
+        "name": f"Benchmark Product {index}",
+        "category": "Benchmark",
+        "price": f"{index % 100}.99",
+        "description": None
+    })
+
+
+def render_qr(payload, module_size=4):
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=module_size,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    image = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    return np.array(image)
+
+
+def place_on_frame(symbol):
+    """Center a symbol on a grey frame the size of a camera capture"""
+    width, height = FRAME_SIZE
+    frame = np.full((height, width, 3), 200, dtype=np.uint8)
+    symbol_height, symbol_width = symbol.shape[:2]
+    if symbol_height > height or symbol_width > width:
+        scale = min(height / symbol_height, width / symbol_width) * 0.95
+        symbol = cv2.resize(symbol, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        symbol_height, symbol_width = symbol.shape[:2]
+    top = (height - symbol_height) // 2
+    left = (width - symbol_width) // 2
+    frame[top:top + symbol_height, left:left + symbol_width] = symbol
+    return frame
+
+
+def rotate(frame, angle):
+    height, width = frame.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(frame, matrix, (width, height), borderValue=(200, 200, 200))
+
+
+def blur(frame, kernel):
+    return cv2.GaussianBlur(frame, (kernel, kernel), 0)
+
+
+def add_noise(frame, sigma, rng):
+    noise = rng.normal(0, sigma, frame.shape)
+    return np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def rescale(symbol, factor):
+    return cv2.resize(symbol, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+
+def build_corpus(samples, seed=0):
+    """
+    Build the distorted image corpus.
+
+    Returns:
+        list: (distortion, expected_payload, frame) tuples
+    """
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for index in range(samples):
+        payload = make_payload(index)
+        symbol = render_qr(payload)
+        clean = place_on_frame(symbol)
+        corpus.append(("clean", payload, clean))
+        corpus.append(("rotate", payload, rotate(clean, rng.uniform(-45, 45))))
+        corpus.append(("blur", payload, blur(clean, int(rng.choice([3, 5, 7])))))
+        corpus.append(("noise", payload, add_noise(clean, rng.uniform(10, 40), rng)))
+        corpus.append(("scale", payload, place_on_frame(rescale(symbol, rng.uniform(0.4, 0.8)))))
+    return corpus
+
+
+def run_backend(name, corpus, repeat):
+    decoder = create_decoder(name)
+    hits = {}
+    totals = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for distortion, payload, frame in corpus:
+            decoded = decoder.decode(frame)
+            totals[distortion] = totals.get(distortion, 0) + 1
+            if any(symbol.data == payload for symbol in decoded):
+                hits[distortion] = hits.get(distortion, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    frames = len(corpus) * repeat
+    return {
+        "backend": name,
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "ms_per_frame": elapsed / frames * 1000,
+        "detection_rate": sum(hits.values()) / frames,
+        "by_distortion": {
+            distortion: hits.get(distortion, 0) / count
+            for distortion, count in totals.items()
+        },
+    }
+
+
+def print_report(results):
+    distortions = list(results[0]["by_distortion"]) if results else []
+    header = f"{'backend':<14}{'fps':>9}{'ms/frame':>10}{'detected':>10}"
+    header += "".join(f"{name:>9}" for name in distortions)
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        row = (
+            f"{result['backend']:<14}{result['fps']:>9.1f}"
+            f"{result['ms_per_frame']:>10.2f}{result['detection_rate'] * 100:>9.1f}%"
+        )
+        row += "".join(f"{result['by_distortion'][name] * 100:>8.1f}%" for name in distortions)
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QR decoder backends")
+    parser.add_argument("--samples", type=int, default=20, help="distinct QR payloads in the corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus per backend")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", nargs="+", default=list(DECODERS), choices=list(DECODERS))
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.samples, args.seed)
+    print(f"Corpus: {len(corpus)} frames ({args.samples} payloads x 5 variants), "
+          f"{args.repeat} passes per backend\n")
+
+    results = []
+    for name in args.backends:
+        try:
+            results.append(run_backend(name, corpus, args.repeat))
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
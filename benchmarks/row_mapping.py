@@ -0,0 +1,111 @@
+"""
+Benchmark the cost of turning SQLite product rows into Python objects.
+
+Loads the same rows through sqlite3.Row, plain tuples, dicts, a regular
+dataclass and the slotted Product model built by database.row_mapping, and
+reports load time and peak Python memory for each.
+
+Usage:
+    python -m benchmarks.row_mapping [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import dataclasses
+import sqlite3
+import time
+import tracemalloc
+from database.models import Product
+from database.row_mapping import build_row_factory
+
+COLUMNS = tuple(field.name for field in dataclasses.fields(Product))
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM products"
+
+# Same fields as Product, without slots, for comparison
+PlainProduct = dataclasses.make_dataclass(
+    "PlainProduct", [field.name for field in dataclasses.fields(Product)]
+)
+
+
+def build_database(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(Product.create_table_query())
+    conn.executemany(
+        "INSERT INTO products (name, description, category, price, stock_quantity) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"Product {index}", None, f"Category {index % 50}", 100 + index % 10000, index % 500)
+            for index in range(rows)
+        )
+    )
+    conn.commit()
+    return conn
+
+
+def load_rows(conn):
+    conn.row_factory = sqlite3.Row
+    return conn.execute(SELECT_SQL).fetchall()
+
+
+def load_tuples(conn):
+    conn.row_factory = None
+    return conn.execute(SELECT_SQL).fetchall()
+
+
+def load_dicts(conn):
+    conn.row_factory = None
+    return [dict(zip(COLUMNS, row)) for row in conn.execute(SELECT_SQL)]
+
+
+def load_plain_dataclasses(conn):
+    conn.row_factory = None
+    return [PlainProduct(*row) for row in conn.execute(SELECT_SQL)]
+
+
+def load_slotted_models(conn):
+    conn.row_factory = None
+    cursor = conn.execute(SELECT_SQL)
+    cursor.row_factory = build_row_factory(Product, COLUMNS)
+    return cursor.fetchall()
+
+
+STRATEGIES = {
+    "sqlite3.Row": load_rows,
+    "tuple": load_tuples,
+    "dict": load_dicts,
+    "dataclass": load_plain_dataclasses,
+    "slotted model": load_slotted_models,
+}
+
+
+def measure(loader, conn, repeat):
+    """Best wall time over ``repeat`` runs, then peak traced memory of one run"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = loader(conn)
+        best = min(best, time.perf_counter() - start)
+        del rows
+
+    tracemalloc.start()
+    rows = loader(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite row mapping strategies")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per strategy")
+    args = parser.parse_args()
+
+    conn = build_database(args.rows)
+    print(f"{'strategy':<16}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}{'bytes/row':>11}")
+    print("-" * 61)
+    for name, loader in STRATEGIES.items():
+        seconds, peak, count = measure(loader, conn, args.repeat)
+        print(f"{name:<16}{seconds:>10.3f}{count / seconds:>14,.0f}"
+              f"{peak / 1e6:>10.1f}{peak / count:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
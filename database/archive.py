@@ -0,0 +1,143 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from .events import DELETE, change_bus
+from .models import ORDER_TRANSITIONS, Order, OrderItem, OrderStatusChange
+
+ARCHIVE_SCHEMA = "archive"
+
+# Only orders that can no longer change are moved out of the hot database
+FINAL_STATUSES = tuple(status for status, targets in ORDER_TRANSITIONS.items() if not targets)
+
+
+def default_archive_path(db_path: str) -> str:
+    """``<stem>_archive.db`` in the main database's directory"""
+    path = Path(db_path)
+    return str(path.with_name(f"{path.stem}_archive.db"))
+
+
+def is_attached(conn: sqlite3.Connection) -> bool:
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list"))
+
+
+def archived_before(conn: sqlite3.Connection) -> Optional[str]:
+    """
+    Cutoff of the most recent archive run: every finished order placed
+    before it may be in the archive. None if nothing was ever archived.
+    """
+    if not is_attached(conn):
+        return None
+    row = conn.execute(f"SELECT MAX(archived_before) FROM {ARCHIVE_SCHEMA}.archive_runs").fetchone()
+    return row[0]
+
+
+class OrderArchive:
+    """
+    Cold storage for finished orders in a separate SQLite file.
+
+    The file is attached to the main connection as ``archive`` and holds
+    the same orders, order_items and order_status_history tables. Old
+    orders are moved in small batches, each its own short transaction, so
+    the hot database stays small without long write locks.
+    """
+
+    def __init__(self, archive_path: str, batch_size: int = 500):
+        self.archive_path = archive_path
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+    def attach(self, conn: sqlite3.Connection):
+        if is_attached(conn):
+            return
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (self.archive_path,))
+
+        # Same definitions as the hot tables, created in the archive schema
+        with conn:
+            for model in (Order, OrderItem, OrderStatusChange):
+                conn.execute(model.create_table_query().replace(
+                    "CREATE TABLE IF NOT EXISTS ", f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}."
+                ))
+                for query in model.create_index_queries():
+                    conn.execute(query.replace(
+                        "CREATE INDEX IF NOT EXISTS ", f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}."
+                    ))
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.archive_runs (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    archived_before TIMESTAMP NOT NULL,
+                    orders_moved INTEGER NOT NULL,
+                    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def archive_orders(self, conn: sqlite3.Connection, older_than_days: int) -> int:
+        """
+        Move finished orders placed more than ``older_than_days`` ago, with
+        their line items and status history, into the archive.
+
+        Returns:
+            int: number of orders moved
+        """
+        self.attach(conn)
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+        status_list = ", ".join("?" * len(FINAL_STATUSES))
+
+        moved = 0
+        run_id = None
+        while True:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (order_id INTEGER PRIMARY KEY)")
+                cursor.execute("DELETE FROM archive_batch")
+                cursor.execute(f"""
+                    INSERT INTO archive_batch (order_id)
+                    SELECT order_id FROM main.orders
+                    WHERE order_date < ? AND status IN ({status_list})
+                    ORDER BY order_date
+                    LIMIT ?
+                """, (cutoff, *FINAL_STATUSES, self.batch_size))
+                batch = cursor.rowcount
+                if batch == 0:
+                    break
+
+                # Copy first, then delete, all within this batch's transaction
+                for table in ("orders", "order_items", "order_status_history"):
+                    cursor.execute(f"PRAGMA main.table_info({table})")
+                    columns = ", ".join(row[1] for row in cursor.fetchall())
+                    cursor.execute(f"""
+                        INSERT INTO {ARCHIVE_SCHEMA}.{table} ({columns})
+                        SELECT {columns} FROM main.{table}
+                        WHERE order_id IN (SELECT order_id FROM archive_batch)
+                    """)
+                for table in ("order_status_history", "order_items", "orders"):
+                    cursor.execute(f"""
+                        DELETE FROM main.{table}
+                        WHERE order_id IN (SELECT order_id FROM archive_batch)
+                    """)
+                cursor.execute("SELECT order_id FROM archive_batch")
+                order_ids = [row[0] for row in cursor.fetchall()]
+
+                # The cutoff is recorded with the first batch, so readers look in the
+                # archive for every order moved even if a later batch fails
+                if run_id is None:
+                    cursor.execute(f"""
+                        INSERT INTO {ARCHIVE_SCHEMA}.archive_runs (archived_before, orders_moved)
+                        VALUES (?, ?)
+                    """, (cutoff, batch))
+                    run_id = cursor.lastrowid
+                else:
+                    cursor.execute(f"""
+                        UPDATE {ARCHIVE_SCHEMA}.archive_runs
+                        SET orders_moved = orders_moved + ?, finished_at = CURRENT_TIMESTAMP
+                        WHERE run_id = ?
+                    """, (batch, run_id))
+
+            moved += batch
+            for order_id in order_ids:
+                change_bus.publish("order", order_id, DELETE)
+
+        if moved:
+            self.logger.info(f"Archived {moved} orders placed before {cutoff}")
+        return moved
@@ -0,0 +1,260 @@
+"""
+Online backups through the SQLite backup API.
+
+A backup copies the live database a few pages at a time, pausing between
+steps, so the read lock is only held for a moment and writers are rarely
+held up. If another connection writes while a backup is running, SQLite
+restarts the copy from the beginning; after ``max_restarts`` restarts the
+whole database is copied in one step instead. That holds the read lock,
+and so delays writers, for the length of a full copy, but it cannot be
+restarted, so a busy database is still backed up. Every copy is checked
+with ``PRAGMA integrity_check`` before it is renamed into place, so a
+backup file is either complete and verified or absent.
+
+A database in WAL mode is copied in one step instead: the copy reads a
+snapshot that writers do not disturb, so it neither restarts nor blocks
+them.
+
+Usage:
+    python -m database.backup backup [--db inventory.db] [--dir backups] [--keep 7]
+    python -m database.backup list [--db inventory.db] [--dir backups]
+    python -m database.backup verify FILE
+    python -m database.backup restore FILE [--db inventory.db]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from .exceptions import BackupError
+
+BACKUP_PAGES_PER_STEP = 1024  # 4 MB per step with the default 4 KB page size
+BACKUP_STEP_PAUSE = 0.05  # Seconds between steps, leaving the database to writers
+BACKUP_MAX_RESTARTS = 5
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _backup_prefix(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0] + "-"
+
+
+def default_backup_dir(db_path: str) -> str:
+    """``backups`` in the database's directory"""
+    return str(Path(db_path).parent / "backups")
+
+
+def list_backups(db_path: str, backup_dir: str) -> List[str]:
+    """Completed backups of ``db_path`` in ``backup_dir``, oldest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    prefix = _backup_prefix(db_path)
+    # Timestamped names sort in the order they were taken
+    return [
+        os.path.join(backup_dir, name) for name in sorted(os.listdir(backup_dir))
+        if name.startswith(prefix) and name.endswith(".db")
+    ]
+
+
+def verify_backup(path: str, stop_event: Optional[threading.Event] = None):
+    """
+    Run ``PRAGMA integrity_check`` on a backup file.
+
+    Raises:
+        BackupError: if the file is damaged, or the check was stopped
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        if stop_event is not None:
+            # Checking a large file takes a while; a nonzero return interrupts it
+            conn.set_progress_handler(stop_event.is_set, 100_000)
+        try:
+            problems = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        except sqlite3.DatabaseError as e:
+            raise BackupError(f"Could not check {path}: {e}") from e
+    finally:
+        conn.close()
+    if problems != ["ok"]:
+        raise BackupError(f"{path} failed the integrity check: {'; '.join(problems[:5])}")
+
+
+def backup_database(db_path: str, backup_dir: str, pages: int = BACKUP_PAGES_PER_STEP,
+                    pause: float = BACKUP_STEP_PAUSE, max_restarts: int = BACKUP_MAX_RESTARTS,
+                    stop_event: Optional[threading.Event] = None) -> str:
+    """
+    Copy ``db_path`` into a new timestamped file in ``backup_dir`` while
+    the database stays in use, then verify the copy.
+
+    Args:
+        pages: pages copied per step; the read lock is held for one step
+        pause: seconds to wait between steps
+        max_restarts: restarts caused by other connections' writes before copying in one step
+        stop_event: abandons the backup when set
+
+    Returns:
+        str: path of the verified backup
+
+    Raises:
+        BackupError: if the backup was stopped or the copy failed verification
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    path = os.path.join(backup_dir, f"{_backup_prefix(db_path)}{datetime.now():%Y%m%d-%H%M%S-%f}.db")
+    partial_path = path + ".partial"
+    stop_event = stop_event or threading.Event()
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if remaining and stop_event.wait(pause):
+            raise BackupError("Backup stopped")
+
+    try:
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+        target = sqlite3.connect(partial_path)
+        try:
+            wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            try:
+                source.backup(target, pages=-1 if wal else pages, progress=progress)
+            except _TooManyRestarts:
+                logging.getLogger(__name__).warning(
+                    f"Backup of {db_path} restarted {restarts} times; copying it in one step"
+                )
+                source.backup(target, pages=-1)
+        finally:
+            target.close()
+            source.close()
+        verify_backup(partial_path, stop_event)
+        os.replace(partial_path, path)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return path
+
+
+def rotate_backups(db_path: str, backup_dir: str, keep: int) -> List[str]:
+    """Delete all but the newest ``keep`` backups; returns the deleted paths"""
+    expired = list_backups(db_path, backup_dir)[:-keep] if keep > 0 else []
+    for path in expired:
+        os.remove(path)
+    return expired
+
+
+def restore_backup(backup_path: str, db_path: str):
+    """
+    Replace the contents of ``db_path`` with a verified backup.
+
+    The restore goes through the backup API too, so it is one transaction
+    on the live file: other connections see either the old or the restored
+    database, never a mix, and pick the change up as an external change.
+    Open edit forms will fail their version checks, so restore while the
+    application is idle.
+    """
+    verify_backup(backup_path)
+    source = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True)
+    target = sqlite3.connect(db_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+class BackupScheduler:
+    """
+    Background thread that backs the database up every ``interval``
+    seconds, keeping the newest ``keep`` backups.
+
+    The schedule follows the newest backup on disk, so restarting the
+    application does not take an extra backup. A failed attempt is retried
+    after ``retry_after`` seconds.
+    """
+
+    def __init__(self, db_path: str, backup_dir: Optional[str] = None, interval: float = 6 * 3600,
+                 keep: int = 7, retry_after: float = 900.0):
+        self.db_path = db_path
+        self.backup_dir = backup_dir or default_backup_dir(db_path)
+        self.interval = interval
+        self.keep = keep
+        self.retry_after = retry_after
+        self.logger = logging.getLogger(__name__)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="database-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def seconds_until_due(self) -> float:
+        backups = list_backups(self.db_path, self.backup_dir)
+        if not backups:
+            return 0.0
+        return max(0.0, os.path.getmtime(backups[-1]) + self.interval - time.time())
+
+    def _run(self):
+        while not self._stop_event.wait(self.seconds_until_due()):
+            try:
+                started = time.perf_counter()
+                path = backup_database(self.db_path, self.backup_dir, stop_event=self._stop_event)
+                self.logger.info(f"Backed up to {path} in {time.perf_counter() - started:.1f} s")
+                for expired in rotate_backups(self.db_path, self.backup_dir, self.keep):
+                    self.logger.info(f"Removed old backup {expired}")
+            except (BackupError, sqlite3.Error, OSError) as e:
+                if self._stop_event.is_set():
+                    return
+                self.logger.error(f"Database backup failed: {e}")
+                self._stop_event.wait(self.retry_after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up, verify or restore the inventory database")
+    parser.add_argument("command", choices=["backup", "list", "verify", "restore"])
+    parser.add_argument("file", nargs="?", help="backup file to verify or restore")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--dir", help="backup directory (default: backups next to the database)")
+    parser.add_argument("--keep", type=int, default=7, help="backups to keep after a new one")
+    args = parser.parse_args()
+    if args.command in ("verify", "restore") and not args.file:
+        parser.error(f"{args.command} needs a backup file")
+    args.dir = args.dir or default_backup_dir(args.db)
+
+    if args.command == "backup":
+        started = time.perf_counter()
+        path = backup_database(args.db, args.dir)
+        print(f"Backed up {args.db} to {path} in {time.perf_counter() - started:.1f} s")
+        for expired in rotate_backups(args.db, args.dir, args.keep):
+            print(f"Removed {expired}")
+    elif args.command == "list":
+        for path in list_backups(args.db, args.dir):
+            print(f"{path}  {os.path.getsize(path) / 2**20:,.1f} MB")
+    elif args.command == "verify":
+        verify_backup(args.file)
+        print(f"{args.file} is OK")
+    else:
+        restore_backup(args.file, args.db)
+        print(f"Restored {args.db} from {args.file}")
+
+
+if __name__ == "__main__":
+    main()
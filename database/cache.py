@@ -0,0 +1,204 @@
+import copy
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from .changes import latest_change_id, read_changes
+from .models import Product
+
+# Sentinel distinguishing "not cached" from a cached missing product
+_MISSING = object()
+
+# Connections remembered per cache (and by product_cache); a forgotten one just reads change_log again
+MAX_CONNECTIONS = 16
+
+
+class ProductCache:
+    """
+    Read-through cache for product lookups and the product catalog.
+
+    Entries are held in a bounded LRU and expire after ``ttl`` seconds. The
+    query layer invalidates them once its writes commit. A lookup also
+    reads change_log for entries it has not applied yet, which catches
+    writes made through any other connection or process and drops just the
+    products they touched, but only once ``PRAGMA data_version`` or the
+    connection's own change count shows something was committed since that
+    connection last looked.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._products: "OrderedDict[int, tuple]" = OrderedDict()  # product_id -> (expires_at, product)
+        self._catalog: Optional[tuple] = None  # (expires_at, rows)
+        self._change_id: Optional[int] = None  # Last change_log entry applied
+        self._generation = 0  # Bumped on invalidation so in-flight loads are not cached
+        # connection -> (data_version, total_changes) when it last caught up with change_log
+        self._seen: "OrderedDict[sqlite3.Connection, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_product(self, conn: sqlite3.Connection, product_id: int,
+                    loader: Callable[[], Optional[Product]]) -> Optional[Product]:
+        """Return a copy of the cached product, calling ``loader`` on a miss"""
+        self._apply_logged_changes(conn)
+        now = self.clock()
+        with self._lock:
+            entry = self._products.get(product_id)
+            if entry is not None and entry[0] > now:
+                self._products.move_to_end(product_id)
+                self.hits += 1
+                return self._copy(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        product = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._products[product_id] = (now + self.ttl, _MISSING if product is None else product)
+                self._products.move_to_end(product_id)
+                while len(self._products) > self.max_entries:
+                    self._products.popitem(last=False)
+                    self.evictions += 1
+        return self._copy(product)
+
+    def get_catalog(self, conn: sqlite3.Connection, loader: Callable[[], List[tuple]]) -> List[tuple]:
+        """Return the cached product list rows, calling ``loader`` on a miss"""
+        self._apply_logged_changes(conn)
+        now = self.clock()
+        with self._lock:
+            if self._catalog is not None and self._catalog[0] > now:
+                self.hits += 1
+                return list(self._catalog[1])
+            self.misses += 1
+            generation = self._generation
+
+        rows = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._catalog = (now + self.ttl, rows)
+        return list(rows)
+
+    def invalidate(self, product_id: Optional[int] = None):
+        """Drop one product (or every product) and the catalog"""
+        with self._lock:
+            self._generation += 1
+            if product_id is None:
+                self._products.clear()
+            else:
+                self._products.pop(product_id, None)
+            self._catalog = None
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._products.clear()
+            self._catalog = None
+            self._change_id = None
+            self._seen.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._products),
+            }
+
+    def _apply_logged_changes(self, conn: sqlite3.Connection):
+        # data_version moves when another connection commits, total_changes when this one writes
+        state = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        with self._lock:
+            after = self._change_id
+            if after is not None and self._seen.get(conn) == state:
+                self._seen.move_to_end(conn)
+                return
+        if after is None:
+            changes = None  # Nothing applied yet, so nothing cached can be trusted
+        else:
+            changes = read_changes(conn, after, self.max_entries)
+            if changes == []:
+                self._remember(conn, state)
+                return
+        if changes is None:
+            # First lookup, too many changes, or some pruned before we saw them
+            latest = latest_change_id(conn)
+            product_ids = None
+        else:
+            latest = changes[-1][0]
+            product_ids = {entity_id for _, entity, entity_id, _ in changes if entity == "product"}
+
+        with self._lock:
+            if product_ids is None or product_ids:
+                self._generation += 1
+                if product_ids is None:
+                    self._products.clear()
+                for product_id in product_ids or ():
+                    self._products.pop(product_id, None)
+                self._catalog = None
+            # Inside a transaction the entries read may be uncommitted and could
+            # still roll back, so they are applied but not marked as seen
+            if not conn.in_transaction and self._change_id == after:
+                self._change_id = latest
+                self._remember_locked(conn, state)
+
+    def _remember(self, conn: sqlite3.Connection, state: tuple):
+        with self._lock:
+            self._remember_locked(conn, state)
+
+    def _remember_locked(self, conn: sqlite3.Connection, state: tuple):
+        # An open transaction may still roll back what it wrote, so it is checked again next time
+        if conn.in_transaction:
+            return
+        self._seen[conn] = state
+        self._seen.move_to_end(conn)
+        while len(self._seen) > MAX_CONNECTIONS:
+            self._seen.popitem(last=False)
+
+    @staticmethod
+    def _copy(product):
+        # Hand out copies so callers can edit their product without touching the cache
+        if product is _MISSING or product is None:
+            return None
+        return copy.copy(product)
+
+
+_caches: Dict[str, ProductCache] = {}  # database file -> cache
+_connection_caches: "OrderedDict[sqlite3.Connection, ProductCache]" = OrderedDict()
+_caches_lock = threading.Lock()
+
+
+def product_cache(conn: sqlite3.Connection) -> ProductCache:
+    """The cache for ``conn``'s database, shared by every connection to the same file"""
+    with _caches_lock:
+        cache = _connection_caches.get(conn)
+        if cache is not None:
+            _connection_caches.move_to_end(conn)
+            return cache
+    path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+    with _caches_lock:
+        # In-memory databases have no file name and are never shared
+        cache = _caches.setdefault(path, ProductCache()) if path else ProductCache()
+        _connection_caches[conn] = cache
+        while len(_connection_caches) > MAX_CONNECTIONS:
+            _connection_caches.popitem(last=False)
+    return cache
+
+
+def release_product_cache(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Drop the cache for ``conn``'s database before closing it; returns its final stats"""
+    cache = product_cache(conn)
+    stats = cache.stats()
+    cache.clear()
+    with _caches_lock:
+        for other in [other for other, other_cache in _connection_caches.items() if other_cache is cache]:
+            del _connection_caches[other]
+        for path in [path for path, path_cache in _caches.items() if path_cache is cache]:
+            del _caches[path]
+    return stats
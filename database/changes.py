@@ -0,0 +1,60 @@
+import sqlite3
+from typing import List, Optional, Tuple
+
+# Entries are kept this long, so readers that poll less often can still catch up
+CHANGE_LOG_RETENTION = "-1 hour"
+
+
+def latest_change_id(conn: sqlite3.Connection) -> int:
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM change_log")
+    return cursor.fetchone()[0]
+
+
+def read_changes(conn: sqlite3.Connection, after: int, limit: int) -> Optional[List[Tuple[int, str, int, str]]]:
+    """
+    Entries after ``after`` as (change_id, entity, entity_id, action), oldest
+    first, up to ``limit`` of them.
+
+    Returns:
+        list, or None when entries after ``after`` were already pruned or
+        there are more than ``limit`` of them; the caller must then assume
+        anything may have changed
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT change_id, entity, entity_id, action FROM change_log
+        WHERE change_id > ?
+        ORDER BY change_id
+        LIMIT ?
+    """, (after, limit + 1))
+    rows = cursor.fetchall()
+    # IDs are consecutive: AUTOINCREMENT never reuses one and a rollback takes back its own
+    if len(rows) > limit or (rows and rows[0][0] != after + 1):
+        return None
+    return rows
+
+
+def changed_entities(conn: sqlite3.Connection, after: int) -> Optional[List[str]]:
+    """Entities with entries after ``after``, or None if some of those entries were pruned"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(change_id) FROM change_log WHERE change_id > ?", (after,))
+    first = cursor.fetchone()[0]
+    if first is None:
+        return []
+    if first != after + 1:
+        return None
+    cursor.execute("SELECT DISTINCT entity FROM change_log WHERE change_id > ?", (after,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def prune_changes(conn: sqlite3.Connection) -> int:
+    """Delete entries older than CHANGE_LOG_RETENTION, always keeping the newest"""
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM change_log
+            WHERE changed_at < datetime('now', ?)
+              AND change_id < (SELECT MAX(change_id) FROM change_log)
+        """, (CHANGE_LOG_RETENTION,))
+        return cursor.rowcount
@@ -1,13 +1,39 @@
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 import logging
-from .models import User, Product, Supplier, Order
+from .models import (User, Product, Supplier, Order, OrderItem, OrderStatusChange,
+                     StockMovement, StockCheckpoint, StockReservation, DailySummary,
+                     ClassificationRun, ChangeLogEntry)
+from .archive import OrderArchive, default_archive_path
+from .backup import BackupScheduler, default_backup_dir
+from .cache import release_product_cache
+from .changes import prune_changes
+from .queries import StockQueries
+from .summary import fill_gaps, rebuild
+from .sweeper import ReservationSweeper
+
+# Bump when a migration step is added to migrate_database
+SCHEMA_VERSION = 9
+
+# Default archive_path and backup_dir: next to db_path rather than in the working directory
+NEXT_TO_DB = object()
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "inventory.db"):
+    def __init__(self, db_path: str = "inventory.db", archive_path: Union[str, None, object] = NEXT_TO_DB,
+                 archive_after_days: int = 365, backup_dir: Union[str, None, object] = NEXT_TO_DB):
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
+        if archive_path is NEXT_TO_DB:
+            archive_path = default_archive_path(db_path)
+        if backup_dir is NEXT_TO_DB:
+            backup_dir = default_backup_dir(db_path)
+        self.archive = OrderArchive(archive_path) if archive_path else None
+        self.archive_after_days = archive_after_days
+        self.reconciled_through = 0  # Highest movement ID verified by reconcile_stock
+        self.reservation_sweeper = ReservationSweeper(db_path)
+        self.backup_scheduler = BackupScheduler(db_path, backup_dir) if backup_dir else None
+        self.summary_needs_rebuild = False
         self.setup_logging()
         self.initialize_database()
 
@@ -24,6 +50,8 @@ class DatabaseManager:
             try:
                 self.conn = sqlite3.connect(self.db_path)
                 self.conn.row_factory = sqlite3.Row
+                if self.archive is not None:
+                    self.archive.attach(self.conn)
             except sqlite3.Error as e:
                 self.logger.error(f"Database connection error: {e}")
                 raise
@@ -33,21 +61,183 @@ class DatabaseManager:
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products'")
+            fresh = cursor.fetchone() is None
 
             # Create tables using model definitions
             cursor.execute(User.create_table_query())
             cursor.execute(Product.create_table_query())
             cursor.execute(Supplier.create_table_query())
             cursor.execute(Order.create_table_query())
+            cursor.execute(OrderItem.create_table_query())
+            cursor.execute(OrderStatusChange.create_table_query())
+            cursor.execute(StockMovement.create_table_query())
+            cursor.execute(StockCheckpoint.create_table_query())
+            cursor.execute(StockReservation.create_table_query())
+            cursor.execute(DailySummary.create_table_query())
+            cursor.execute(ClassificationRun.create_table_query())
+            cursor.execute(ChangeLogEntry.create_table_query())
+
+            self.migrate_database(cursor, fresh)
+
+            # Indexes come last so they can cover columns added by migrations
+            for model in (Product, Order, OrderItem, OrderStatusChange,
+                          StockMovement, StockCheckpoint, StockReservation, DailySummary):
+                for query in model.create_index_queries():
+                    cursor.execute(query)
+            for query in ChangeLogEntry.create_trigger_queries():
+                cursor.execute(query)
 
             conn.commit()
+
+            if self.summary_needs_rebuild:
+                self.logger.info(f"Built daily summary: {rebuild(conn)} rows")
+                self.summary_needs_rebuild = False
+            else:
+                fill_gaps(conn)  # Days passed while the app was closed
             self.logger.info("Database initialized successfully")
 
         except sqlite3.Error as e:
             self.logger.error(f"Database initialization error: {e}")
             raise
 
+    def migrate_database(self, cursor: sqlite3.Cursor, fresh: bool):
+        """Bring a database created by an older version up to SCHEMA_VERSION"""
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+
+        if not fresh and version < 1:
+            # Existing stock predates the ledger: record it as opening balances
+            cursor.execute("""
+                INSERT INTO stock_movements (product_id, movement_type, quantity, note)
+                SELECT product_id, 'adjustment', stock_quantity, 'Opening balance'
+                FROM products p
+                WHERE stock_quantity != 0
+                  AND NOT EXISTS (SELECT 1 FROM stock_movements m WHERE m.product_id = p.product_id)
+            """)
+            self.logger.info(f"Recorded {cursor.rowcount} opening stock balances")
+
+        if not fresh and version < 2:
+            # Row versions for optimistic concurrency control
+            for table in ("products", "suppliers", "orders"):
+                self.add_column_if_missing(cursor, table, "version", "INTEGER NOT NULL DEFAULT 1")
+
+        if not fresh and version < 3:
+            # Money moves from REAL-affinity decimals to integer cents
+            for table, column in (("products", "price"),
+                                  ("orders", "total_amount"),
+                                  ("order_items", "unit_price")):
+                cursor.execute(f"UPDATE {table} SET {column} = CAST(ROUND({column} * 100) AS INTEGER)")
+
+        if not fresh and version < 4:
+            # Orders predating status history get their current status as the first entry
+            cursor.execute("""
+                INSERT INTO order_status_history (order_id, from_status, to_status, changed_by, changed_at)
+                SELECT order_id, NULL, status, user_id, order_date
+                FROM orders o
+                WHERE NOT EXISTS (SELECT 1 FROM order_status_history h WHERE h.order_id = o.order_id)
+            """)
+
+        if not fresh and version < 5:
+            # Backfilled after the indexes exist, see initialize_database
+            self.summary_needs_rebuild = True
+
+        if not fresh and version < 6:
+            self.add_column_if_missing(cursor, "products", "reorder_point", "INTEGER NOT NULL DEFAULT 0")
+            # Superseded by the partial idx_products_low_stock
+            cursor.execute("DROP INDEX IF EXISTS idx_products_stock")
+
+        if not fresh and version < 7:
+            for column in ("abc_class", "xyz_class"):
+                self.add_column_if_missing(cursor, "products", column, "TEXT")
+
+        if not fresh and version < 8:
+            self.add_column_if_missing(cursor, "products", "sku", "TEXT")
+
+        if not fresh and version < 9:
+            self.add_column_if_missing(cursor, "products", "barcode", "TEXT")
+
+        if version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in (row[1] for row in cursor.fetchall()):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def checkpoint_stock(self) -> int:
+        """Write stock checkpoints for products with new ledger movements"""
+        try:
+            created = StockQueries.create_checkpoints(self.get_connection())
+            self.logger.info(f"Created {created} stock checkpoints")
+            return created
+        except sqlite3.Error as e:
+            self.logger.error(f"Stock checkpoint error: {e}")
+            raise
+
+    def archive_old_orders(self) -> int:
+        """Move finished orders older than archive_after_days to the archive database"""
+        if self.archive is None:
+            return 0
+        try:
+            return self.archive.archive_orders(self.get_connection(), self.archive_after_days)
+        except sqlite3.Error as e:
+            self.logger.error(f"Order archiving error: {e}")
+            raise
+
+    def reconcile_stock(self):
+        """
+        Verify materialized stock quantities against the ledger.
+
+        The first run checks every product; later runs only check products
+        with movements recorded since the previous run.
+        """
+        try:
+            mismatches, self.reconciled_through = StockQueries.reconcile(
+                self.get_connection(),
+                self.reconciled_through
+            )
+            for product_id, stock_quantity, ledger_quantity in mismatches:
+                self.logger.warning(
+                    f"Stock mismatch for product {product_id}: "
+                    f"stock_quantity={stock_quantity}, ledger={ledger_quantity}"
+                )
+            return mismatches
+        except sqlite3.Error as e:
+            self.logger.error(f"Stock reconciliation error: {e}")
+            raise
+
+    def refresh_daily_summary(self) -> int:
+        """Give every category/supplier group a daily_summary row for each day up to today"""
+        try:
+            return fill_gaps(self.get_connection())
+        except sqlite3.Error as e:
+            self.logger.error(f"Daily summary refresh error: {e}")
+            raise
+
+    def prune_change_log(self) -> int:
+        """Drop change_log entries every reader has had time to see"""
+        try:
+            return prune_changes(self.get_connection())
+        except sqlite3.Error as e:
+            self.logger.error(f"Change log pruning error: {e}")
+            raise
+
+    def start_reservation_sweeper(self):
+        """Release expired stock reservations in the background until close()"""
+        self.reservation_sweeper.start()
+
+    def start_backup_scheduler(self):
+        """Take verified online backups in the background until close()"""
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.start()
+
     def close(self):
+        self.reservation_sweeper.stop()
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.stop()
         if self.conn:
+            self.logger.info(f"Product cache stats: {release_product_cache(self.conn)}")
             self.conn.close()
             self.conn = None
\ No newline at end of file
@@ -0,0 +1,147 @@
+import logging
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+from .changes import changed_entities, latest_change_id, read_changes
+
+# Actions carried by change events
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+# Too many rows were changed elsewhere to list: any row of the event's entity
+# (of every entity when it is None) may have changed
+EXTERNAL = "external"
+
+# "low_stock" events use INSERT when a product falls to its reorder point
+# and DELETE when it is restocked above it. UPDATE with no product ID means
+# products changed elsewhere and the low-stock set should be counted again.
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    entity: Optional[str]  # "product", "supplier", "order" or "low_stock"; None for every entity
+    entity_id: Optional[int]
+    action: str
+
+
+class ChangeBus:
+    """
+    Publish/subscribe channel for data changes made by the query layer.
+
+    Publishing only queues the event, so it is safe from any thread and from
+    inside a transaction. Subscribers run when ``dispatch`` is called, which
+    the GUI does from its own thread once the writing code has returned.
+    Repeated events for the same row in one batch are delivered once, and
+    more than ``batch_limit`` rows of one entity, as from a catalog import,
+    are delivered as a single EXTERNAL event (a "low_stock" recount).
+    """
+
+    def __init__(self, batch_limit: int = 500):
+        self.batch_limit = batch_limit
+        self._subscribers = []
+        self._pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None],
+                  entities: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Register ``callback`` for events on ``entities`` (all when None).
+        EXTERNAL events without an entity are delivered to every subscriber.
+
+        Returns:
+            callable: removes the subscription
+        """
+        subscription = (callback, frozenset(entities) if entities is not None else None)
+        with self._lock:
+            self._subscribers.append(subscription)
+
+        def unsubscribe():
+            with self._lock:
+                if subscription in self._subscribers:
+                    self._subscribers.remove(subscription)
+        return unsubscribe
+
+    def publish(self, entity: Optional[str], entity_id: Optional[int], action: str):
+        self._pending.put(ChangeEvent(entity, entity_id, action))
+
+    def dispatch(self) -> int:
+        """Deliver queued events; returns how many distinct events were delivered"""
+        events = {}  # Ordered set of distinct events
+        while True:
+            try:
+                events[self._pending.get_nowait()] = None
+            except queue.Empty:
+                break
+
+        counts = Counter(event.entity for event in events if event.entity_id is not None)
+        bulk = {entity for entity, count in counts.items() if count > self.batch_limit}
+        if bulk:
+            events = dict.fromkeys(
+                ChangeEvent(event.entity, None, UPDATE if event.entity == "low_stock" else EXTERNAL)
+                if event.entity in bulk else event
+                for event in events
+            )
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback, entities in subscribers:
+                if entities is None or event.entity in entities or event.entity is None:
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        self.logger.error(f"Change subscriber failed on {event}: {str(e)}")
+        return len(events)
+
+
+class DataVersionMonitor:
+    """
+    Detects commits made through other connections or processes by polling
+    ``PRAGMA data_version``, then publishes the row changes they made as
+    recorded in change_log. When more than ``event_limit`` rows changed,
+    as in a catalog import, it publishes one EXTERNAL event per entity
+    affected instead; EXTERNAL for every entity only if entries were pruned
+    before it saw them.
+    """
+
+    def __init__(self, bus: ChangeBus, event_limit: int = 500):
+        self.bus = bus
+        self.event_limit = event_limit
+        self._data_version = None
+        self._change_id = None  # Last change_log entry published
+
+    def poll(self, conn: sqlite3.Connection) -> int:
+        """Check for external writes, then dispatch every pending event"""
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._change_id is None:
+            self._change_id = latest_change_id(conn)
+        elif data_version != self._data_version:
+            self._publish_changes(conn)
+        self._data_version = data_version
+        return self.bus.dispatch()
+
+    def _publish_changes(self, conn: sqlite3.Connection):
+        # Entries also include this connection's own writes, already published; repeats are harmless
+        changes = read_changes(conn, self._change_id, self.event_limit)
+        if changes is None:
+            latest = latest_change_id(conn)
+            entities = changed_entities(conn, self._change_id)
+            for entity in entities if entities is not None else [None]:
+                self.bus.publish(entity, None, EXTERNAL)
+            self._change_id = latest
+            return
+
+        for _, entity, entity_id, action in changes:
+            self.bus.publish(entity, entity_id, action)
+        if any(entity == "product" for _, entity, _, _ in changes):
+            self.bus.publish("low_stock", None, UPDATE)
+        if changes:
+            self._change_id = changes[-1][0]
+
+
+# Shared by the query layer and every open window
+change_bus = ChangeBus()
@@ -0,0 +1,34 @@
+class ConflictError(Exception):
+    """Raised when a row was changed by someone else since it was read"""
+
+    def __init__(self, entity: str, entity_id: int):
+        super().__init__(
+            f"This {entity} was changed by another user since you opened it. "
+            "The latest values have been reloaded; please review and save again."
+        )
+        self.entity = entity
+        self.entity_id = entity_id
+
+class InsufficientStockError(Exception):
+    """Raised when a reservation or sale asks for more than is available to promise"""
+
+    def __init__(self, product_id: int, requested: int, available: int):
+        super().__init__(
+            f"Not enough stock for product {product_id}. "
+            f"Requested: {requested}, available: {max(available, 0)}"
+        )
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
+class InvalidTransitionError(Exception):
+    """Raised when orders cannot move to the requested status"""
+
+    def __init__(self, status: str, invalid: dict):
+        details = ", ".join(f"#{order_id} ({current})" for order_id, current in sorted(invalid.items()))
+        super().__init__(f"Cannot change to {status}: {details}")
+        self.status = status
+        self.invalid = invalid  # order_id -> current status
+
+class BackupError(Exception):
+    """Raised when a backup cannot be completed or a backup file fails verification"""
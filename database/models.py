@@ -1,9 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
+from .money import Money
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: Optional[int]
     username: str
@@ -25,16 +25,22 @@ class User:
         )
         """
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     product_id: Optional[int]
     name: str
     description: Optional[str]
     category: str
-    price: Decimal
+    price: Money
     stock_quantity: int
     qr_code_path: Optional[str]
     supplier_id: Optional[int]
+    version: int = 1  # Row version for optimistic concurrency control
+    reorder_point: int = 0  # Low on stock at or below this quantity
+    abc_class: Optional[str] = None  # "A", "B" or "C" by sales value; set by the weekly classification
+    xyz_class: Optional[str] = None  # "X", "Y" or "Z" by demand variability
+    sku: Optional[str] = None  # Stock keeping unit; the key for catalog imports
+    barcode: Optional[str] = None  # Manufacturer EAN/UPC printed on the product
 
     @staticmethod
     def create_table_query() -> str:
@@ -44,15 +50,39 @@ class Product:
             name TEXT NOT NULL,
             description TEXT,
             category TEXT NOT NULL,
-            price DECIMAL(10,2) NOT NULL,
+            price INTEGER NOT NULL,  -- cents
             stock_quantity INTEGER NOT NULL,
             qr_code_path TEXT,
             supplier_id INTEGER,
+            version INTEGER NOT NULL DEFAULT 1,
+            reorder_point INTEGER NOT NULL DEFAULT 0,
+            abc_class TEXT,
+            xyz_class TEXT,
+            sku TEXT,
+            barcode TEXT,
             FOREIGN KEY (supplier_id) REFERENCES suppliers(supplier_id)
         )
         """
 
-@dataclass
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            # Case-insensitive name prefix lookups for the product picker
+            "CREATE INDEX IF NOT EXISTS idx_products_name ON products(name COLLATE NOCASE)",
+            # Covers the per category/supplier stock totals kept in daily_summary
+            "CREATE INDEX IF NOT EXISTS idx_products_group "
+            "ON products(category, supplier_id, stock_quantity, price)",
+            # Holds only products at or below their reorder point
+            "CREATE INDEX IF NOT EXISTS idx_products_low_stock "
+            "ON products(product_id, stock_quantity, reorder_point) "
+            "WHERE stock_quantity <= reorder_point",
+            # Catalog imports upsert on SKU; products without one are not constrained
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku ON products(sku)",
+            # Scanned EAN/UPC codes resolve through this index
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode)",
+        ]
+
+@dataclass(slots=True)
 class Supplier:
     supplier_id: Optional[int]
     name: str
@@ -60,6 +90,7 @@ class Supplier:
     email: str
     phone: Optional[str]
     address: Optional[str]
+    version: int = 1
 
     @staticmethod
     def create_table_query() -> str:
@@ -70,17 +101,19 @@ class Supplier:
             contact_person TEXT,
             email TEXT UNIQUE NOT NULL,
             phone TEXT,
-            address TEXT
+            address TEXT,
+            version INTEGER NOT NULL DEFAULT 1
         )
         """
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     order_id: Optional[int]
     user_id: int
     order_date: datetime
     status: str
-    total_amount: Decimal
+    total_amount: Money
+    version: int = 1
 
     @staticmethod
     def create_table_query() -> str:
@@ -90,7 +123,291 @@ class Order:
             user_id INTEGER,
             order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             status TEXT NOT NULL,
-            total_amount DECIMAL(10,2) NOT NULL,
+            total_amount INTEGER NOT NULL,  -- cents
+            version INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (user_id) REFERENCES users(user_id)
         )
         """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status, order_date)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)",
+        ]
+
+# Order statuses in workflow order, and the statuses each one may move to
+ORDER_STATUSES = ("Pending", "Processing", "Shipped", "Delivered", "Cancelled")
+ORDER_TRANSITIONS = {
+    "Pending": ("Processing", "Cancelled"),
+    "Processing": ("Shipped", "Cancelled"),
+    "Shipped": ("Delivered",),
+    "Delivered": (),
+    "Cancelled": (),
+}
+
+@dataclass(slots=True)
+class OrderStatusChange:
+    history_id: Optional[int]
+    order_id: int
+    from_status: Optional[str]  # None when the order was created
+    to_status: str
+    changed_by: Optional[int]  # user_id
+    changed_at: datetime = None
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS order_status_history (
+            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            from_status TEXT,
+            to_status TEXT NOT NULL,
+            changed_by INTEGER,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (changed_by) REFERENCES users(user_id)
+        )
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_order_status_history_order "
+            "ON order_status_history(order_id, changed_at, to_status)",
+            "CREATE INDEX IF NOT EXISTS idx_order_status_history_status "
+            "ON order_status_history(to_status, changed_at)",
+            "CREATE INDEX IF NOT EXISTS idx_order_status_history_changed "
+            "ON order_status_history(changed_at)",
+        ]
+
+@dataclass(slots=True)
+class OrderItem:
+    order_item_id: Optional[int]
+    order_id: Optional[int]
+    product_id: int
+    quantity: int
+    unit_price: Money
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS order_items (
+            order_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price INTEGER NOT NULL,  -- cents
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)",
+        ]
+
+# Kinds of stock movement recorded in the ledger
+MOVEMENT_TYPES = ("sale", "receipt", "adjustment", "return")
+
+@dataclass(slots=True)
+class StockMovement:
+    movement_id: Optional[int]
+    product_id: int
+    movement_type: str
+    quantity: int  # Signed change to stock on hand
+    reference_id: Optional[int] = None  # Order ID for sales and returns
+    note: Optional[str] = None
+    created_at: datetime = None
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            movement_type TEXT NOT NULL
+                CHECK (movement_type IN ('sale', 'receipt', 'adjustment', 'return')),
+            quantity INTEGER NOT NULL,
+            reference_id INTEGER,
+            note TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_stock_movements_product "
+            "ON stock_movements(product_id, movement_id)",
+            "CREATE INDEX IF NOT EXISTS idx_stock_movements_created "
+            "ON stock_movements(created_at)",
+        ]
+
+@dataclass(slots=True)
+class StockCheckpoint:
+    checkpoint_id: Optional[int]
+    product_id: int
+    quantity: int  # Stock on hand after last_movement_id was applied
+    last_movement_id: int
+    recorded_at: datetime  # created_at of last_movement_id
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS stock_checkpoints (
+            checkpoint_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            last_movement_id INTEGER NOT NULL,
+            recorded_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_stock_checkpoints_product "
+            "ON stock_checkpoints(product_id, last_movement_id)",
+        ]
+
+@dataclass(slots=True)
+class StockReservation:
+    reservation_id: Optional[int]
+    cart_id: str  # Identifies one order being built, e.g. an open OrderDialog
+    product_id: int
+    quantity: int
+    expires_at: datetime  # UTC; expired reservations no longer hold stock
+    created_at: datetime = None
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            reservation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cart_id TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            # Covers the available-to-promise aggregate without touching the table
+            "CREATE INDEX IF NOT EXISTS idx_stock_reservations_product "
+            "ON stock_reservations(product_id, expires_at, quantity, cart_id)",
+            "CREATE INDEX IF NOT EXISTS idx_stock_reservations_cart "
+            "ON stock_reservations(cart_id)",
+            "CREATE INDEX IF NOT EXISTS idx_stock_reservations_expires "
+            "ON stock_reservations(expires_at)",
+        ]
+
+@dataclass(slots=True)
+class ClassificationRun:
+    run_id: Optional[int]
+    products: int
+    changed: int  # Products whose ABC or XYZ class changed
+    sales_value: Money  # Over the classification window
+    stock_value: Money
+    ran_at: datetime = None
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS classification_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            products INTEGER NOT NULL,
+            changed INTEGER NOT NULL,
+            sales_value INTEGER NOT NULL,  -- cents
+            stock_value INTEGER NOT NULL,  -- cents
+            ran_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+@dataclass(slots=True)
+class DailySummary:
+    day: str  # YYYY-MM-DD, UTC
+    category: str
+    supplier_id: int  # 0 for products without a supplier
+    revenue: Money
+    units_sold: int
+    order_count: int
+    stock_units: int  # Closing stock for the day
+    stock_value: Money  # Closing stock valued at current prices
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS daily_summary (
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            supplier_id INTEGER NOT NULL DEFAULT 0,
+            revenue INTEGER NOT NULL DEFAULT 0,  -- cents
+            units_sold INTEGER NOT NULL DEFAULT 0,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            stock_units INTEGER NOT NULL DEFAULT 0,
+            stock_value INTEGER NOT NULL DEFAULT 0,  -- cents
+            PRIMARY KEY (day, category, supplier_id)
+        ) WITHOUT ROWID
+        """
+
+    @staticmethod
+    def create_index_queries() -> List[str]:
+        return [
+            "CREATE INDEX IF NOT EXISTS idx_daily_summary_group "
+            "ON daily_summary(category, supplier_id, day)",
+        ]
+
+# Tables whose row changes are written to change_log by triggers: (table, entity, key column)
+LOGGED_TABLES = (
+    ("products", "product", "product_id"),
+    ("suppliers", "supplier", "supplier_id"),
+    ("orders", "order", "order_id"),
+)
+
+@dataclass(slots=True)
+class ChangeLogEntry:
+    change_id: Optional[int]
+    entity: str  # As in change events: "product", "supplier" or "order"
+    entity_id: int
+    action: str  # "insert", "update" or "delete"
+    changed_at: datetime = None
+
+    @staticmethod
+    def create_table_query() -> str:
+        return """
+        CREATE TABLE IF NOT EXISTS change_log (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+    @staticmethod
+    def create_trigger_queries() -> List[str]:
+        """
+        Every committed row change, whichever connection or process made it,
+        leaves an entry; rolled-back changes leave none.
+        """
+        queries = []
+        for table, entity, key in LOGGED_TABLES:
+            for action, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+                queries.append(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{action}_log
+                    AFTER {action.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_log (entity, entity_id, action)
+                        VALUES ('{entity}', {row}.{key}, '{action}');
+                    END
+                """)
+        return queries
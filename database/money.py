@@ -0,0 +1,92 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+from typing import Union
+
+CENTS_PER_UNIT = 100
+
+
+@total_ordering
+class Money:
+    """
+    Fixed-point currency amount held as an integer number of cents.
+
+    Prices and totals are stored in SQLite as these integers, so they can be
+    summed exactly in SQL aggregates and NumPy arrays without float drift.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        if not isinstance(cents, int) or isinstance(cents, bool):
+            raise TypeError(f"Money expects integer cents, got {type(cents).__name__}")
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, value: Union[str, Decimal, int, float, "Money"]) -> "Money":
+        """Convert a user-entered or decimal amount (e.g. "12.5") to Money"""
+        if isinstance(value, Money):
+            return value
+        try:
+            amount = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}") from None
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        cents = (amount * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return cls(int(cents))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents) / CENTS_PER_UNIT
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __radd__(self, other):
+        # Lets the built-in sum() start from 0
+        if other == 0:
+            return self
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __mul__(self, quantity):
+        if isinstance(quantity, int) and not isinstance(quantity, bool):
+            return Money(self.cents * quantity)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def __str__(self):
+        sign = "-" if self.cents < 0 else ""
+        units, cents = divmod(abs(self.cents), CENTS_PER_UNIT)
+        return f"{sign}{units}.{cents:02d}"
+
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+    def __repr__(self):
+        return f"Money('{self}')"
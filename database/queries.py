@@ -1,6 +1,69 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime
+import json
 import sqlite3
-from .models import User, Product, Supplier, Order
+from .archive import ARCHIVE_SCHEMA, archived_before
+from .cache import product_cache
+from .events import DELETE, INSERT, UPDATE, change_bus
+from .exceptions import ConflictError, InsufficientStockError, InvalidTransitionError
+from .models import (User, Product, Supplier, Order, OrderItem, OrderStatusChange,
+                     MOVEMENT_TYPES, ORDER_STATUSES, ORDER_TRANSITIONS)
+from .row_mapping import fetch_all, fetch_one, fetch_tuples
+from .summary import record_group_stock, record_order_sales, record_stock_change, remove_order_sales
+
+# Stock on hand according to the ledger for products aliased as "p": the
+# latest checkpoint plus every movement recorded after it
+LEDGER_QUANTITY_SQL = """
+    COALESCE((SELECT c.quantity FROM stock_checkpoints c
+              WHERE c.product_id = p.product_id
+              ORDER BY c.last_movement_id DESC LIMIT 1), 0)
+    + COALESCE((SELECT SUM(m.quantity) FROM stock_movements m
+                WHERE m.product_id = p.product_id
+                  AND m.movement_id > COALESCE((SELECT MAX(c.last_movement_id)
+                                                FROM stock_checkpoints c
+                                                WHERE c.product_id = p.product_id), 0)), 0)
+"""
+
+# Appended to a prefix to get an exclusive upper bound for a range scan
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+class ChangeSet:
+    """
+    Change events and product cache invalidations collected while a
+    transaction runs. Call ``publish`` with its connection once it has
+    committed, so a transaction that rolls back leaves the cache and
+    subscribers untouched.
+    """
+
+    def __init__(self):
+        self._events: Dict[Tuple[str, int], str] = {}  # (entity, entity_id) -> action
+        self._low_stock: Dict[int, List[bool]] = {}  # product_id -> [was low, is low]
+
+    def add(self, entity: str, entity_id: int, action: str) -> None:
+        # The first action wins: an inserted row that is then updated is still new
+        self._events.setdefault((entity, entity_id), action)
+
+    def low_stock(self, product_id: int, was_low: bool, is_low: bool) -> None:
+        """Note a product's stock or reorder point moving; only a net crossing is published"""
+        self._low_stock.setdefault(product_id, [was_low, is_low])[1] = is_low
+
+    def publish(self, conn: sqlite3.Connection) -> None:
+        cache = product_cache(conn)
+        for (entity, entity_id), action in self._events.items():
+            if entity == "product":
+                cache.invalidate(entity_id)
+            change_bus.publish(entity, entity_id, action)
+        for product_id, (was_low, is_low) in self._low_stock.items():
+            if was_low != is_low:
+                change_bus.publish("low_stock", product_id, INSERT if is_low else DELETE)
+
+def _raise_missing_or_conflict(cursor: sqlite3.Cursor, entity: str, table: str,
+                               key_column: str, key: int) -> None:
+    """Explain why a version-checked UPDATE matched no rows"""
+    cursor.execute(f"SELECT 1 FROM {table} WHERE {key_column} = ?", (key,))
+    if cursor.fetchone() is None:
+        raise ValueError(f"{entity.capitalize()} {key} not found")
+    raise ConflictError(entity, key)
 
 class UserQueries:
     @staticmethod
@@ -28,60 +91,198 @@ class UserQueries:
 class ProductQueries:
     @staticmethod
     def create_product(conn: sqlite3.Connection, product: Product) -> int:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO products (name, description, category, price, 
-                                stock_quantity, qr_code_path, supplier_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (product.name, product.description, product.category, 
-              float(product.price), product.stock_quantity, product.qr_code_path, 
-              product.supplier_id))
-        conn.commit()
-        return cursor.lastrowid
+        changes = ChangeSet()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO products (name, description, category, price, 
+                                    stock_quantity, qr_code_path, supplier_id, reorder_point, sku, barcode)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?, ?)
+            """, (product.name, product.description, product.category, 
+                  product.price.cents, product.qr_code_path, product.supplier_id,
+                  product.reorder_point, product.sku, product.barcode))
+            product_id = cursor.lastrowid
+            changes.add("product", product_id, INSERT)
+            # A new product was not low on stock before; it is now if its initial stock is
+            changes.low_stock(product_id, False, 0 <= product.reorder_point)
+
+            # Initial stock goes through the ledger like any other change
+            if product.stock_quantity:
+                StockQueries.record_movement(
+                    conn, product_id, "receipt", product.stock_quantity, note="Initial stock",
+                    changes=changes
+                )
+        changes.publish(conn)
+        return product_id
 
     @staticmethod
-    def get_all_products(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("""
+    def get_all_products(conn: sqlite3.Connection) -> List[tuple]:
+        """List view rows: (product_id, name, category, price cents, stock_quantity)"""
+        return product_cache(conn).get_catalog(conn, lambda: fetch_tuples(conn, """
             SELECT product_id, name, category, price, stock_quantity 
             FROM products
-        """)
-        return cursor.fetchall()
+        """))
 
     @staticmethod
-    def update_product(conn: sqlite3.Connection, product: Product) -> None:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE products 
-            SET name = ?, description = ?, category = ?, 
-                price = ?, stock_quantity = ?, supplier_id = ?
-            WHERE product_id = ?
-        """, (product.name, product.description, product.category,
-              float(product.price), product.stock_quantity, product.supplier_id,
-              product.product_id))
-        conn.commit()
+    def update_product(conn: sqlite3.Connection, product: Product, stock_delta: int = 0) -> int:
+        """
+        Update a product's details if it is still at ``product.version``.
+
+        Stock is never written absolutely: ``stock_delta`` is applied through
+        the ledger, so concurrent sales are never overwritten. Stock movements
+        do not bump the version, so they never cause a conflict.
+
+        Returns:
+            int: the product's new version
+
+        Raises:
+            ConflictError: if another user saved the product in the meantime
+        """
+        changes = ChangeSet()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT category, supplier_id, stock_quantity, reorder_point, price
+                FROM products WHERE product_id = ?
+            """, (product.product_id,))
+            old_row = cursor.fetchone()
+            cursor.execute("""
+                UPDATE products 
+                SET name = ?, description = ?, category = ?, 
+                    price = ?, supplier_id = ?, reorder_point = ?, sku = ?, barcode = ?,
+                    version = version + 1
+                WHERE product_id = ? AND version = ?
+            """, (product.name, product.description, product.category,
+                  product.price.cents, product.supplier_id, product.reorder_point, product.sku,
+                  product.barcode, product.product_id, product.version))
+            if cursor.rowcount == 0:
+                _raise_missing_or_conflict(cursor, "product", "products", "product_id", product.product_id)
+            old_category, old_supplier_id, old_stock, old_reorder_point, old_price = old_row
+            # A new reorder point can cross current stock; the movement below is checked on its own
+            changes.add("product", product.product_id, UPDATE)
+            changes.low_stock(
+                product.product_id, old_stock <= old_reorder_point, old_stock <= product.reorder_point
+            )
+
+            if stock_delta:
+                StockQueries.record_movement(
+                    conn, product.product_id, "adjustment", stock_delta, note="Edited in product form",
+                    changes=changes
+                )
+            # A new price revalues the group's stock, a new group moves it between groups
+            regrouped = (old_category, old_supplier_id) != (product.category, product.supplier_id)
+            if regrouped or old_price != product.price.cents:
+                record_group_stock(cursor, product.category, product.supplier_id)
+            if regrouped:
+                record_group_stock(cursor, old_category, old_supplier_id)
+        changes.publish(conn)
+        return product.version + 1
 
     @staticmethod
     def delete_product(conn: sqlite3.Connection, product_id: int) -> None:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
-        conn.commit()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT category, supplier_id FROM products WHERE product_id = ?", (product_id,))
+            group = cursor.fetchone()
+            cursor.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+            if group is not None:
+                record_group_stock(cursor, *group)
+        product_cache(conn).invalidate(product_id)
+        change_bus.publish("product", product_id, DELETE)
 
     @staticmethod
-    def get_product_by_id(conn: sqlite3.Connection, product_id: int) -> Optional[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM products WHERE product_id = ?", (product_id,))
-        return cursor.fetchone()
+    def get_product_by_id(conn: sqlite3.Connection, product_id: int) -> Optional[Product]:
+        return product_cache(conn).get_product(conn, product_id, lambda: fetch_one(
+            conn, Product, "SELECT * FROM products WHERE product_id = ?", (product_id,)
+        ))
 
     @staticmethod
-    def search_products(conn: sqlite3.Connection, search_term: str) -> List[Dict[str, Any]]:
+    def get_by_code(conn: sqlite3.Connection, code: str) -> Optional[Product]:
+        """
+        Product with the given barcode or SKU, barcode first. Each is a
+        single lookup on a unique index. A UPC-A code also matches the same
+        code stored as EAN-13 (with a leading zero), and vice versa.
+        """
+        code = code.strip()
+        barcodes = [code]
+        if code.isdigit() and len(code) == 12:
+            barcodes.append("0" + code)
+        elif code.isdigit() and len(code) == 13 and code.startswith("0"):
+            barcodes.append(code[1:])
+
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
+            SELECT product_id FROM products WHERE barcode IN ({", ".join("?" * len(barcodes))})
+            UNION ALL
+            SELECT product_id FROM products WHERE sku = ?
+            LIMIT 1
+        """, (*barcodes, code))
+        row = cursor.fetchone()
+        return ProductQueries.get_product_by_id(conn, row[0]) if row else None
+
+    @staticmethod
+    def search_products(conn: sqlite3.Connection, search_term: str) -> List[tuple]:
+        """Same row shape as get_all_products"""
+        return fetch_tuples(conn, """
             SELECT product_id, name, category, price, stock_quantity 
             FROM products 
             WHERE name LIKE ? OR category LIKE ?
         """, (f"%{search_term}%", f"%{search_term}%"))
-        return cursor.fetchall()
+
+    @staticmethod
+    def search_products_by_prefix(conn: sqlite3.Connection, prefix: str, limit: int = 20) -> List[tuple]:
+        """
+        Products whose name starts with ``prefix`` (case-insensitive), as
+        (product_id, name, price cents, stock_quantity) rows. Uses a range
+        scan on the NOCASE name index, so cost depends on ``limit``, not on
+        catalog size. An all-digit prefix also matches that product ID.
+        """
+        rows = fetch_tuples(conn, """
+            SELECT product_id, name, price, stock_quantity
+            FROM products
+            WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE
+            ORDER BY name COLLATE NOCASE
+            LIMIT ?
+        """, (prefix, prefix + PREFIX_UPPER_BOUND, limit))
+
+        if prefix.isdigit() and all(row[0] != int(prefix) for row in rows):
+            id_rows = fetch_tuples(conn, """
+                SELECT product_id, name, price, stock_quantity
+                FROM products WHERE product_id = ?
+            """, (int(prefix),))
+            # Only make room for the ID match when there is one
+            if id_rows:
+                rows = id_rows + rows[:limit - 1]
+        return rows
+
+    @staticmethod
+    def get_product_names(conn: sqlite3.Connection, product_ids: Iterable[int]) -> Dict[int, str]:
+        """Names of the given products by ID, in one query"""
+        return dict(fetch_tuples(conn, """
+            SELECT product_id, name FROM products
+            WHERE product_id IN (SELECT value FROM json_each(?))
+        """, (json.dumps([int(product_id) for product_id in product_ids]),)))
+
+    @staticmethod
+    def count_low_stock(conn: sqlite3.Connection) -> int:
+        """Number of products at or below their reorder point"""
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM products WHERE stock_quantity <= reorder_point")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def get_low_stock_products(conn: sqlite3.Connection) -> List[tuple]:
+        """
+        Products at or below their reorder point, as (product_id, name,
+        stock_quantity, reorder_point) rows, largest shortfall first. Only
+        reads the partial low-stock index and the matching rows.
+        """
+        return fetch_tuples(conn, """
+            SELECT product_id, name, stock_quantity, reorder_point
+            FROM products
+            WHERE stock_quantity <= reorder_point
+            ORDER BY reorder_point - stock_quantity DESC, product_id
+        """)
 
     @staticmethod
     def update_product_qr_code(conn: sqlite3.Connection, product_id: int, qr_code_path: str) -> None:
@@ -92,17 +293,259 @@ class ProductQueries:
             WHERE product_id = ?
         """, (qr_code_path, product_id))
         conn.commit()
+        product_cache(conn).invalidate(product_id)
+        change_bus.publish("product", product_id, UPDATE)
 
     @staticmethod
-    def update_stock_quantity(conn: sqlite3.Connection, product_id: int, quantity: int) -> None:
+    def update_stock_quantity(conn: sqlite3.Connection, product_id: int, quantity: int,
+                              order_id: Optional[int] = None) -> None:
         """Update product stock quantity after an order"""
+        changes = ChangeSet()
+        with conn:
+            StockQueries.record_movement(conn, product_id, "sale", -quantity, reference_id=order_id,
+                                         changes=changes)
+        changes.publish(conn)
+
+class StockQueries:
+    @staticmethod
+    def record_movement(conn: sqlite3.Connection, product_id: int, movement_type: str,
+                        quantity: int, reference_id: Optional[int] = None,
+                        note: Optional[str] = None, *, changes: ChangeSet) -> int:
+        """
+        Append a movement to the ledger and apply it to the materialized
+        stock_quantity. Does not commit, so callers can group it with the
+        rest of their transaction, and publish ``changes`` after committing;
+        they include a "low_stock" event when the movement crosses the
+        product's reorder point.
+        """
+        if movement_type not in MOVEMENT_TYPES:
+            raise ValueError(f"Unknown stock movement type: {movement_type}")
+
         cursor = conn.cursor()
         cursor.execute("""
-            UPDATE products 
-            SET stock_quantity = stock_quantity - ?
+            UPDATE products
+            SET stock_quantity = stock_quantity + ?
             WHERE product_id = ?
+            RETURNING stock_quantity, reorder_point
         """, (quantity, product_id))
-        conn.commit()
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Product {product_id} not found")
+        new_quantity, reorder_point = row[0], row[1]
+        changes.add("product", product_id, UPDATE)
+        changes.low_stock(product_id, new_quantity - quantity <= reorder_point, new_quantity <= reorder_point)
+
+        cursor.execute("""
+            INSERT INTO stock_movements (product_id, movement_type, quantity, reference_id, note)
+            VALUES (?, ?, ?, ?, ?)
+        """, (product_id, movement_type, quantity, reference_id, note))
+        movement_id = cursor.lastrowid
+        record_stock_change(cursor, product_id, quantity)
+        return movement_id
+
+    @staticmethod
+    def receive_stock(conn: sqlite3.Connection, product_id: int, quantity: int,
+                      note: Optional[str] = None) -> int:
+        """Record a shipment arriving"""
+        if quantity <= 0:
+            raise ValueError("Received quantity must be positive")
+        changes = ChangeSet()
+        with conn:
+            movement_id = StockQueries.record_movement(conn, product_id, "receipt", quantity, note=note,
+                                                       changes=changes)
+        changes.publish(conn)
+        return movement_id
+
+    @staticmethod
+    def get_movements(conn: sqlite3.Connection, product_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM stock_movements
+            WHERE product_id = ?
+            ORDER BY movement_id DESC
+            LIMIT ?
+        """, (product_id, limit))
+        return cursor.fetchall()
+
+    @staticmethod
+    def stock_as_of(conn: sqlite3.Connection, product_id: int, as_of: datetime) -> int:
+        """
+        Stock on hand for a product at a point in time (UTC), starting from
+        the latest checkpoint before it instead of replaying all history.
+        """
+        as_of_text = as_of.strftime("%Y-%m-%d %H:%M:%S")
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT quantity, last_movement_id FROM stock_checkpoints
+            WHERE product_id = ? AND recorded_at <= ?
+            ORDER BY last_movement_id DESC
+            LIMIT 1
+        """, (product_id, as_of_text))
+        checkpoint = cursor.fetchone()
+        base_quantity, after_movement_id = (checkpoint[0], checkpoint[1]) if checkpoint else (0, 0)
+
+        cursor.execute("""
+            SELECT COALESCE(SUM(quantity), 0) FROM stock_movements
+            WHERE product_id = ? AND movement_id > ? AND created_at <= ?
+        """, (product_id, after_movement_id, as_of_text))
+        return base_quantity + cursor.fetchone()[0]
+
+    @staticmethod
+    def create_checkpoints(conn: sqlite3.Connection) -> int:
+        """Checkpoint every product with movements since its last checkpoint"""
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO stock_checkpoints (product_id, quantity, last_movement_id, recorded_at)
+                SELECT m.product_id,
+                       COALESCE((SELECT c.quantity FROM stock_checkpoints c
+                                 WHERE c.product_id = m.product_id
+                                 ORDER BY c.last_movement_id DESC LIMIT 1), 0)
+                       + SUM(m.quantity),
+                       MAX(m.movement_id),
+                       MAX(m.created_at)
+                FROM stock_movements m
+                WHERE m.movement_id > (SELECT COALESCE(MAX(last_movement_id), 0) FROM stock_checkpoints)
+                GROUP BY m.product_id
+            """)
+            return cursor.rowcount
+
+    @staticmethod
+    def reconcile(conn: sqlite3.Connection, after_movement_id: int = 0) -> Tuple[List[Tuple[int, int, int]], int]:
+        """
+        Compare materialized stock_quantity with the ledger.
+
+        Only products with movements after ``after_movement_id`` are checked,
+        or every product when it is 0.
+
+        Returns:
+            tuple: (list of (product_id, stock_quantity, ledger_quantity)
+                    mismatches, highest movement ID covered)
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements")
+        high_water = cursor.fetchone()[0]
+
+        product_filter = ""
+        params: Tuple = ()
+        if after_movement_id:
+            product_filter = """
+                WHERE p.product_id IN (SELECT product_id FROM stock_movements
+                                       WHERE movement_id > ? AND movement_id <= ?)
+            """
+            params = (after_movement_id, high_water)
+
+        cursor.execute(f"""
+            SELECT product_id, stock_quantity, ledger_quantity FROM (
+                SELECT p.product_id, p.stock_quantity, {LEDGER_QUANTITY_SQL} AS ledger_quantity
+                FROM products p
+                {product_filter}
+            )
+            WHERE stock_quantity != ledger_quantity
+        """, params)
+        mismatches = [tuple(row) for row in cursor.fetchall()]
+        return mismatches, high_water
+
+    @staticmethod
+    def top_movers(conn: sqlite3.Connection, since: datetime, limit: int = 5) -> List[tuple]:
+        """
+        Best-selling products since ``since`` (UTC) by units sold, as
+        (product_id, name, units) rows. Only ledger rows in the date range
+        are read.
+        """
+        return fetch_tuples(conn, """
+            SELECT m.product_id, p.name, -SUM(m.quantity) AS units
+            FROM stock_movements m
+            JOIN products p ON p.product_id = m.product_id
+            WHERE m.created_at >= ? AND m.movement_type = 'sale'
+            GROUP BY +m.product_id  -- Keeps the planner on the created_at range, not a product-order scan
+            ORDER BY units DESC
+            LIMIT ?
+        """, (since.strftime("%Y-%m-%d %H:%M:%S"), limit))
+
+class ReservationQueries:
+    """
+    Time-limited holds on stock for orders still being built.
+
+    Every check-and-write is a single conditional statement, so concurrent
+    carts cannot both claim the last units and no write lock is held while
+    the user is deciding.
+    """
+
+    DEFAULT_TTL_SECONDS = 15 * 60
+
+    # Reserved quantity still held for product ?, optionally ignoring cart ?
+    LIVE_RESERVED_SQL = """
+        COALESCE((SELECT SUM(r.quantity) FROM stock_reservations r
+                  WHERE r.product_id = ? AND r.expires_at > datetime('now')
+                    AND (? IS NULL OR r.cart_id != ?)), 0)
+    """
+
+    @staticmethod
+    def available_to_promise(conn: sqlite3.Connection, product_id: int,
+                             exclude_cart: Optional[str] = None) -> int:
+        """On-hand stock minus live reservations (other than ``exclude_cart``'s)"""
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT stock_quantity - {ReservationQueries.LIVE_RESERVED_SQL}
+            FROM products WHERE product_id = ?
+        """, (product_id, exclude_cart, exclude_cart, product_id))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Product {product_id} not found")
+        return row[0]
+
+    @staticmethod
+    def reserve(conn: sqlite3.Connection, cart_id: str, product_id: int, quantity: int,
+                ttl_seconds: int = DEFAULT_TTL_SECONDS) -> int:
+        """
+        Hold ``quantity`` units for ``cart_id``.
+
+        Raises:
+            InsufficientStockError: if fewer units are available to promise
+        """
+        if quantity <= 0:
+            raise ValueError("Reserved quantity must be positive")
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT INTO stock_reservations (cart_id, product_id, quantity, expires_at)
+                SELECT ?, ?, ?, datetime('now', ?)
+                WHERE (SELECT stock_quantity FROM products WHERE product_id = ?)
+                      - {ReservationQueries.LIVE_RESERVED_SQL} >= ?
+            """, (cart_id, product_id, quantity, f"+{int(ttl_seconds)} seconds",
+                  product_id, product_id, None, None, quantity))
+            if cursor.rowcount == 0:
+                raise InsufficientStockError(
+                    product_id, quantity, ReservationQueries.available_to_promise(conn, product_id)
+                )
+            return cursor.lastrowid
+
+    @staticmethod
+    def extend_cart(conn: sqlite3.Connection, cart_id: str,
+                    ttl_seconds: int = DEFAULT_TTL_SECONDS) -> int:
+        """Push back the expiry of a cart's live reservations; returns how many were kept"""
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE stock_reservations SET expires_at = datetime('now', ?)
+                WHERE cart_id = ? AND expires_at > datetime('now')
+            """, (f"+{int(ttl_seconds)} seconds", cart_id))
+            return cursor.rowcount
+
+    @staticmethod
+    def release_cart(conn: sqlite3.Connection, cart_id: str) -> int:
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM stock_reservations WHERE cart_id = ?", (cart_id,))
+            return cursor.rowcount
+
+    @staticmethod
+    def release_expired(conn: sqlite3.Connection) -> int:
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM stock_reservations WHERE expires_at <= datetime('now')")
+            return cursor.rowcount
 
 class SupplierQueries:
     @staticmethod
@@ -114,43 +557,42 @@ class SupplierQueries:
         """, (supplier.name, supplier.contact_person, supplier.email, 
               supplier.phone, supplier.address))
         conn.commit()
+        change_bus.publish("supplier", cursor.lastrowid, INSERT)
         return cursor.lastrowid
     
     @staticmethod
-    def get_all_suppliers(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM suppliers")
-        return cursor.fetchall()
+    def get_all_suppliers(conn: sqlite3.Connection) -> List[Supplier]:
+        return fetch_all(conn, Supplier, "SELECT * FROM suppliers")
 
     @staticmethod
-    def update_supplier(conn: sqlite3.Connection, supplier: Supplier) -> None:
+    def update_supplier(conn: sqlite3.Connection, supplier: Supplier) -> int:
+        """Update a supplier if it is still at ``supplier.version``; returns the new version"""
         cursor = conn.cursor()
         cursor.execute("""
             UPDATE suppliers 
             SET name = ?, contact_person = ?, email = ?, 
-                phone = ?, address = ?
-            WHERE supplier_id = ?
+                phone = ?, address = ?, version = version + 1
+            WHERE supplier_id = ? AND version = ?
         """, (supplier.name, supplier.contact_person, supplier.email,
-              supplier.phone, supplier.address, supplier.supplier_id))
+              supplier.phone, supplier.address, supplier.supplier_id,
+              supplier.version))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            _raise_missing_or_conflict(cursor, "supplier", "suppliers", "supplier_id", supplier.supplier_id)
         conn.commit()
+        change_bus.publish("supplier", supplier.supplier_id, UPDATE)
+        return supplier.version + 1
 
     @staticmethod
     def delete_supplier(conn: sqlite3.Connection, supplier_id: int) -> None:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM suppliers WHERE supplier_id = ?", (supplier_id,))
         conn.commit()
+        change_bus.publish("supplier", supplier_id, DELETE)
 
     @staticmethod
-    def get_supplier_by_id(conn: sqlite3.Connection, supplier_id: int) -> Optional[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM suppliers WHERE supplier_id = ?", (supplier_id,))
-        return cursor.fetchone()
-
-    @staticmethod
-    def get_all_suppliers(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM suppliers")
-        return cursor.fetchall()
+    def get_supplier_by_id(conn: sqlite3.Connection, supplier_id: int) -> Optional[Supplier]:
+        return fetch_one(conn, Supplier, "SELECT * FROM suppliers WHERE supplier_id = ?", (supplier_id,))
 
 class OrderQueries:
     @staticmethod
@@ -159,24 +601,264 @@ class OrderQueries:
         cursor.execute("""
             INSERT INTO orders (user_id, status, total_amount)
             VALUES (?, ?, ?)
-        """, (order.user_id, order.status, float(order.total_amount)))
+        """, (order.user_id, order.status, order.total_amount.cents))
+        order_id = cursor.lastrowid
+        OrderQueries._record_status_changes(cursor, [(order_id, None, order.status, order.user_id)])
         conn.commit()
-        return cursor.lastrowid
+        change_bus.publish("order", order_id, INSERT)
+        return order_id
 
     @staticmethod
-    def get_all_orders(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM orders ORDER BY order_date DESC")
-        return cursor.fetchall()
+    def place_order(conn: sqlite3.Connection, order: Order, items: List[OrderItem],
+                    cart_id: Optional[str] = None) -> int:
+        """
+        Create an order, its line items and the matching sale movements in one
+        transaction, consuming the reservations held by ``cart_id``.
+
+        Raises:
+            InsufficientStockError: if a line exceeds the stock not reserved by other carts
+        """
+        changes = ChangeSet()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO orders (user_id, status, total_amount)
+                VALUES (?, ?, ?)
+            """, (order.user_id, order.status, order.total_amount.cents))
+            order_id = cursor.lastrowid
+            OrderQueries._record_status_changes(cursor, [(order_id, None, order.status, order.user_id)])
+
+            # The insert took the write lock, so these checks cannot go stale before commit
+            requested = {}
+            for item in items:
+                requested[item.product_id] = requested.get(item.product_id, 0) + item.quantity
+            for product_id, quantity in requested.items():
+                available = ReservationQueries.available_to_promise(conn, product_id, exclude_cart=cart_id)
+                if quantity > available:
+                    raise InsufficientStockError(product_id, quantity, available)
+            if cart_id is not None:
+                cursor.execute("DELETE FROM stock_reservations WHERE cart_id = ?", (cart_id,))
+
+            cursor.executemany("""
+                INSERT INTO order_items (order_id, product_id, quantity, unit_price)
+                VALUES (?, ?, ?, ?)
+            """, [(order_id, item.product_id, item.quantity, item.unit_price.cents)
+                  for item in items])
+
+            for item in items:
+                StockQueries.record_movement(
+                    conn, item.product_id, "sale", -item.quantity, reference_id=order_id, changes=changes
+                )
+            record_order_sales(cursor, order_id)
+        changes.add("order", order_id, INSERT)
+        changes.publish(conn)
+        return order_id
+
+    @staticmethod
+    def get_order_items(conn: sqlite3.Connection, order_id: int) -> List[OrderItem]:
+        items = fetch_all(conn, OrderItem, "SELECT * FROM main.order_items WHERE order_id = ?", (order_id,))
+        if not items and archived_before(conn) is not None:
+            items = fetch_all(conn, OrderItem, f"""
+                SELECT * FROM {ARCHIVE_SCHEMA}.order_items WHERE order_id = ?
+            """, (order_id,))
+        return items
+
+    @staticmethod
+    def get_order_by_id(conn: sqlite3.Connection, order_id: int) -> Optional[Order]:
+        return fetch_one(conn, Order, "SELECT * FROM orders WHERE order_id = ?", (order_id,))
+
+    @staticmethod
+    def get_all_orders(conn: sqlite3.Connection) -> List[Order]:
+        """Orders in the hot database; archived orders are only read by date range"""
+        return fetch_all(conn, Order, "SELECT * FROM main.orders ORDER BY order_date DESC")
+
+    @staticmethod
+    def get_orders_between(conn: sqlite3.Connection, start: datetime, end: datetime) -> List[Order]:
+        """
+        Orders placed in [start, end) (UTC), newest first. The archive is
+        only read when the range reaches back past the last archive cutoff.
+        """
+        params = (start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S"))
+        sql = "SELECT * FROM main.orders WHERE order_date >= ? AND order_date < ?"
+
+        cutoff = archived_before(conn)
+        if cutoff is not None and params[0] < cutoff:
+            sql += f"""
+                UNION ALL
+                SELECT * FROM {ARCHIVE_SCHEMA}.orders WHERE order_date >= ? AND order_date < ?
+            """
+            params += params
+        return fetch_all(conn, Order, sql + " ORDER BY order_date DESC", params)
+
+    @staticmethod
+    def update_order_status(conn: sqlite3.Connection, order_id: int, status: str,
+                            expected_version: Optional[int] = None,
+                            changed_by: Optional[int] = None) -> None:
+        """Set an order's status, optionally only if it is still at ``expected_version``"""
+        OrderQueries.transition_orders(
+            conn, [order_id], status, changed_by,
+            expected_versions=None if expected_version is None else {order_id: expected_version}
+        )
+
+    @staticmethod
+    def transition_orders(conn: sqlite3.Connection, order_ids: Iterable[int], status: str,
+                          changed_by: Optional[int] = None,
+                          expected_versions: Optional[Dict[int, int]] = None) -> int:
+        """
+        Move every order in ``order_ids`` to ``status`` in one transaction,
+        recording each change in order_status_history. Nothing changes unless
+        every order can make the transition.
+
+        Returns:
+            int: number of orders updated
+
+        Raises:
+            InvalidTransitionError: if any order's current status does not allow it
+            ConflictError: if an order changed since it was read
+        """
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Unknown order status: {status}")
+        order_ids = list(dict.fromkeys(order_ids))
+        if not order_ids:
+            return 0
+
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT order_id, status, version FROM orders
+                WHERE order_id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(order_ids),))
+            current = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+            missing = [order_id for order_id in order_ids if order_id not in current]
+            if missing:
+                raise ValueError(f"Order {missing[0]} not found")
+            for order_id, expected in (expected_versions or {}).items():
+                if order_id in current and current[order_id][1] != expected:
+                    raise ConflictError("order", order_id)
+            invalid = {
+                order_id: from_status for order_id, (from_status, _) in current.items()
+                if status not in ORDER_TRANSITIONS.get(from_status, ())
+            }
+            if invalid:
+                raise InvalidTransitionError(status, invalid)
+
+            # Guard on the status just read in case another writer got in first
+            cursor.executemany("""
+                UPDATE orders SET status = ?, version = version + 1
+                WHERE order_id = ? AND status = ?
+            """, [(status, order_id, current[order_id][0]) for order_id in order_ids])
+            if cursor.rowcount != len(order_ids):
+                raise ConflictError("order", order_ids[0])
+
+            OrderQueries._record_status_changes(
+                cursor, [(order_id, current[order_id][0], status, changed_by) for order_id in order_ids]
+            )
+
+        for order_id in order_ids:
+            change_bus.publish("order", order_id, UPDATE)
+        return len(order_ids)
 
     @staticmethod
-    def update_order_status(conn: sqlite3.Connection, order_id: int, status: str) -> None:
+    def transition_orders_matching(conn: sqlite3.Connection, status: str,
+                                   from_status: Optional[str] = None,
+                                   placed_before: Optional[datetime] = None,
+                                   changed_by: Optional[int] = None) -> int:
+        """
+        Move every order that may transition to ``status`` to it, optionally
+        only those currently in ``from_status`` or placed before
+        ``placed_before`` (UTC). Returns the number of orders updated.
+        """
+        sources = [source for source, targets in ORDER_TRANSITIONS.items() if status in targets]
+        if from_status is not None:
+            sources = [source for source in sources if source == from_status]
+        if not sources:
+            return 0
+
         cursor = conn.cursor()
-        cursor.execute("UPDATE orders SET status = ? WHERE order_id = ?", (status, order_id))
-        conn.commit()
+        cursor.execute(f"""
+            SELECT order_id FROM orders
+            WHERE status IN ({", ".join("?" * len(sources))})
+              AND (? IS NULL OR order_date < ?)
+        """, (*sources, *(2 * [placed_before.strftime("%Y-%m-%d %H:%M:%S") if placed_before else None])))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        return OrderQueries.transition_orders(conn, order_ids, status, changed_by)
+
+    @staticmethod
+    def _record_status_changes(cursor: sqlite3.Cursor, changes: List[Tuple]) -> None:
+        """Append (order_id, from_status, to_status, changed_by) rows to the history"""
+        cursor.executemany("""
+            INSERT INTO order_status_history (order_id, from_status, to_status, changed_by)
+            VALUES (?, ?, ?, ?)
+        """, changes)
+
+    @staticmethod
+    def get_status_history(conn: sqlite3.Connection, order_id: int) -> List[OrderStatusChange]:
+        return fetch_all(conn, OrderStatusChange, """
+            SELECT * FROM order_status_history
+            WHERE order_id = ?
+            ORDER BY changed_at, history_id
+        """, (order_id,))
+
+    @staticmethod
+    def time_in_status(conn: sqlite3.Connection, since: Optional[datetime] = None) -> List[tuple]:
+        """
+        How long orders spend in each status, for status entries made since
+        ``since`` (UTC). Orders still in a status count up to now.
+
+        Returns:
+            list: (status, entries, average hours, longest hours, orders currently in it)
+        """
+        # Every timestamp sorts after "", so no ``since`` still reads the entries through the index
+        since_text = since.strftime("%Y-%m-%d %H:%M:%S") if since else ""
+        return fetch_tuples(conn, """
+            WITH entries AS MATERIALIZED (
+                -- Each entry's successor is looked up through the order's index entries,
+                -- rather than windowing the whole history
+                SELECT h.to_status,
+                       julianday(h.changed_at) AS entered,
+                       (SELECT MIN(n.changed_at) FROM order_status_history n
+                        WHERE n.order_id = h.order_id AND n.changed_at >= h.changed_at
+                          AND (n.changed_at > h.changed_at OR n.history_id > h.history_id)) AS left_at
+                FROM order_status_history h
+                WHERE h.changed_at >= ?
+            )
+            SELECT to_status,
+                   COUNT(*),
+                   AVG((julianday(COALESCE(left_at, CURRENT_TIMESTAMP)) - entered) * 24),
+                   MAX((julianday(COALESCE(left_at, CURRENT_TIMESTAMP)) - entered) * 24),
+                   SUM(left_at IS NULL)
+            FROM entries
+            GROUP BY to_status
+        """, (since_text,))
 
     @staticmethod
     def delete_order(conn: sqlite3.Connection, order_id: int) -> None:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
-        conn.commit()
+        """
+        Delete an order with its items and history. Stock it took is put
+        back through the ledger and its sales are removed from the daily
+        summary, in the same transaction.
+        """
+        changes = ChangeSet()
+        with conn:
+            cursor = conn.cursor()
+            # Net of the order's sales and any returns already made, for products that still exist
+            cursor.execute("""
+                SELECT m.product_id, -SUM(m.quantity) FROM stock_movements m
+                JOIN products p ON p.product_id = m.product_id
+                WHERE m.reference_id = ? AND m.movement_type IN ('sale', 'return')
+                GROUP BY m.product_id
+                HAVING SUM(m.quantity) != 0
+            """, (order_id,))
+            for product_id, quantity in cursor.fetchall():
+                StockQueries.record_movement(
+                    conn, product_id, "return", quantity, reference_id=order_id,
+                    note=f"Order {order_id} deleted", changes=changes
+                )
+            remove_order_sales(cursor, order_id)
+
+            cursor.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
+            cursor.execute("DELETE FROM order_status_history WHERE order_id = ?", (order_id,))
+            cursor.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+        changes.add("order", order_id, DELETE)
+        changes.publish(conn)
@@ -0,0 +1,71 @@
+import dataclasses
+import sqlite3
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type, TypeVar
+from .money import Money
+
+T = TypeVar("T")
+
+# Column converters applied by field type when building model instances
+FIELD_CONVERTERS = {
+    Money: Money,
+}
+
+
+@lru_cache(maxsize=None)
+def build_row_factory(model: Type[T], columns: Tuple[str, ...]) -> Callable[[sqlite3.Cursor, tuple], T]:
+    """
+    Generate a sqlite3 row factory that builds ``model`` instances directly
+    from rows with the given column names.
+
+    The factory is compiled once per (model, column list), like
+    collections.namedtuple, so mapping a row is a single positional
+    constructor call with no per-row name lookups. Model fields that are not
+    selected are passed as None.
+    """
+    namespace = {"_model": model}
+    arguments = []
+    for field in dataclasses.fields(model):
+        if field.name not in columns:
+            arguments.append("None")
+            continue
+
+        value = f"row[{columns.index(field.name)}]"
+        converter = FIELD_CONVERTERS.get(field.type)
+        if converter is not None:
+            converter_name = f"_convert_{field.name}"
+            namespace[converter_name] = converter
+            value = f"(None if {value} is None else {converter_name}({value}))"
+        arguments.append(value)
+
+    source = f"def factory(cursor, row):\n    return _model({', '.join(arguments)})\n"
+    exec(source, namespace)
+    return namespace["factory"]
+
+
+def _execute(conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> sqlite3.Cursor:
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    return cursor
+
+
+def fetch_one(conn: sqlite3.Connection, model: Type[T], sql: str, params: Sequence[Any] = ()) -> Optional[T]:
+    cursor = _execute(conn, sql, params)
+    columns = tuple(column[0] for column in cursor.description)
+    cursor.row_factory = build_row_factory(model, columns)
+    return cursor.fetchone()
+
+
+def fetch_all(conn: sqlite3.Connection, model: Type[T], sql: str, params: Sequence[Any] = ()) -> List[T]:
+    cursor = _execute(conn, sql, params)
+    columns = tuple(column[0] for column in cursor.description)
+    cursor.row_factory = build_row_factory(model, columns)
+    return cursor.fetchall()
+
+
+def fetch_tuples(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+    """Plain tuples for list views, skipping sqlite3.Row entirely"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    return cursor.fetchall()
@@ -0,0 +1,312 @@
+"""
+Pre-aggregated daily sales and stock figures per category and supplier.
+
+daily_summary is kept current by the transactions that place orders and
+move stock, so reports never scan orders or products. Usage for backfill:
+
+    python -m database.summary --rebuild [--db inventory.db]
+"""
+import argparse
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from .archive import ARCHIVE_SCHEMA, is_attached
+
+def record_stock_change(cursor: sqlite3.Cursor, product_id: int, quantity: int) -> None:
+    """
+    Apply a stock movement of ``quantity`` units to today's closing stock for
+    the product's category/supplier group. Call after the movement has been
+    applied to the product. Only the group's first change of the day sums
+    the whole group, to start today's row.
+    """
+    cursor.execute("""
+        UPDATE daily_summary
+        SET stock_units = stock_units + ?, stock_value = stock_value + ? * p.price
+        FROM products p
+        WHERE p.product_id = ?
+          AND daily_summary.day = date('now')
+          AND daily_summary.category = p.category
+          AND daily_summary.supplier_id = COALESCE(p.supplier_id, 0)
+    """, (quantity, quantity, product_id))
+    if cursor.rowcount == 0:
+        cursor.execute("SELECT category, supplier_id FROM products WHERE product_id = ?", (product_id,))
+        record_group_stock(cursor, *cursor.fetchone())
+
+
+def record_group_stock(cursor: sqlite3.Cursor, category: str, supplier_id: Optional[int]) -> None:
+    """
+    Recompute today's closing stock for a category/supplier group from its
+    products. Needed when products join or leave the group or change price,
+    which a movement delta cannot express.
+    """
+    cursor.execute("""
+        INSERT INTO daily_summary (day, category, supplier_id, stock_units, stock_value)
+        SELECT date('now'), ?, ?, COALESCE(SUM(stock_quantity), 0), COALESCE(SUM(stock_quantity * price), 0)
+        FROM products WHERE category = ? AND supplier_id IS ?
+        ON CONFLICT (day, category, supplier_id) DO UPDATE
+        SET stock_units = excluded.stock_units, stock_value = excluded.stock_value
+    """, (category, supplier_id or 0, category, supplier_id))
+
+
+def record_order_sales(cursor: sqlite3.Cursor, order_id: int) -> None:
+    """
+    Add an order's revenue, units and order count to today's rows. Call
+    after its sale movements so the group rows already hold closing stock.
+    """
+    cursor.execute("""
+        INSERT INTO daily_summary (day, category, supplier_id, revenue, units_sold, order_count)
+        SELECT date('now'), p.category, COALESCE(p.supplier_id, 0),
+               SUM(i.quantity * i.unit_price), SUM(i.quantity), 1
+        FROM order_items i
+        JOIN products p ON p.product_id = i.product_id
+        WHERE i.order_id = ?
+        GROUP BY p.category, COALESCE(p.supplier_id, 0)
+        ON CONFLICT (day, category, supplier_id) DO UPDATE
+        SET revenue = revenue + excluded.revenue,
+            units_sold = units_sold + excluded.units_sold,
+            order_count = order_count + excluded.order_count
+    """, (order_id,))
+
+
+def remove_order_sales(cursor: sqlite3.Cursor, order_id: int) -> None:
+    """
+    Take a deleted order's revenue, units and order count back out of the
+    day it was placed. Call before its items are deleted.
+    """
+    cursor.execute("""
+        UPDATE daily_summary
+        SET revenue = revenue - d.order_revenue,
+            units_sold = units_sold - d.order_units,
+            order_count = order_count - 1
+        FROM (
+            SELECT date(o.order_date) AS day, p.category, COALESCE(p.supplier_id, 0) AS supplier_id,
+                   SUM(i.quantity * i.unit_price) AS order_revenue, SUM(i.quantity) AS order_units
+            FROM main.orders o
+            JOIN main.order_items i ON i.order_id = o.order_id
+            JOIN products p ON p.product_id = i.product_id
+            WHERE o.order_id = ?
+            GROUP BY p.category, COALESCE(p.supplier_id, 0)
+        ) AS d
+        WHERE daily_summary.day = d.day
+          AND daily_summary.category = d.category
+          AND daily_summary.supplier_id = d.supplier_id
+    """, (order_id,))
+
+
+def fill_gaps(conn: sqlite3.Connection, through: Optional[date] = None) -> int:
+    """
+    Carry each group's closing stock forward to every day up to ``through``
+    (today by default) that has no row yet, so every day has one row per
+    group. Idempotent; returns the number of rows added.
+    """
+    through = through or datetime.utcnow().date()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT MIN(last_day) FROM (
+            SELECT MAX(day) AS last_day FROM daily_summary GROUP BY category, supplier_id
+        )
+    """)
+    stalest = cursor.fetchone()[0]
+    if stalest is None:
+        return 0
+
+    added = 0
+    day = date.fromisoformat(stalest) + timedelta(days=1)
+    with conn:
+        while day <= through:
+            cursor.execute("""
+                INSERT INTO daily_summary (day, category, supplier_id, stock_units, stock_value)
+                SELECT ?, s.category, s.supplier_id, s.stock_units, s.stock_value
+                FROM daily_summary s
+                WHERE s.day = (SELECT MAX(t.day) FROM daily_summary t
+                               WHERE t.category = s.category AND t.supplier_id = s.supplier_id
+                                 AND t.day < ?)
+                ON CONFLICT (day, category, supplier_id) DO NOTHING
+            """, (day.isoformat(), day.isoformat()))
+            added += cursor.rowcount
+            day += timedelta(days=1)
+    return added
+
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """
+    Recompute daily_summary from orders (including archived ones) and the
+    stock ledger. Products are grouped by their current category and
+    supplier, and past stock is current stock minus later movements, valued
+    at current prices. Every group gets a row for each day from its first
+    movement or sale through today. Returns the row count.
+    """
+    order_sources = ["SELECT o.order_id, o.order_date, i.product_id, i.quantity, i.unit_price "
+                     "FROM main.orders o JOIN main.order_items i ON i.order_id = o.order_id"]
+    if is_attached(conn):
+        order_sources.append(
+            f"SELECT o.order_id, o.order_date, i.product_id, i.quantity, i.unit_price "
+            f"FROM {ARCHIVE_SCHEMA}.orders o JOIN {ARCHIVE_SCHEMA}.order_items i ON i.order_id = o.order_id"
+        )
+
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM daily_summary")
+        cursor.execute(f"""
+            WITH sales AS (
+                SELECT date(s.order_date) AS day, p.category, COALESCE(p.supplier_id, 0) AS supplier_id,
+                       SUM(s.quantity * s.unit_price) AS revenue,
+                       SUM(s.quantity) AS units_sold,
+                       COUNT(DISTINCT s.order_id) AS order_count
+                FROM ({" UNION ALL ".join(order_sources)}) s
+                JOIN products p ON p.product_id = s.product_id
+                GROUP BY day, p.category, COALESCE(p.supplier_id, 0)
+            ),
+            current_stock AS (
+                SELECT category, COALESCE(supplier_id, 0) AS supplier_id,
+                       SUM(stock_quantity) AS units, SUM(stock_quantity * price) AS value
+                FROM products
+                GROUP BY category, COALESCE(supplier_id, 0)
+            ),
+            stock_deltas AS (
+                SELECT day, category, supplier_id, SUM(units) AS units, SUM(value) AS value
+                FROM (
+                    SELECT date(m.created_at) AS day, p.category, COALESCE(p.supplier_id, 0) AS supplier_id,
+                           m.quantity AS units, m.quantity * p.price AS value
+                    FROM stock_movements m
+                    JOIN products p ON p.product_id = m.product_id
+                    UNION ALL
+                    SELECT date('now'), category, supplier_id, 0, 0 FROM current_stock
+                    UNION ALL
+                    -- Days with sales but no movements still need their closing stock
+                    SELECT day, category, supplier_id, 0, 0 FROM sales
+                )
+                GROUP BY day, category, supplier_id
+            ),
+            -- Walk back from today's stock, so the latest row always matches products
+            closing AS (
+                SELECT d.day, d.category, d.supplier_id,
+                       c.units - COALESCE(SUM(d.units) OVER later, 0) AS stock_units,
+                       c.value - COALESCE(SUM(d.value) OVER later, 0) AS stock_value
+                FROM stock_deltas d
+                JOIN current_stock c ON c.category = d.category AND c.supplier_id = d.supplier_id
+                WINDOW later AS (PARTITION BY d.category, d.supplier_id ORDER BY d.day DESC
+                                 ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+            )
+            INSERT INTO daily_summary (day, category, supplier_id, revenue, units_sold,
+                                       order_count, stock_units, stock_value)
+            SELECT day, category, supplier_id,
+                   SUM(revenue), SUM(units_sold), SUM(order_count), SUM(stock_units), SUM(stock_value)
+            FROM (
+                SELECT day, category, supplier_id, revenue, units_sold, order_count,
+                       0 AS stock_units, 0 AS stock_value
+                FROM sales
+                UNION ALL
+                SELECT day, category, supplier_id, 0, 0, 0, stock_units, stock_value
+                FROM closing
+            )
+            GROUP BY day, category, supplier_id
+        """)
+
+        # Rows so far only cover days with activity; carry each group's close through the days between
+        cursor.execute("SELECT MIN(day) FROM daily_summary")
+        first_day = cursor.fetchone()[0]
+        if first_day is not None:
+            day = date.fromisoformat(first_day) + timedelta(days=1)
+            through = datetime.utcnow().date()
+            while day <= through:
+                cursor.execute("""
+                    INSERT INTO daily_summary (day, category, supplier_id, stock_units, stock_value)
+                    SELECT ?, category, supplier_id, stock_units, stock_value
+                    FROM daily_summary WHERE day = ?
+                    ON CONFLICT (day, category, supplier_id) DO NOTHING
+                """, (day.isoformat(), (day - timedelta(days=1)).isoformat()))
+                day += timedelta(days=1)
+
+    return conn.execute("SELECT COUNT(*) FROM daily_summary").fetchone()[0]
+
+
+def monthly_trend(conn: sqlite3.Connection, months: int = 12, category: Optional[str] = None,
+                  supplier_id: Optional[int] = None) -> List[tuple]:
+    """
+    Revenue, units sold, orders and month-end stock value for the last
+    ``months`` calendar months, optionally for one category and/or supplier.
+
+    Returns:
+        list: (YYYY-MM, revenue cents, units sold, orders, closing stock units,
+               closing stock value cents) tuples, oldest first
+    """
+    today = datetime.utcnow().date()
+    first_month = today.replace(day=1)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        WITH rows AS (
+            SELECT * FROM daily_summary
+            WHERE day >= ?
+              AND (? IS NULL OR category = ?)
+              AND (? IS NULL OR supplier_id = ?)
+        ),
+        -- With MAX(), SQLite takes the bare stock columns from each group's latest row in the
+        -- month, so a group without a row on the month's last day still counts its close
+        group_months AS (
+            SELECT substr(day, 1, 7) AS month, MAX(day), stock_units, stock_value,
+                   SUM(revenue) AS revenue, SUM(units_sold) AS units_sold, SUM(order_count) AS order_count
+            FROM rows
+            GROUP BY month, category, supplier_id
+        )
+        SELECT month, SUM(revenue), SUM(units_sold), SUM(order_count), SUM(stock_units), SUM(stock_value)
+        FROM group_months
+        GROUP BY month
+        ORDER BY month
+    """, (first_month.isoformat(), category, category, supplier_id, supplier_id))
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def day_totals(conn: sqlite3.Connection, day: date) -> tuple:
+    """
+    Sales on ``day`` and closing stock across all groups. Groups without a
+    row for ``day`` yet (fill_gaps has not run since midnight) contribute
+    their previous day's close. Only two days of rows are read.
+
+    Returns:
+        tuple: (revenue cents, units sold, orders, stock units, stock value cents)
+    """
+    today, previous = day.isoformat(), (day - timedelta(days=1)).isoformat()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COALESCE(SUM(CASE WHEN day = ? THEN revenue END), 0),
+               COALESCE(SUM(CASE WHEN day = ? THEN units_sold END), 0),
+               COALESCE(SUM(CASE WHEN day = ? THEN order_count END), 0),
+               COALESCE(SUM(stock_units), 0),
+               COALESCE(SUM(stock_value), 0)
+        FROM daily_summary s
+        WHERE s.day = ?
+           OR (s.day = ? AND NOT EXISTS (SELECT 1 FROM daily_summary t
+                                         WHERE t.day = ? AND t.category = s.category
+                                           AND t.supplier_id = s.supplier_id))
+    """, (today, today, today, today, previous, today))
+    return tuple(cursor.fetchone())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the daily sales and stock summary")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every row from orders and the ledger")
+    parser.add_argument("--months", type=int, default=12, help="months of trend to print")
+    args = parser.parse_args()
+
+    from .database import DatabaseManager
+    db = DatabaseManager(args.db)
+    try:
+        conn = db.get_connection()
+        if args.rebuild:
+            print(f"Rebuilt daily_summary: {rebuild(conn)} rows")
+        else:
+            fill_gaps(conn)
+        for month, revenue, units, orders, _, stock_value in monthly_trend(conn, args.months):
+            print(f"{month}  revenue {(revenue or 0) / 100:>12,.2f}  units {units or 0:>8}  "
+                  f"orders {orders or 0:>6}  stock value {(stock_value or 0) / 100:>12,.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import logging
+import sqlite3
+import threading
+from .queries import ReservationQueries
+
+
+class ReservationSweeper:
+    """
+    Background thread that deletes expired stock reservations.
+
+    Uses its own connection so it never shares a cursor or transaction with
+    the GUI thread; each sweep is one short DELETE.
+    """
+
+    def __init__(self, db_path: str, interval: float = 60.0):
+        self.db_path = db_path
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="reservation-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    released = ReservationQueries.release_expired(conn)
+                    if released:
+                        self.logger.info(f"Released {released} expired stock reservations")
+                except sqlite3.Error as e:
+                    self.logger.error(f"Reservation sweep failed: {e}")
+                self._stop_event.wait(self.interval)
+        finally:
+            conn.close()
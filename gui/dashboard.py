@@ -0,0 +1,172 @@
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from tkinter import ttk
+from typing import List
+from database.events import change_bus
+from database.money import Money
+from database.queries import ProductQueries, StockQueries
+from database.summary import day_totals
+
+@dataclass(frozen=True, slots=True)
+class DashboardKpis:
+    stock_units: int
+    stock_value: Money
+    low_stock: int
+    sales_revenue: Money
+    units_sold: int
+    order_count: int
+    top_movers: List[tuple]  # (product_id, name, units sold)
+    computed_at: datetime
+
+
+def load_kpis(conn: sqlite3.Connection, top_movers_days: int, top_movers_limit: int) -> DashboardKpis:
+    """Read every dashboard figure from daily_summary and indexed ranges"""
+    now = datetime.utcnow()
+    revenue, units_sold, order_count, stock_units, stock_value = day_totals(conn, now.date())
+    return DashboardKpis(
+        stock_units=stock_units,
+        stock_value=Money(stock_value),
+        low_stock=ProductQueries.count_low_stock(conn),
+        sales_revenue=Money(revenue),
+        units_sold=units_sold,
+        order_count=order_count,
+        top_movers=StockQueries.top_movers(conn, now - timedelta(days=top_movers_days), top_movers_limit),
+        computed_at=now,
+    )
+
+
+class DashboardTab(ttk.Frame):
+    """
+    Stock health and sales KPIs.
+
+    Figures are computed on a worker thread with its own connection and
+    handed back through a queue the Tk thread polls. Product and order
+    changes only mark the figures stale; they are recomputed once the burst
+    of changes settles, and not at all while the tab is hidden.
+    """
+
+    TOP_MOVERS_DAYS = 7
+    TOP_MOVERS_LIMIT = 5
+    REFRESH_DELAY_MS = 500
+    RESULT_POLL_MS = 100
+
+    def __init__(self, container, db_path):
+        super().__init__(container)
+        self.db_path = db_path
+        self.stale = True
+        self.worker = None
+        self.results = queue.SimpleQueue()
+        self._pending_refresh = None
+
+        kpi_frame = ttk.Frame(self)
+        kpi_frame.pack(fill='x', padx=10, pady=10)
+        self.kpi_labels = {}
+        for column, (key, title) in enumerate((('stock_value', 'Total Stock Value'),
+                                               ('low_stock', 'Low Stock Products'),
+                                               ('sales', "Today's Sales"),
+                                               ('orders', "Today's Orders"))):
+            box = ttk.LabelFrame(kpi_frame, text=title)
+            box.grid(row=0, column=column, padx=5, sticky='nsew')
+            kpi_frame.columnconfigure(column, weight=1)
+            label = ttk.Label(box, text="-", font=('Helvetica', 16, 'bold'))
+            label.pack(padx=10, pady=(5, 0))
+            detail = ttk.Label(box, text="")
+            detail.pack(padx=10, pady=(0, 5))
+            self.kpi_labels[key] = (label, detail)
+
+        movers_frame = ttk.LabelFrame(self, text=f"Top Movers (last {self.TOP_MOVERS_DAYS} days)")
+        movers_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        self.movers_tree = ttk.Treeview(
+            movers_frame,
+            columns=('ID', 'Name', 'Units'),
+            show='headings',
+            height=self.TOP_MOVERS_LIMIT
+        )
+        self.movers_tree.heading('ID', text='ID')
+        self.movers_tree.heading('Name', text='Name')
+        self.movers_tree.heading('Units', text='Units Sold')
+        self.movers_tree.column('ID', width=50)
+        self.movers_tree.column('Name', width=250)
+        self.movers_tree.column('Units', width=100)
+        self.movers_tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+        self.updated_label = ttk.Label(self, text="")
+        self.updated_label.pack(anchor='e', padx=10, pady=(0, 5))
+
+        # Mapped whenever the notebook shows this tab
+        self.bind('<Map>', self.on_shown)
+        self.unsubscribe_changes = change_bus.subscribe(self.on_data_changed, entities=("product", "order"))
+
+    def on_shown(self, event=None):
+        if self.stale:
+            self.schedule_refresh()
+
+    def on_data_changed(self, event):
+        self.stale = True
+        if self.winfo_ismapped():
+            self.schedule_refresh()
+
+    def schedule_refresh(self):
+        if self._pending_refresh is None:
+            self._pending_refresh = self.after(self.REFRESH_DELAY_MS, self.start_refresh)
+
+    def start_refresh(self):
+        self._pending_refresh = None
+        if self.worker is not None:
+            return  # show_results reschedules while still stale
+        self.stale = False
+        self.worker = threading.Thread(target=self.compute, name="dashboard-kpis", daemon=True)
+        self.worker.start()
+        self.after(self.RESULT_POLL_MS, self.check_results)
+
+    def compute(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            try:
+                self.results.put(load_kpis(conn, self.TOP_MOVERS_DAYS, self.TOP_MOVERS_LIMIT))
+            finally:
+                conn.close()
+        except Exception as e:
+            self.results.put(e)
+
+    def check_results(self):
+        if not self.winfo_exists():
+            return
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            self.after(self.RESULT_POLL_MS, self.check_results)
+            return
+
+        self.worker = None
+        if isinstance(result, Exception):
+            self.stale = True
+            self.updated_label.configure(text=f"Failed to load dashboard: {str(result)}")
+        else:
+            self.show_results(result)
+        if self.stale and self.winfo_ismapped():
+            self.schedule_refresh()
+
+    def show_results(self, kpis: DashboardKpis):
+        self.set_kpi('stock_value', f"${kpis.stock_value}", f"{kpis.stock_units} units on hand")
+        self.set_kpi('low_stock', str(kpis.low_stock), "at or below reorder point")
+        self.set_kpi('sales', f"${kpis.sales_revenue}", f"{kpis.units_sold} units sold")
+        self.set_kpi('orders', str(kpis.order_count), "placed today")
+
+        self.movers_tree.delete(*self.movers_tree.get_children())
+        for product_id, name, units in kpis.top_movers:
+            self.movers_tree.insert('', 'end', values=(product_id, name, units))
+        self.updated_label.configure(text=f"Updated {kpis.computed_at:%Y-%m-%d %H:%M:%S} UTC")
+
+    def set_kpi(self, key, value, detail):
+        label, detail_label = self.kpi_labels[key]
+        label.configure(text=value)
+        detail_label.configure(text=detail)
+
+    def destroy(self):
+        self.unsubscribe_changes()
+        super().destroy()
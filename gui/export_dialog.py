@@ -0,0 +1,159 @@
+import queue
+import threading
+import tkinter as tk
+from datetime import datetime, timedelta
+from tkinter import ttk, filedialog, messagebox
+from database.queries import SupplierQueries
+from utils.export.exporter import ARCHIVED_TABLES, EXPORT_COLUMNS, ExportFilters, export_file
+
+class ExportDialog(tk.Toplevel):
+    """
+    Export a table to CSV or JSON Lines.
+
+    The export runs on a worker thread with its own connection and reads in
+    short pages, so the application stays usable while it runs; the dialog
+    polls for progress.
+    """
+
+    RESULT_POLL_MS = 200
+    FILE_TYPES = {
+        "CSV": (".csv", "CSV files", "*.csv"),
+        "JSON Lines": (".jsonl", "JSON Lines files", "*.jsonl"),
+    }
+
+    def __init__(self, parent, db_connection, db_path, archive_path=None):
+        super().__init__(parent)
+        self.db = db_connection
+        self.db_path = db_path
+        self.archive_path = archive_path
+        self.results = queue.SimpleQueue()
+        self.title("Export Data")
+        self.geometry("420x330")
+        self.transient(parent)
+
+        form = ttk.Frame(self)
+        form.pack(fill='both', expand=True, padx=15, pady=15)
+        form.columnconfigure(1, weight=1)
+
+        self.table = tk.StringVar(value="products")
+        self.file_type = tk.StringVar(value="CSV")
+        self.compress = tk.BooleanVar(value=False)
+        self.category = tk.StringVar()
+        self.supplier = tk.StringVar(value="All")
+        self.start_day = tk.StringVar()
+        self.end_day = tk.StringVar()
+
+        self.suppliers = {"All": None}
+        try:
+            for supplier in SupplierQueries.get_all_suppliers(self.db):
+                self.suppliers[f"{supplier.name} ({supplier.email})"] = supplier.supplier_id
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load suppliers: {str(e)}", parent=self)
+
+        rows = (
+            ("Data:", ttk.Combobox(form, textvariable=self.table, values=list(EXPORT_COLUMNS), state='readonly')),
+            ("Format:", ttk.Combobox(form, textvariable=self.file_type, values=list(self.FILE_TYPES),
+                                     state='readonly')),
+            ("", ttk.Checkbutton(form, text="Compress (gzip)", variable=self.compress)),
+            ("Category:", ttk.Entry(form, textvariable=self.category)),
+            ("Supplier:", ttk.Combobox(form, textvariable=self.supplier, values=list(self.suppliers),
+                                       state='readonly')),
+            ("From (YYYY-MM-DD):", ttk.Entry(form, textvariable=self.start_day)),
+            ("To (YYYY-MM-DD):", ttk.Entry(form, textvariable=self.end_day)),
+        )
+        for row, (label, widget) in enumerate(rows):
+            ttk.Label(form, text=label).grid(row=row, column=0, sticky='w', pady=4)
+            widget.grid(row=row, column=1, sticky='ew', pady=4)
+        self.date_entries = [widget for _, widget in rows[-2:]]
+        self.table.trace_add('write', lambda *args: self.update_date_entries())
+        self.update_date_entries()
+
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.pack(anchor='w', padx=15)
+
+        buttons_frame = ttk.Frame(self)
+        buttons_frame.pack(fill='x', padx=15, pady=10)
+        self.export_button = ttk.Button(buttons_frame, text="Export...", command=self.start_export)
+        self.export_button.pack(side='left', expand=True, padx=5)
+        ttk.Button(buttons_frame, text="Close", command=self.destroy).pack(side='left', expand=True, padx=5)
+
+    def update_date_entries(self):
+        """Date ranges only apply to orders and their items"""
+        state = 'normal' if self.table.get() in ARCHIVED_TABLES else 'disabled'
+        for entry in self.date_entries:
+            entry.configure(state=state)
+
+    def read_filters(self):
+        try:
+            start = datetime.strptime(self.start_day.get().strip(), "%Y-%m-%d") if self.start_day.get().strip() else None
+            last = datetime.strptime(self.end_day.get().strip(), "%Y-%m-%d") if self.end_day.get().strip() else None
+        except ValueError:
+            raise ValueError("Dates must be in YYYY-MM-DD format") from None
+        if self.table.get() not in ARCHIVED_TABLES:
+            start = last = None
+        return ExportFilters(
+            start=start,
+            end=last + timedelta(days=1) if last else None,  # The "to" day is included
+            category=self.category.get().strip() or None,
+            supplier_id=self.suppliers.get(self.supplier.get()),
+        )
+
+    def start_export(self):
+        try:
+            filters = self.read_filters()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self)
+            return
+
+        extension, description, pattern = self.FILE_TYPES[self.file_type.get()]
+        if self.compress.get():
+            extension += ".gz"
+            pattern += ".gz"
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Data",
+            initialfile=f"{self.table.get()}{extension}",
+            defaultextension=extension,
+            filetypes=[(description, pattern), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        if not path.endswith(extension):
+            path += extension
+
+        self.export_button.configure(state='disabled')
+        self.status_label.configure(text="Exporting...")
+        threading.Thread(
+            target=self.run_export, args=(self.table.get(), path, filters), name="data-export", daemon=True
+        ).start()
+        self.after(self.RESULT_POLL_MS, self.check_results)
+
+    def run_export(self, table, path, filters):
+        try:
+            rows = export_file(self.db_path, table, path, filters, self.archive_path,
+                               progress=lambda written: self.results.put(("progress", written)))
+            self.results.put(("done", (rows, path)))
+        except Exception as e:
+            self.results.put(("error", e))
+
+    def check_results(self):
+        if not self.winfo_exists():
+            return
+        while True:
+            try:
+                kind, value = self.results.get_nowait()
+            except queue.Empty:
+                self.after(self.RESULT_POLL_MS, self.check_results)
+                return
+            if kind == "progress":
+                self.status_label.configure(text=f"Exported {value:,} rows...")
+                continue
+
+            self.export_button.configure(state='normal')
+            if kind == "error":
+                self.status_label.configure(text="")
+                messagebox.showerror("Error", f"Failed to export data: {str(value)}", parent=self)
+            else:
+                rows, path = value
+                self.status_label.configure(text=f"Exported {rows:,} rows to {path}")
+            return
@@ -1,25 +1,55 @@
+import queue
+import sqlite3
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from database.database import DatabaseManager
-from database.models import Product, Supplier
-from database.queries import OrderQueries, ProductQueries, SupplierQueries
+from database.events import DELETE, EXTERNAL, INSERT, DataVersionMonitor, change_bus
+from database.exceptions import ConflictError, InvalidTransitionError
+from database.models import ORDER_STATUSES, ORDER_TRANSITIONS
+from database.money import Money
+from database.queries import OrderQueries, ProductQueries, StockQueries, SupplierQueries
 from gui.base_window import BaseWindow
+from gui.dashboard import DashboardTab
+from gui.export_dialog import ExportDialog
 from gui.order_dialog import OrderDialog
 from gui.product_dialog import ProductDialog
+from gui.purchase_suggestions import PurchaseSuggestionsWindow
 from gui.supplier_dialog import SupplierDialog
+from utils.analytics.classification import classification_due, classify_database
+from utils.catalog.importer import import_catalog_file
 from utils.qr_code.scanner import QRScannerDialog
 from utils.qr_code.viewer import QRCodeViewer
 
 class MainWindow(tk.Toplevel, BaseWindow):
+    LEDGER_MAINTENANCE_INTERVAL_MS = 15 * 60 * 1000
+    CHANGE_POLL_INTERVAL_MS = 250
+    IMPORT_POLL_MS = 200
+
     def __init__(self, user_data, parent):
         super().__init__(parent)
         self.parent = parent
         self.user_data = user_data
         self.db = DatabaseManager()
+        self.db.start_reservation_sweeper()
+        self.db.start_backup_scheduler()
         self.active_scanner = None  # Track active scanner window
+        self.scanner_in_process = tk.BooleanVar(value=False)
+        self.scanner_lanes = None  # None uses the first working camera
+        self.order_versions = {}  # Row versions of the orders shown, by order ID
+        self.low_stock_alert_id = None  # Product named in the status label's low-stock alert
+        self.classification_thread = None
+        self.import_thread = None
+        self.import_results = queue.SimpleQueue()
         self.setup_window()
         self.create_menu()
         self.create_widgets()
+        self.after(self.LEDGER_MAINTENANCE_INTERVAL_MS, self.run_ledger_maintenance)
+
+        # Keep the tables in step with changes made anywhere, row by row
+        self.change_monitor = DataVersionMonitor(change_bus)
+        self.unsubscribe_changes = change_bus.subscribe(self.on_data_changed)
+        self.poll_changes()
 
     def setup_window(self):
         self.setup_window_base("Inventory Management System", 1024, 768)
@@ -32,6 +62,9 @@ class MainWindow(tk.Toplevel, BaseWindow):
         # File Menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Import Catalog...", command=self.import_catalog)
+        file_menu.add_command(label="Export Data...", command=self.show_export_dialog)
+        file_menu.add_separator()
         file_menu.add_command(label="Logout", command=self.handle_logout)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.quit)
@@ -42,6 +75,18 @@ class MainWindow(tk.Toplevel, BaseWindow):
         inventory_menu.add_command(label="Products", command=self.show_products)
         inventory_menu.add_command(label="Suppliers", command=self.show_suppliers)
         inventory_menu.add_command(label="Orders", command=self.show_orders)
+        inventory_menu.add_command(label="Dashboard", command=self.show_dashboard)
+        inventory_menu.add_separator()
+        inventory_menu.add_command(label="Purchase Suggestions...", command=self.show_purchase_suggestions)
+
+        # Settings Menu
+        settings_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Settings", menu=settings_menu)
+        settings_menu.add_checkbutton(
+            label="Run Scanner in Separate Process",
+            variable=self.scanner_in_process
+        )
+        settings_menu.add_command(label="Scanner Cameras...", command=self.configure_scanner_lanes)
 
         # Scan QR Code Button
         menubar.add_cascade(label="Scan QR Code", command=self.scan_qr_code)
@@ -165,6 +210,14 @@ class MainWindow(tk.Toplevel, BaseWindow):
         )
         delete_button.pack(fill='x', pady=5)
 
+        # Receive stock button
+        receive_button = ttk.Button(
+            buttons_frame,
+            text="Receive Stock",
+            command=self.receive_stock
+        )
+        receive_button.pack(fill='x', pady=5)
+
         # View QR code button
         view_qr_button = ttk.Button(
             buttons_frame,
@@ -249,7 +302,8 @@ class MainWindow(tk.Toplevel, BaseWindow):
         self.orders_tree = ttk.Treeview(
             self.orders_frame,
             columns=('ID', 'Date', 'Status', 'Total'),
-            show='headings'
+            show='headings',
+            selectmode='extended'  # Status updates apply to every selected order
         )
 
         # Configure orders treeview columns
@@ -308,10 +362,22 @@ class MainWindow(tk.Toplevel, BaseWindow):
             command=self.delete_order
         ).pack(fill='x', pady=5)
 
+        # Time in status report button
+        ttk.Button(
+            orders_buttons_frame,
+            text="Status Report",
+            command=self.show_status_report
+        ).pack(fill='x', pady=5)
+
+        # Dashboard tab; computes its figures when first shown
+        self.dashboard = DashboardTab(self.notebook, self.db.db_path)
+        self.notebook.add(self.dashboard, text='Dashboard')
+
         # Load initial data
         self.load_products()
         self.load_suppliers()
         self.load_orders()
+        self.show_low_stock_summary()
 
     def load_products(self):
         try:
@@ -324,16 +390,15 @@ class MainWindow(tk.Toplevel, BaseWindow):
             
             # Insert products
             for product in products:
-                self.products_tree.insert('', 'end', values=(
-                    product['product_id'],
-                    product['name'],
-                    product['category'],
-                    f"${product['price']:.2f}",
-                    product['stock_quantity']
-                ))
+                self.products_tree.insert('', 'end', iid=str(product[0]),
+                                          values=self.product_row_values(*product))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load products: {str(e)}")
 
+    @staticmethod
+    def product_row_values(product_id, name, category, price, stock_quantity):
+        return (product_id, name, category, f"${Money(price)}", stock_quantity)
+
     def handle_search(self):
         search_term = self.search_entry.get().strip()
         if not search_term:
@@ -350,13 +415,8 @@ class MainWindow(tk.Toplevel, BaseWindow):
             
             # Insert filtered products
             for product in products:
-                self.products_tree.insert('', 'end', values=(
-                    product['product_id'],
-                    product['name'],
-                    product['category'],
-                    f"${product['price']:.2f}",
-                    product['stock_quantity']
-                ))
+                self.products_tree.insert('', 'end', iid=str(product[0]),
+                                          values=self.product_row_values(*product))
         except Exception as e:
             messagebox.showerror("Error", f"Search failed: {str(e)}")
 
@@ -372,11 +432,14 @@ class MainWindow(tk.Toplevel, BaseWindow):
         self.notebook.select(2)  # Select the orders tab
         self.load_orders()
 
+    def show_dashboard(self):
+        self.notebook.select(3)  # Select the dashboard tab; it refreshes itself when shown
+
     def show_new_order_dialog(self):
         dialog = OrderDialog(self, self.db.get_connection(), self.user_data['user_id'])
         self.wait_window(dialog)
         if dialog.result:
-            self.load_orders()
+            self.process_changes()
 
     def load_orders(self):
         try:
@@ -388,33 +451,48 @@ class MainWindow(tk.Toplevel, BaseWindow):
                 self.orders_tree.delete(item)
             
             # Insert orders
+            self.order_versions = {}
             for order in orders:
-                self.orders_tree.insert('', 'end', values=(
-                    order['order_id'],
-                    order['order_date'],
-                    order['status'],
-                    f"${order['total_amount']:.2f}"
-                ))
+                self.order_versions[order.order_id] = order.version
+                self.orders_tree.insert('', 'end', iid=str(order.order_id),
+                                        values=self.order_row_values(order))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load orders: {str(e)}")
 
+    @staticmethod
+    def order_row_values(order):
+        return (order.order_id, order.order_date, order.status, f"${order.total_amount}")
+
     def update_order_status(self):
         selected_items = self.orders_tree.selection()
         if not selected_items:
             messagebox.showwarning("Warning", "Please select an order to update")
             return
         
-        order_id = self.orders_tree.item(selected_items[0])['values'][0]
+        order_ids = [self.orders_tree.item(item)['values'][0] for item in selected_items]
+
+        # Offer only statuses every selected order can move to
+        current_statuses = {self.orders_tree.item(item)['values'][2] for item in selected_items}
+        statuses = [
+            status for status in ORDER_STATUSES
+            if all(status in ORDER_TRANSITIONS.get(current, ()) for current in current_statuses)
+        ]
+        if not statuses:
+            messagebox.showwarning(
+                "Warning",
+                "The selected orders have no status they can all move to"
+            )
+            return
         
         # Create status selection dialog
         status_dialog = tk.Toplevel(self)
-        status_dialog.title("Update Order Status")
+        status_dialog.title("Update Order Status" if len(order_ids) == 1
+                            else f"Update {len(order_ids)} Orders")
         status_dialog.geometry("300x170")
         status_dialog.transient(self)
         status_dialog.grab_set()
         
         # Status options
-        statuses = ["Pending", "Processing", "Shipped", "Delivered", "Cancelled"]
         status_var = tk.StringVar(value=statuses[0])
         
         # Create and pack widgets
@@ -435,17 +513,28 @@ class MainWindow(tk.Toplevel, BaseWindow):
         def update_status():
             try:
                 conn = self.db.get_connection()
-                OrderQueries.update_order_status(
+                updated = OrderQueries.transition_orders(
                     conn,
-                    order_id,
-                    status_var.get()
+                    order_ids,
+                    status_var.get(),
+                    changed_by=self.user_data['user_id'],
+                    expected_versions={
+                        order_id: self.order_versions[order_id]
+                        for order_id in order_ids if order_id in self.order_versions
+                    }
                 )
                 status_dialog.destroy()
-                self.load_orders()
+                self.process_changes()
                 messagebox.showinfo(
                     "Success",
-                    "Order status updated successfully!"
+                    "Order status updated successfully!" if updated == 1
+                    else f"{updated} orders updated successfully!"
                 )
+            except (ConflictError, InvalidTransitionError) as e:
+                status_dialog.destroy()
+                for order_id in order_ids:
+                    self.refresh_order_row(order_id)
+                messagebox.showwarning("Order Changed", str(e))
             except Exception as e:
                 messagebox.showerror(
                     "Error",
@@ -469,6 +558,41 @@ class MainWindow(tk.Toplevel, BaseWindow):
             command=status_dialog.destroy
         ).pack(side='left', expand=True, padx=5)
 
+    def show_purchase_suggestions(self):
+        PurchaseSuggestionsWindow(self, self.db.db_path)
+
+    def show_status_report(self):
+        try:
+            rows = OrderQueries.time_in_status(self.db.get_connection())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load status report: {str(e)}")
+            return
+
+        report = tk.Toplevel(self)
+        report.title("Time in Status")
+        report.geometry("560x260")
+        report.transient(self)
+
+        tree = ttk.Treeview(
+            report,
+            columns=('Status', 'Entries', 'Average', 'Longest', 'Current'),
+            show='headings'
+        )
+        for column, heading in (('Status', 'Status'), ('Entries', 'Times Entered'),
+                                ('Average', 'Avg Hours'), ('Longest', 'Max Hours'),
+                                ('Current', 'Orders Now')):
+            tree.heading(column, text=heading)
+            tree.column(column, width=100)
+        tree.pack(fill='both', expand=True, padx=10, pady=10)
+
+        by_status = {row[0]: row for row in rows}
+        for status in ORDER_STATUSES:
+            if status in by_status:
+                _, entries, average, longest, current = by_status[status]
+                tree.insert('', 'end', values=(status, entries, f"{average:.1f}", f"{longest:.1f}", current))
+
+        ttk.Button(report, text="Close", command=report.destroy).pack(pady=(0, 10))
+
     def delete_order(self):
         selected_items = self.orders_tree.selection()
         if not selected_items:
@@ -481,7 +605,7 @@ class MainWindow(tk.Toplevel, BaseWindow):
             try:
                 conn = self.db.get_connection()
                 OrderQueries.delete_order(conn, order_id)
-                self.load_orders()
+                self.process_changes()
                 messagebox.showinfo("Success", "Order deleted successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete order: {str(e)}")
@@ -489,6 +613,9 @@ class MainWindow(tk.Toplevel, BaseWindow):
     def scan_qr_code(self):
         # Check if scanner is already open
         if self.active_scanner is not None and self.active_scanner.winfo_exists():
+            # Restart the capture pipelines if their workers or processes died
+            if not self.active_scanner.scanner.is_alive():
+                self.active_scanner.restart_camera()
             self.active_scanner.lift()  # Bring existing scanner to front
             return
         
@@ -498,7 +625,12 @@ class MainWindow(tk.Toplevel, BaseWindow):
         
         try:
             # Create scanner window
-            self.active_scanner = QRScannerDialog(self)
+            self.active_scanner = QRScannerDialog(
+                self,
+                self.db.get_connection(),
+                lanes=self.scanner_lanes,
+                use_process=self.scanner_in_process.get()
+            )
             
             # Update status when scanner closes
             def on_scanner_close():
@@ -517,11 +649,39 @@ class MainWindow(tk.Toplevel, BaseWindow):
             self.active_scanner = None
             self.status_label.configure(text="")
 
+    def configure_scanner_lanes(self):
+        current = ", ".join(str(index) for index in self.scanner_lanes.values()) if self.scanner_lanes else ""
+        value = simpledialog.askstring(
+            "Scanner Cameras",
+            "Camera indices to scan, one lane each (e.g. 0, 1, 2).\n"
+            "Leave empty to use the first working camera.",
+            initialvalue=current,
+            parent=self
+        )
+        if value is None:
+            return
+
+        try:
+            indices = [int(part) for part in value.replace(',', ' ').split()]
+        except ValueError:
+            messagebox.showerror("Error", "Camera indices must be whole numbers")
+            return
+
+        self.scanner_lanes = {f"Lane {number} (camera {index})": index
+                              for number, index in enumerate(indices, start=1)} or None
+        if self.active_scanner is not None and self.active_scanner.winfo_exists():
+            messagebox.showinfo("Scanner Cameras", "Reopen the scanner to use the new cameras.")
+
+    def close_scanner(self):
+        if self.active_scanner is not None and self.active_scanner.winfo_exists():
+            self.active_scanner.on_closing()
+        self.active_scanner = None
+
     def show_add_product_dialog(self):
         dialog = ProductDialog(self, self.db.get_connection())
         self.wait_window(dialog)
         if dialog.result:
-            self.load_products()
+            self.process_changes()
 
     def show_edit_product_dialog(self):
         selected_items = self.products_tree.selection()
@@ -533,24 +693,13 @@ class MainWindow(tk.Toplevel, BaseWindow):
         
         try:
             conn = self.db.get_connection()
-            product_data = ProductQueries.get_product_by_id(conn, product_id)
+            product = ProductQueries.get_product_by_id(conn, product_id)
             
-            if product_data:
-                product = Product(
-                    product_id=product_data['product_id'],
-                    name=product_data['name'],
-                    description=product_data['description'],
-                    category=product_data['category'],
-                    price=product_data['price'],
-                    stock_quantity=product_data['stock_quantity'],
-                    supplier_id=product_data['supplier_id'],
-                    qr_code_path=product_data['qr_code_path']
-                )
-                
+            if product:
                 dialog = ProductDialog(self, conn, product)
                 self.wait_window(dialog)
                 if dialog.result:
-                    self.load_products()
+                    self.process_changes()
             else:
                 messagebox.showerror("Error", "Product not found")
                 
@@ -567,21 +716,10 @@ class MainWindow(tk.Toplevel, BaseWindow):
         
         try:
             conn = self.db.get_connection()
-            product_data = ProductQueries.get_product_by_id(conn, product_id)
+            product = ProductQueries.get_product_by_id(conn, product_id)
             
-            if product_data:
-                product = Product(
-                    product_id=product_data['product_id'],
-                    name=product_data['name'],
-                    description=product_data['description'],
-                    category=product_data['category'],
-                    price=product_data['price'],
-                    stock_quantity=product_data['stock_quantity'],
-                    supplier_id=product_data['supplier_id'],
-                    qr_code_path=product_data['qr_code_path']
-                )
-                
-                viewer = QRCodeViewer(self, product)
+            if product:
+                viewer = QRCodeViewer(self, product, conn)
                 self.wait_window(viewer)
             else:
                 messagebox.showerror("Error", "Product not found")
@@ -602,11 +740,136 @@ class MainWindow(tk.Toplevel, BaseWindow):
             try:
                 conn = self.db.get_connection()
                 ProductQueries.delete_product(conn, product_id)
-                self.load_products()
+                self.process_changes()
                 messagebox.showinfo("Success", "Product deleted successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
 
+    def receive_stock(self):
+        selected_items = self.products_tree.selection()
+        if not selected_items:
+            messagebox.showwarning("Warning", "Please select a product to receive stock for")
+            return
+
+        product_id = self.products_tree.item(selected_items[0])['values'][0]
+        quantity = simpledialog.askinteger(
+            "Receive Stock",
+            "Quantity received:",
+            minvalue=1,
+            parent=self
+        )
+        if quantity is None:
+            return
+
+        try:
+            StockQueries.receive_stock(
+                self.db.get_connection(),
+                product_id,
+                quantity,
+                note=f"Received by {self.user_data['username']}"
+            )
+            self.process_changes()
+            messagebox.showinfo("Success", f"Received {quantity} units")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to receive stock: {str(e)}")
+
+    def run_ledger_maintenance(self):
+        if not self.winfo_exists():
+            return
+
+        # Each task runs even if an earlier one failed; failures are retried on the next run
+        tasks = (
+            ("Stock checkpoint", self.db.checkpoint_stock),
+            ("Order archiving", self.db.archive_old_orders),
+            ("Daily summary refresh", self.db.refresh_daily_summary),
+            ("Change log pruning", self.db.prune_change_log),
+            ("Product classification check", self.start_classification_if_due),
+            ("Stock reconciliation", self.check_stock_ledger),
+        )
+        try:
+            for name, task in tasks:
+                try:
+                    task()
+                except (sqlite3.Error, OSError) as e:
+                    self.db.logger.error(f"{name} failed: {str(e)}")
+        finally:
+            self.after(self.LEDGER_MAINTENANCE_INTERVAL_MS, self.run_ledger_maintenance)
+
+    def check_stock_ledger(self):
+        mismatches = self.db.reconcile_stock()
+        if mismatches:
+            self.status_label.configure(text=f"⚠ {len(mismatches)} product(s) differ from the stock ledger")
+
+    def start_classification_if_due(self):
+        """Reclassify products weekly on a worker thread with its own connection"""
+        if self.classification_thread is not None and self.classification_thread.is_alive():
+            return
+        if not classification_due(self.db.get_connection()):
+            return
+        self.classification_thread = threading.Thread(
+            target=self.classify_products, name="abc-xyz-classification", daemon=True
+        )
+        self.classification_thread.start()
+
+    def classify_products(self):
+        try:
+            classify_database(self.db.db_path)
+        except Exception as e:
+            self.db.logger.error(f"Product classification failed: {str(e)}")
+
+    def import_catalog(self):
+        """Import a supplier catalog CSV on a worker thread with its own connection"""
+        if self.import_thread is not None and self.import_thread.is_alive():
+            messagebox.showinfo("Import Catalog", "A catalog import is already running")
+            return
+        csv_path = filedialog.askopenfilename(
+            parent=self,
+            title="Import Catalog",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not csv_path:
+            return
+
+        self.status_label.configure(text="Importing catalog...")
+        self.import_thread = threading.Thread(
+            target=self.run_catalog_import, args=(csv_path,), name="catalog-import", daemon=True
+        )
+        self.import_thread.start()
+        self.after(self.IMPORT_POLL_MS, self.check_catalog_import)
+
+    def run_catalog_import(self, csv_path):
+        try:
+            self.import_results.put(import_catalog_file(self.db.db_path, csv_path))
+        except Exception as e:
+            self.db.logger.error(f"Catalog import failed: {str(e)}")
+            self.import_results.put(e)
+
+    def check_catalog_import(self):
+        if not self.winfo_exists():
+            return
+        try:
+            result = self.import_results.get_nowait()
+        except queue.Empty:
+            self.after(self.IMPORT_POLL_MS, self.check_catalog_import)
+            return
+
+        # The import committed through another connection; chunks before a failure are kept
+        self.process_changes()
+        self.show_low_stock_summary()
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", f"Failed to import catalog: {str(result)}")
+            return
+
+        message = (f"Imported {result.imported} products "
+                   f"({result.inserted} new, {result.updated} updated)")
+        if result.rejected:
+            message += f"\n{result.rejected} rows were rejected, see {result.reject_path}"
+        messagebox.showinfo("Import Catalog", message)
+
+    def show_export_dialog(self):
+        archive_path = self.db.archive.archive_path if self.db.archive is not None else None
+        ExportDialog(self, self.db.get_connection(), self.db.db_path, archive_path)
+
     def load_suppliers(self):
         try:
             conn = self.db.get_connection()
@@ -618,21 +881,26 @@ class MainWindow(tk.Toplevel, BaseWindow):
             
             # Insert suppliers
             for supplier in suppliers:
-                self.suppliers_tree.insert('', 'end', values=(
-                    supplier['supplier_id'],
-                    supplier['name'],
-                    supplier['contact_person'] or '',
-                    supplier['email'],
-                    supplier['phone'] or ''
-                ))
+                self.suppliers_tree.insert('', 'end', iid=str(supplier.supplier_id),
+                                           values=self.supplier_row_values(supplier))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load suppliers: {str(e)}")
 
+    @staticmethod
+    def supplier_row_values(supplier):
+        return (
+            supplier.supplier_id,
+            supplier.name,
+            supplier.contact_person or '',
+            supplier.email,
+            supplier.phone or ''
+        )
+
     def show_add_supplier_dialog(self):
         dialog = SupplierDialog(self, self.db.get_connection())
         self.wait_window(dialog)
         if dialog.result:
-            self.load_suppliers()
+            self.process_changes()
 
     def show_edit_supplier_dialog(self):
         selected_items = self.suppliers_tree.selection()
@@ -644,22 +912,13 @@ class MainWindow(tk.Toplevel, BaseWindow):
         
         try:
             conn = self.db.get_connection()
-            supplier_data = SupplierQueries.get_supplier_by_id(conn, supplier_id)
+            supplier = SupplierQueries.get_supplier_by_id(conn, supplier_id)
             
-            if supplier_data:
-                supplier = Supplier(
-                    supplier_id=supplier_data['supplier_id'],
-                    name=supplier_data['name'],
-                    contact_person=supplier_data['contact_person'],
-                    email=supplier_data['email'],
-                    phone=supplier_data['phone'],
-                    address=supplier_data['address']
-                )
-                
+            if supplier:
                 dialog = SupplierDialog(self, conn, supplier)
                 self.wait_window(dialog)
                 if dialog.result:
-                    self.load_suppliers()
+                    self.process_changes()
             else:
                 messagebox.showerror("Error", "Supplier not found")
                 
@@ -695,16 +954,127 @@ class MainWindow(tk.Toplevel, BaseWindow):
                               "Are you sure you want to delete this supplier?"):
             try:
                 SupplierQueries.delete_supplier(conn, supplier_id)
-                self.load_suppliers()
+                self.process_changes()
                 messagebox.showinfo("Success", "Supplier deleted successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete supplier: {str(e)}")
 
+    def poll_changes(self):
+        if not self.winfo_exists():
+            return
+        self.process_changes()
+        self.after(self.CHANGE_POLL_INTERVAL_MS, self.poll_changes)
+
+    def process_changes(self):
+        """Deliver pending change events, including writes by other processes"""
+        try:
+            self.change_monitor.poll(self.db.get_connection())
+        except Exception as e:
+            self.db.logger.error(f"Change polling failed: {str(e)}")
+
+    def on_data_changed(self, event):
+        if event.action == EXTERNAL:
+            # Too many rows changed elsewhere to refresh one by one
+            if event.entity in (None, "product"):
+                if self.search_entry.get().strip():
+                    self.handle_search()
+                else:
+                    self.load_products()
+                self.show_low_stock_summary()
+            if event.entity in (None, "supplier"):
+                self.load_suppliers()
+            if event.entity in (None, "order"):
+                self.load_orders()
+        elif event.entity == "low_stock":
+            self.on_low_stock_changed(event)
+        elif event.entity == "product":
+            self.refresh_product_row(event.entity_id, event.action == DELETE)
+        elif event.entity == "supplier":
+            self.refresh_supplier_row(event.entity_id, event.action == DELETE)
+        elif event.entity == "order":
+            self.refresh_order_row(event.entity_id, event.action == DELETE)
+
+    def on_low_stock_changed(self, event):
+        if event.action == INSERT:
+            product = ProductQueries.get_product_by_id(self.db.get_connection(), event.entity_id)
+            if product is not None:
+                self.low_stock_alert_id = product.product_id
+                self.status_label.configure(
+                    text=f"⚠ Low stock: {product.name} has {product.stock_quantity} left "
+                         f"(reorder point {product.reorder_point})"
+                )
+        elif event.entity_id is None or event.entity_id == self.low_stock_alert_id:
+            self.show_low_stock_summary()
+
+    def show_low_stock_summary(self):
+        """Replace any single-product alert with the number of products needing reorder"""
+        self.low_stock_alert_id = None
+        try:
+            count = ProductQueries.count_low_stock(self.db.get_connection())
+        except Exception as e:
+            self.db.logger.error(f"Low stock count failed: {str(e)}")
+            return
+        self.status_label.configure(
+            text=f"⚠ {count} product(s) at or below reorder point" if count else ""
+        )
+
+    def refresh_product_row(self, product_id, deleted=False):
+        product = None if deleted else ProductQueries.get_product_by_id(self.db.get_connection(), product_id)
+        iid = str(product_id)
+        if product is None:
+            if self.products_tree.exists(iid):
+                self.products_tree.delete(iid)
+            return
+
+        values = self.product_row_values(
+            product.product_id, product.name, product.category,
+            product.price.cents, product.stock_quantity
+        )
+        if self.products_tree.exists(iid):
+            self.products_tree.item(iid, values=values)
+        elif not self.search_entry.get().strip():
+            self.products_tree.insert('', 'end', iid=iid, values=values)
+
+    def refresh_supplier_row(self, supplier_id, deleted=False):
+        supplier = None if deleted else SupplierQueries.get_supplier_by_id(self.db.get_connection(), supplier_id)
+        iid = str(supplier_id)
+        if supplier is None:
+            if self.suppliers_tree.exists(iid):
+                self.suppliers_tree.delete(iid)
+            return
+
+        if self.suppliers_tree.exists(iid):
+            self.suppliers_tree.item(iid, values=self.supplier_row_values(supplier))
+        else:
+            self.suppliers_tree.insert('', 'end', iid=iid, values=self.supplier_row_values(supplier))
+
+    def refresh_order_row(self, order_id, deleted=False):
+        order = None if deleted else OrderQueries.get_order_by_id(self.db.get_connection(), order_id)
+        iid = str(order_id)
+        if order is None:
+            self.order_versions.pop(order_id, None)
+            if self.orders_tree.exists(iid):
+                self.orders_tree.delete(iid)
+            return
+
+        self.order_versions[order_id] = order.version
+        if self.orders_tree.exists(iid):
+            self.orders_tree.item(iid, values=self.order_row_values(order))
+        else:
+            # Orders are listed newest first
+            self.orders_tree.insert('', 0, iid=iid, values=self.order_row_values(order))
+
     def handle_logout(self):
+        self.close_scanner()
         self.db.close()
         self.destroy()  # Close main window
         self.parent.deiconify()  # Show login window again
 
     def on_closing(self):
+        self.close_scanner()
         self.db.close()
-        self.destroy()
\ No newline at end of file
+        self.destroy()
+
+    def destroy(self):
+        self.unsubscribe_changes()
+        super().destroy()
\ No newline at end of file
@@ -1,12 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from decimal import Decimal
-from database.models import Order, Product
-from database.queries import OrderQueries, ProductQueries
+import uuid
+from database.exceptions import InsufficientStockError
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import OrderQueries, ReservationQueries
 from gui.base_window import BaseWindow, ScrollableFrame
+from gui.product_picker import ProductPicker
 from datetime import datetime
 
 class OrderDialog(tk.Toplevel, BaseWindow):
+    # Reservations are renewed well before they expire while the dialog is open
+    RESERVATION_KEEPALIVE_MS = ReservationQueries.DEFAULT_TTL_SECONDS * 1000 // 3
+
     def __init__(self, parent, db_connection, user_id):
         super().__init__(parent)
         self.parent = parent
@@ -14,9 +20,11 @@ class OrderDialog(tk.Toplevel, BaseWindow):
         self.user_id = user_id
         self.result = None
         self.order_items = []  # List to store selected products and quantities
+        self.cart_id = uuid.uuid4().hex  # Owner of this dialog's stock reservations
         
         self.setup_window()
         self.create_widgets()
+        self.after(self.RESERVATION_KEEPALIVE_MS, self.extend_reservations)
 
     def setup_window(self):
         self.setup_window_base("Create New Order", 600, 800)
@@ -47,17 +55,10 @@ class OrderDialog(tk.Toplevel, BaseWindow):
         product_frame = ttk.LabelFrame(self.main_frame, text="Add Products")
         product_frame.pack(fill='x', padx=5, pady=5)
 
-        # Product dropdown
-        self.products = self.load_available_products()
-        self.product_var = tk.StringVar()
-        self.product_combobox = ttk.Combobox(
-            product_frame,
-            textvariable=self.product_var,
-            values=list(self.products.keys()),
-            state='readonly',
-            width=40
-        )
-        self.product_combobox.pack(padx=5, pady=5)
+        # Product search, queried as the user types
+        ttk.Label(product_frame, text="Search by name or ID:").pack(anchor='w', padx=5)
+        self.product_picker = ProductPicker(product_frame, self.db, width=50)
+        self.product_picker.pack(fill='x', padx=5, pady=5)
 
         # Quantity frame
         quantity_frame = ttk.Frame(product_frame)
@@ -140,14 +141,6 @@ class OrderDialog(tk.Toplevel, BaseWindow):
             command=self.destroy
         ).pack(side='left', expand=True, padx=5)
 
-    def load_available_products(self):
-        try:
-            products = ProductQueries.get_all_products(self.db)
-            return {f"{p['name']} (${p['price']})": p for p in products}
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load products: {str(e)}")
-            return {}
-
     def validate_integer(self, value):
         if value == "":
             return True
@@ -158,8 +151,8 @@ class OrderDialog(tk.Toplevel, BaseWindow):
             return False
 
     def add_product_to_order(self):
-        selected = self.product_var.get()
-        if not selected:
+        selected = self.product_picker.selected_product()
+        if selected is None:
             messagebox.showwarning("Warning", "Please select a product")
             return
 
@@ -173,29 +166,35 @@ class OrderDialog(tk.Toplevel, BaseWindow):
             messagebox.showwarning("Warning", "Quantity must be positive")
             return
 
-        product = self.products[selected]
-        if quantity > product['stock_quantity']:
+        product_id, name, price, stock_quantity = selected
+
+        # Hold the units now so other terminals cannot sell them meanwhile
+        try:
+            ReservationQueries.reserve(self.db, self.cart_id, product_id, quantity)
+        except InsufficientStockError as e:
             messagebox.showwarning(
                 "Warning", 
-                f"Not enough stock. Available: {product['stock_quantity']}"
+                f"Not enough stock. Available: {max(e.available, 0)}"
             )
             return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to reserve stock: {str(e)}")
+            return
 
         # Calculate item total
-        price = Decimal(str(product['price']))
-        total = price * Decimal(quantity)
+        total = price * quantity
 
         # Add to treeview
         self.items_tree.insert('', 'end', values=(
-            product['name'],
+            name,
             quantity,
-            f"${price:.2f}",
-            f"${total:.2f}"
+            f"${price}",
+            f"${total}"
         ))
 
         # Store order item
         self.order_items.append({
-            'product_id': product['product_id'],
+            'product_id': product_id,
             'quantity': quantity,
             'price': price,
             'total': total
@@ -209,8 +208,8 @@ class OrderDialog(tk.Toplevel, BaseWindow):
         self.quantity_entry.insert(0, "1")
 
     def update_total_amount(self):
-        total = sum(item['total'] for item in self.order_items)
-        self.total_label.config(text=f"${total:.2f}")
+        total = sum((item['total'] for item in self.order_items), Money())
+        self.total_label.config(text=f"${total}")
 
     def place_order(self):
         if not self.order_items:
@@ -219,7 +218,7 @@ class OrderDialog(tk.Toplevel, BaseWindow):
 
         try:
             # Calculate total amount
-            total_amount = sum(item['total'] for item in self.order_items)
+            total_amount = sum((item['total'] for item in self.order_items), Money())
 
             # Create order
             order = Order(
@@ -230,16 +229,18 @@ class OrderDialog(tk.Toplevel, BaseWindow):
                 total_amount=total_amount
             )
 
-            # Save order
-            order_id = OrderQueries.create_order(self.db, order)
-
-            # Update product stock quantities
-            for item in self.order_items:
-                ProductQueries.update_stock_quantity(
-                    self.db,
-                    item['product_id'],
-                    item['quantity']
+            # Save order, line items and stock movements together
+            items = [
+                OrderItem(
+                    order_item_id=None,
+                    order_id=None,
+                    product_id=item['product_id'],
+                    quantity=item['quantity'],
+                    unit_price=item['price']
                 )
+                for item in self.order_items
+            ]
+            order_id = OrderQueries.place_order(self.db, order, items, cart_id=self.cart_id)
 
             messagebox.showinfo(
                 "Success",
@@ -249,5 +250,25 @@ class OrderDialog(tk.Toplevel, BaseWindow):
             self.result = order
             self.destroy()
 
+        except InsufficientStockError as e:
+            messagebox.showwarning("Stock Changed", f"Failed to place order: {str(e)}")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to place order: {str(e)}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to place order: {str(e)}")
+
+    def extend_reservations(self):
+        if not self.winfo_exists():
+            return
+        try:
+            ReservationQueries.extend_cart(self.db, self.cart_id)
+        except Exception:
+            pass  # Expired holds are re-checked when the order is placed
+        self.after(self.RESERVATION_KEEPALIVE_MS, self.extend_reservations)
+
+    def destroy(self):
+        # Give back held stock unless the order consumed it
+        if self.result is None and self.order_items:
+            try:
+                ReservationQueries.release_cart(self.db, self.cart_id)
+            except Exception:
+                pass  # The sweeper releases them when they expire
+        super().destroy()
@@ -1,10 +1,12 @@
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
-from decimal import Decimal
+from database.exceptions import ConflictError
+from database.money import Money
 from database.models import Product
 from database.queries import ProductQueries, SupplierQueries
 from gui.base_window import BaseWindow, ScrollableFrame
+from utils.catalog.validation import validate_barcode, validate_product_fields
 from utils.qr_code.generator import QRCodeGenerator
 
 class ProductDialog(tk.Toplevel, BaseWindow):
@@ -62,6 +64,16 @@ class ProductDialog(tk.Toplevel, BaseWindow):
         self.name_entry = ttk.Entry(self.main_frame, width=40)
         self.name_entry.pack(pady=(5, 15), ipady=3)
 
+        # SKU
+        ttk.Label(self.main_frame, text="SKU (optional):").pack(anchor='w')
+        self.sku_entry = ttk.Entry(self.main_frame, width=40)
+        self.sku_entry.pack(pady=(5, 15), ipady=3)
+
+        # Barcode
+        ttk.Label(self.main_frame, text="Barcode (EAN/UPC, optional):").pack(anchor='w')
+        self.barcode_entry = ttk.Entry(self.main_frame, width=40)
+        self.barcode_entry.pack(pady=(5, 15), ipady=3)
+
         # Category
         ttk.Label(self.main_frame, text="Category:").pack(anchor='w')
         self.category_entry = ttk.Entry(self.main_frame, width=40)
@@ -94,6 +106,17 @@ class ProductDialog(tk.Toplevel, BaseWindow):
         )
         self.stock_entry.pack(pady=(5, 15), ipady=3)
 
+        # Reorder Point
+        ttk.Label(self.main_frame, text="Reorder Point:").pack(anchor='w')
+        self.reorder_point_entry = ttk.Entry(
+            self.main_frame,
+            width=40,
+            validate='key',
+            validatecommand=vcmd2
+        )
+        self.reorder_point_entry.insert(0, "0")
+        self.reorder_point_entry.pack(pady=(5, 15), ipady=3)
+
         # Supplier
         ttk.Label(self.main_frame, text="Supplier:").pack(anchor='w')
         self.supplier_combobox = ttk.Combobox(
@@ -131,10 +154,13 @@ class ProductDialog(tk.Toplevel, BaseWindow):
 
         try:
             name = self.name_entry.get().strip()
+            sku = self.sku_entry.get().strip()
+            barcode = self.barcode_entry.get().strip()
             category = self.category_entry.get().strip()
             description = self.description_text.get('1.0', 'end-1c').strip()
-            price = Decimal(self.price_entry.get().strip())
+            price = Money.parse(self.price_entry.get().strip())
             stock = int(self.stock_entry.get().strip())
+            reorder_point = int(self.reorder_point_entry.get().strip())
             
             supplier_display = self.supplier_combobox.get()
             supplier_id = self.suppliers.get(supplier_display)
@@ -148,12 +174,19 @@ class ProductDialog(tk.Toplevel, BaseWindow):
                 price=price,
                 stock_quantity=stock,
                 supplier_id=supplier_id,
-                qr_code_path=None
+                qr_code_path=None,
+                version=getattr(self.product, 'version', 1),
+                reorder_point=reorder_point,
+                sku=sku or None,
+                barcode=barcode or None
             )
 
             # Save product to database
             if self.product:  # Update existing product
-                ProductQueries.update_product(self.db, product)
+                # Apply the stock edit as a change relative to what was loaded,
+                # so sales made while the dialog was open are kept
+                stock_delta = stock - self.product.stock_quantity
+                product.version = ProductQueries.update_product(self.db, product, stock_delta)
                 self.logger.info(f"Updated product {product.product_id}")
             else:  # Create new product
                 product.product_id = ProductQueries.create_product(self.db, product)
@@ -180,6 +213,11 @@ class ProductDialog(tk.Toplevel, BaseWindow):
             self.result = product
             self.destroy()
 
+        except ConflictError as e:
+            self.logger.warning(f"Edit conflict on product {e.entity_id}")
+            messagebox.showwarning("Product Changed", str(e))
+            self.reload_product()
+
         except Exception as e:
             self.logger.error(f"Failed to save product: {str(e)}")
             messagebox.showerror("Error", f"Failed to save product: {str(e)}")
@@ -187,7 +225,7 @@ class ProductDialog(tk.Toplevel, BaseWindow):
     def load_suppliers(self):
         try:
             suppliers = SupplierQueries.get_all_suppliers(self.db)
-            self.suppliers = {f"{s['name']} ({s['email']})": s['supplier_id'] 
+            self.suppliers = {f"{s.name} ({s.email})": s.supplier_id 
                             for s in suppliers}
             self.supplier_combobox['values'] = list(self.suppliers.keys())
             if self.suppliers:
@@ -197,11 +235,17 @@ class ProductDialog(tk.Toplevel, BaseWindow):
 
     def load_product_data(self):
         self.name_entry.insert(0, self.product.name)
+        if self.product.sku:
+            self.sku_entry.insert(0, self.product.sku)
+        if self.product.barcode:
+            self.barcode_entry.insert(0, self.product.barcode)
         self.category_entry.insert(0, self.product.category)
         if self.product.description:
             self.description_text.insert('1.0', self.product.description)
         self.price_entry.insert(0, str(self.product.price))
         self.stock_entry.insert(0, str(self.product.stock_quantity))
+        self.reorder_point_entry.delete(0, tk.END)
+        self.reorder_point_entry.insert(0, str(self.product.reorder_point))
         
         # Set supplier if exists
         if self.product.supplier_id:
@@ -210,6 +254,24 @@ class ProductDialog(tk.Toplevel, BaseWindow):
                     self.supplier_combobox.set(display_name)
                     break
 
+    def reload_product(self):
+        """Replace the form contents with the latest saved version of the product"""
+        product = ProductQueries.get_product_by_id(self.db, self.product.product_id)
+        if product is None:
+            messagebox.showerror("Error", "Product no longer exists")
+            self.destroy()
+            return
+
+        self.product = product
+        self.name_entry.delete(0, tk.END)
+        self.sku_entry.delete(0, tk.END)
+        self.barcode_entry.delete(0, tk.END)
+        self.category_entry.delete(0, tk.END)
+        self.description_text.delete('1.0', tk.END)
+        self.price_entry.delete(0, tk.END)
+        self.stock_entry.delete(0, tk.END)
+        self.load_product_data()
+
     def validate_decimal(self, value):
         if value == "":
             return True
@@ -232,28 +294,18 @@ class ProductDialog(tk.Toplevel, BaseWindow):
         return True
 
     def validate_inputs(self):
-        name = self.name_entry.get().strip()
-        category = self.category_entry.get().strip()
-        price = self.price_entry.get().strip()
-        stock = self.stock_entry.get().strip()
-
-        if not all([name, category, price, stock]):
-            messagebox.showerror("Error", "Please fill in all required fields")
-            return False
-
         try:
-            float(price)
-            int(stock)
-        except ValueError:
-            messagebox.showerror("Error", "Invalid price or stock quantity")
-            return False
-
-        if float(price) < 0:
-            messagebox.showerror("Error", "Price cannot be negative")
-            return False
-
-        if int(stock) < 0:
-            messagebox.showerror("Error", "Stock quantity cannot be negative")
+            validate_product_fields(
+                self.name_entry.get().strip(),
+                self.category_entry.get().strip(),
+                self.price_entry.get().strip(),
+                self.stock_entry.get().strip(),
+                self.reorder_point_entry.get().strip()
+            )
+            barcode = self.barcode_entry.get().strip()
+            if barcode:
+                validate_barcode(barcode)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return False
-
         return True
\ No newline at end of file
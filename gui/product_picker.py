@@ -0,0 +1,145 @@
+import tkinter as tk
+from tkinter import ttk
+from database.events import DELETE, EXTERNAL, change_bus
+from database.money import Money
+from database.queries import ProductQueries
+
+class ProductPicker(ttk.Frame):
+    """
+    Type-ahead product selector.
+
+    Each keystroke (after a short pause) runs a limited prefix query instead
+    of loading the catalog up front. Results are cached per prefix as lists
+    of product IDs, and product rows are cached by ID, so two products with
+    the same name and price stay distinct.
+    """
+
+    RESULT_LIMIT = 20
+    DEBOUNCE_MS = 150
+
+    def __init__(self, container, db_connection, width=40, on_select=None):
+        super().__init__(container)
+        self.db = db_connection
+        self.on_select = on_select
+        self.products = {}  # product_id -> (product_id, name, price, stock_quantity)
+        self.prefix_results = {}  # lower-cased prefix -> [product_id, ...]
+        self.visible_ids = []
+        self.selected_id = None
+        self._pending_search = None
+
+        self.entry_var = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.entry_var, width=width)
+        self.entry.pack(fill='x')
+        self.entry.bind('<KeyRelease>', self.on_key_release)
+        self.entry.bind('<Down>', lambda event: self.focus_results())
+
+        self.results_list = tk.Listbox(self, height=6, width=width, exportselection=False)
+        self.results_list.pack(fill='x')
+        self.results_list.bind('<<ListboxSelect>>', self.on_result_selected)
+        self.results_list.bind('<Return>', self.on_result_selected)
+
+        self.unsubscribe_changes = change_bus.subscribe(self.on_product_changed, entities=("product",))
+
+    def selected_product(self):
+        """(product_id, name, price, stock_quantity) of the chosen product, or None"""
+        if self.selected_id is None:
+            return None
+        return self.products.get(self.selected_id)
+
+    def clear(self):
+        self.selected_id = None
+        self.entry_var.set("")
+        self.show_results([])
+
+    def focus_results(self):
+        if self.visible_ids:
+            self.results_list.focus_set()
+            self.results_list.selection_set(0)
+
+    def on_key_release(self, event):
+        if event.keysym in ('Down', 'Up', 'Return', 'Tab'):
+            return
+        self.selected_id = None
+        if self._pending_search is not None:
+            self.after_cancel(self._pending_search)
+        self._pending_search = self.after(self.DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._pending_search = None
+        prefix = self.entry_var.get().strip()
+        self.show_results(self.lookup(prefix) if prefix else [])
+
+    def lookup(self, prefix):
+        """Product IDs matching ``prefix``, from the cache where possible"""
+        key = prefix.lower()
+        if key in self.prefix_results:
+            return self.prefix_results[key]
+
+        # A shorter prefix that returned less than a full page already holds every match
+        for length in range(len(key) - 1, 0, -1):
+            shorter = self.prefix_results.get(key[:length])
+            if shorter is not None and len(shorter) < self.RESULT_LIMIT and not key.isdigit():
+                product_ids = [
+                    product_id for product_id in shorter
+                    if self.products[product_id][1].lower().startswith(key)
+                ]
+                self.prefix_results[key] = product_ids
+                return product_ids
+
+        rows = ProductQueries.search_products_by_prefix(self.db, prefix, self.RESULT_LIMIT)
+        product_ids = []
+        for product_id, name, price, stock_quantity in rows:
+            self.products[product_id] = (product_id, name, Money(price), stock_quantity)
+            product_ids.append(product_id)
+        self.prefix_results[key] = product_ids
+        return product_ids
+
+    def show_results(self, product_ids):
+        self.visible_ids = list(product_ids)
+        self.results_list.delete(0, tk.END)
+        for product_id in self.visible_ids:
+            self.results_list.insert(tk.END, self.label(self.products[product_id]))
+
+    @staticmethod
+    def label(product):
+        product_id, name, price, stock_quantity = product
+        return f"{name} (${price}) - #{product_id}, {stock_quantity} in stock"
+
+    def on_result_selected(self, event=None):
+        selection = self.results_list.curselection()
+        if not selection:
+            return
+        self.selected_id = self.visible_ids[selection[0]]
+        self.entry_var.set(self.products[self.selected_id][1])
+        if self.on_select is not None:
+            self.on_select(self.products[self.selected_id])
+
+    def on_product_changed(self, event):
+        # Names may have changed, so any cached prefix could be wrong
+        self.prefix_results.clear()
+        if event.action == EXTERNAL:
+            # Keep only the chosen product, re-read below
+            self.products = {}
+            changed_id = self.selected_id
+        else:
+            # Only products already shown or chosen need re-reading
+            known = self.products.pop(event.entity_id, None) is not None
+            changed_id = event.entity_id if known and event.action != DELETE else None
+
+        if changed_id is not None:
+            product = ProductQueries.get_product_by_id(self.db, changed_id)
+            if product is not None:
+                self.products[product.product_id] = (
+                    product.product_id, product.name, product.price, product.stock_quantity
+                )
+
+        if self.selected_id is not None and self.selected_id not in self.products:
+            self.selected_id = None
+        if self.entry_var.get().strip() and self.selected_id is None:
+            self.run_search()
+        else:
+            self.show_results([product_id for product_id in self.visible_ids if product_id in self.products])
+
+    def destroy(self):
+        self.unsubscribe_changes()
+        super().destroy()
@@ -0,0 +1,109 @@
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from tkinter import ttk
+from database.queries import ProductQueries
+from utils.analytics.forecasting import plan_catalog_reorders
+
+class PurchaseSuggestionsWindow(tk.Toplevel):
+    """
+    Products to reorder according to the demand forecast.
+
+    The forecast loads a year of daily sales for the whole catalog, so it
+    runs on a worker thread with its own connection and the window polls
+    for the result.
+    """
+
+    SUGGESTION_LIMIT = 500
+    RESULT_POLL_MS = 100
+
+    def __init__(self, parent, db_path):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.results = queue.SimpleQueue()
+        self.title("Purchase Suggestions")
+        self.geometry("760x420")
+        self.transient(parent)
+
+        options_frame = ttk.Frame(self)
+        options_frame.pack(fill='x', padx=10, pady=(10, 0))
+        self.lead_time = tk.IntVar(value=7)
+        self.review_days = tk.IntVar(value=7)
+        self.service_level = tk.IntVar(value=95)
+        for label, variable, limits in (("Lead time (days):", self.lead_time, (1, 180)),
+                                        ("Review period (days):", self.review_days, (1, 180)),
+                                        ("Service level (%):", self.service_level, (50, 99))):
+            ttk.Label(options_frame, text=label).pack(side='left', padx=(0, 5))
+            ttk.Spinbox(options_frame, from_=limits[0], to=limits[1], width=5,
+                        textvariable=variable).pack(side='left', padx=(0, 15))
+        self.recalculate_button = ttk.Button(options_frame, text="Recalculate", command=self.start_forecast)
+        self.recalculate_button.pack(side='right')
+
+        columns = ('ID', 'Name', 'Stock', 'Forecast', 'Safety', 'Reorder', 'Suggested')
+        self.tree = ttk.Treeview(self, columns=columns, show='headings')
+        for column, heading, width in (('ID', 'ID', 60), ('Name', 'Name', 220), ('Stock', 'Stock', 70),
+                                       ('Forecast', 'Daily Demand', 100), ('Safety', 'Safety Stock', 90),
+                                       ('Reorder', 'Reorder At', 80), ('Suggested', 'Order Qty', 80)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width)
+        self.tree.pack(fill='both', expand=True, padx=10, pady=10)
+
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.pack(anchor='w', padx=10)
+        ttk.Button(self, text="Close", command=self.destroy).pack(pady=(5, 10))
+
+        self.start_forecast()
+
+    def start_forecast(self):
+        try:
+            options = {
+                "lead_time_days": self.lead_time.get(),
+                "review_days": self.review_days.get(),
+                "service_level": self.service_level.get() / 100,
+            }
+        except tk.TclError:
+            self.status_label.configure(text="Options must be whole numbers")
+            return
+
+        self.recalculate_button.configure(state='disabled')
+        self.status_label.configure(text="Forecasting demand...")
+        threading.Thread(target=self.compute, args=(options,), name="purchase-forecast", daemon=True).start()
+        self.after(self.RESULT_POLL_MS, self.check_results)
+
+    def compute(self, options):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            try:
+                plan = plan_catalog_reorders(conn, **options)
+                suggestions = plan.suggestions(self.SUGGESTION_LIMIT)
+                names = ProductQueries.get_product_names(conn, [row[0] for row in suggestions])
+                self.results.put((suggestions, names, int((plan.suggested_quantity > 0).sum())))
+            finally:
+                conn.close()
+        except Exception as e:
+            self.results.put(e)
+
+    def check_results(self):
+        if not self.winfo_exists():
+            return
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            self.after(self.RESULT_POLL_MS, self.check_results)
+            return
+
+        self.recalculate_button.configure(state='normal')
+        if isinstance(result, Exception):
+            self.status_label.configure(text=f"Failed to forecast demand: {str(result)}")
+            return
+
+        suggestions, names, total = result
+        self.tree.delete(*self.tree.get_children())
+        for product_id, stock, forecast, safety_stock, reorder_level, quantity in suggestions:
+            self.tree.insert('', 'end', values=(
+                product_id, names.get(product_id, ""), stock, f"{forecast:.2f}",
+                safety_stock, reorder_level, quantity
+            ))
+        shown = f" (showing {len(suggestions)})" if total > len(suggestions) else ""
+        self.status_label.configure(text=f"{total} product(s) should be reordered{shown}")
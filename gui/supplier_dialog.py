@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from database.exceptions import ConflictError
 from database.models import Supplier
 from database.queries import SupplierQueries
 from gui.base_window import BaseWindow, ScrollableFrame
@@ -107,6 +108,20 @@ class SupplierDialog(tk.Toplevel, BaseWindow):
         if self.supplier.address:
             self.address_text.insert('1.0', self.supplier.address)
 
+    def reload_supplier(self):
+        """Replace the form contents with the latest saved version of the supplier"""
+        supplier = SupplierQueries.get_supplier_by_id(self.db, self.supplier.supplier_id)
+        if supplier is None:
+            messagebox.showerror("Error", "Supplier no longer exists")
+            self.destroy()
+            return
+
+        self.supplier = supplier
+        for entry in (self.name_entry, self.contact_entry, self.email_entry, self.phone_entry):
+            entry.delete(0, tk.END)
+        self.address_text.delete('1.0', tk.END)
+        self.load_supplier_data()
+
     def validate_inputs(self):
         name = self.name_entry.get().strip()
         email = self.email_entry.get().strip()
@@ -139,12 +154,12 @@ class SupplierDialog(tk.Toplevel, BaseWindow):
                 contact_person=contact_person if contact_person else None,
                 email=email,
                 phone=phone if phone else None,
-                address=address if address else None
+                address=address if address else None,
+                version=self.supplier.version if self.supplier else 1
             )
 
             if self.supplier:  # Update existing supplier
-                # Add update method to SupplierQueries class
-                SupplierQueries.update_supplier(self.db, supplier)
+                supplier.version = SupplierQueries.update_supplier(self.db, supplier)
                 messagebox.showinfo("Success", "Supplier updated successfully!")
             else:  # Create new supplier
                 SupplierQueries.create_supplier(self.db, supplier)
@@ -153,5 +168,9 @@ class SupplierDialog(tk.Toplevel, BaseWindow):
             self.result = supplier
             self.destroy()
 
+        except ConflictError as e:
+            messagebox.showwarning("Supplier Changed", str(e))
+            self.reload_supplier()
+
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save supplier: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,56 @@
+import pytest
+from database.database import DatabaseManager
+from database.events import change_bus
+from database.models import Product, Supplier
+from database.money import Money
+from database.queries import ProductQueries, SupplierQueries
+
+
+@pytest.fixture(autouse=True)
+def work_in_tmp_path(tmp_path, monkeypatch):
+    # DatabaseManager writes database.log to the working directory
+    monkeypatch.chdir(tmp_path)
+    yield
+    change_bus.dispatch()  # Leave no queued events behind for the next test
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "inventory.db"), archive_path=str(tmp_path / "archive.db"),
+                              backup_dir=None)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def conn(db):
+    return db.get_connection()
+
+
+@pytest.fixture
+def new_product(conn):
+    """Create a product and return its ID; keyword arguments override the defaults"""
+    def create(name="Widget", stock_quantity=10, price="2.50", reorder_point=0, **fields):
+        product = Product(
+            product_id=None,
+            name=name,
+            description=fields.pop("description", None),
+            category=fields.pop("category", "Hardware"),
+            price=Money.parse(price),
+            stock_quantity=stock_quantity,
+            qr_code_path=None,
+            supplier_id=fields.pop("supplier_id", None),
+            reorder_point=reorder_point,
+            **fields
+        )
+        return ProductQueries.create_product(conn, product)
+    return create
+
+
+@pytest.fixture
+def new_supplier(conn):
+    def create(name="Acme", email="orders@acme.example"):
+        return SupplierQueries.create_supplier(conn, Supplier(
+            supplier_id=None, name=name, contact_person=None, email=email, phone=None, address=None
+        ))
+    return create
@@ -0,0 +1,111 @@
+import logging
+import os
+import sqlite3
+import threading
+import pytest
+from database.backup import backup_database, list_backups, restore_backup, rotate_backups, verify_backup
+from database.database import DatabaseManager
+from database.exceptions import BackupError
+from database.queries import ProductQueries
+
+
+@pytest.fixture
+def backup_dir(tmp_path):
+    return str(tmp_path / "backups")
+
+
+def test_backup_is_verified_and_listed(db, new_product, backup_dir):
+    new_product(name="Anvil")
+    path = backup_database(db.db_path, backup_dir)
+
+    assert list_backups(db.db_path, backup_dir) == [path]
+    assert os.listdir(backup_dir) == [os.path.basename(path)]  # No partial file left behind
+    verify_backup(path)
+
+
+def test_backups_taken_in_the_same_second_get_their_own_files(db, backup_dir):
+    paths = [backup_database(db.db_path, backup_dir) for _ in range(3)]
+    assert len(set(paths)) == 3
+    assert list_backups(db.db_path, backup_dir) == paths
+
+
+def test_restore_brings_back_the_backed_up_data(db, conn, new_product, backup_dir):
+    product_id = new_product(name="Anvil")
+    path = backup_database(db.db_path, backup_dir)
+    product = ProductQueries.get_product_by_id(conn, product_id)
+    product.name = "Changed after the backup"
+    ProductQueries.update_product(conn, product)
+    new_product(name="Added after the backup")
+
+    restore_backup(path, db.db_path)
+
+    assert ProductQueries.get_product_by_id(conn, product_id).name == "Anvil"
+    assert conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 1
+
+
+def test_damaged_backups_fail_verification_and_are_not_restored(db, conn, new_product, tmp_path):
+    new_product(name="Anvil")
+    damaged = tmp_path / "damaged.db"
+    damaged.write_bytes(b"not a database" * 512)
+
+    with pytest.raises(BackupError):
+        verify_backup(str(damaged))
+    with pytest.raises(BackupError):
+        restore_backup(str(damaged), db.db_path)
+    assert conn.execute("SELECT name FROM products").fetchone()[0] == "Anvil"
+
+
+def test_stopped_backup_leaves_no_file(db, new_product, backup_dir):
+    for number in range(50):
+        new_product(name=f"Product {number}", description="x" * 500)
+    stop_event = threading.Event()
+    stop_event.set()
+
+    with pytest.raises(BackupError):
+        backup_database(db.db_path, backup_dir, pages=1, stop_event=stop_event)
+    assert os.listdir(backup_dir) == []
+
+
+def test_backup_of_a_busy_database_finishes_in_one_step(db, new_product, backup_dir, caplog):
+    for number in range(50):
+        new_product(name=f"Product {number}", description="x" * 500)
+    done = threading.Event()
+
+    def keep_writing():
+        writer = sqlite3.connect(db.db_path, timeout=30)
+        try:
+            while not done.wait(0.002):
+                with writer:
+                    writer.execute("UPDATE products SET description = description WHERE product_id = 1")
+        finally:
+            writer.close()
+
+    thread = threading.Thread(target=keep_writing)
+    thread.start()
+    try:
+        with caplog.at_level(logging.WARNING, logger="database.backup"):
+            path = backup_database(db.db_path, backup_dir, pages=1, pause=0.01, max_restarts=1)
+    finally:
+        done.set()
+        thread.join()
+    assert "copying it in one step" in caplog.text
+    verify_backup(path)
+
+
+def test_rotation_keeps_the_newest_backups(db, backup_dir):
+    paths = [backup_database(db.db_path, backup_dir) for _ in range(4)]
+    assert rotate_backups(db.db_path, backup_dir, keep=2) == paths[:2]
+    assert list_backups(db.db_path, backup_dir) == paths[2:]
+
+
+def test_archive_and_backups_default_to_the_database_directory(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    manager = DatabaseManager(str(data_dir / "shop.db"))
+    try:
+        assert manager.archive.archive_path == str(data_dir / "shop_archive.db")
+        assert manager.backup_scheduler.backup_dir == str(data_dir / "backups")
+    finally:
+        manager.close()
+    assert (data_dir / "shop_archive.db").exists()
+    assert not (tmp_path / "inventory_archive.db").exists()
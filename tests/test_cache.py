@@ -0,0 +1,64 @@
+import sqlite3
+from database.cache import product_cache
+from database.database import DatabaseManager
+from database.queries import ProductQueries
+
+
+def traced(conn, action):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+
+def test_lookups_skip_change_log_until_something_commits(conn, new_product):
+    product_id = new_product(name="Anvil")
+    ProductQueries.get_product_by_id(conn, product_id)
+
+    statements = traced(conn, lambda: ProductQueries.get_product_by_id(conn, product_id))
+    assert not any("change_log" in statement for statement in statements)
+    assert product_cache(conn).stats()["hits"] == 1
+
+
+def test_writes_from_another_connection_invalidate(db, conn, new_product):
+    product_id = new_product(name="Anvil")
+    assert ProductQueries.get_product_by_id(conn, product_id).name == "Anvil"
+
+    other = sqlite3.connect(db.db_path)
+    try:
+        with other:
+            other.execute("UPDATE products SET name = 'Anvil XL' WHERE product_id = ?", (product_id,))
+    finally:
+        other.close()
+    assert ProductQueries.get_product_by_id(conn, product_id).name == "Anvil XL"
+
+
+def test_direct_writes_on_the_same_connection_invalidate(conn, new_product):
+    product_id = new_product(name="Anvil")
+    assert [row[1] for row in ProductQueries.get_all_products(conn)] == ["Anvil"]
+
+    # data_version does not move for a connection's own commits
+    with conn:
+        conn.execute("UPDATE products SET name = 'Anvil XL' WHERE product_id = ?", (product_id,))
+    assert ProductQueries.get_product_by_id(conn, product_id).name == "Anvil XL"
+    assert [row[1] for row in ProductQueries.get_all_products(conn)] == ["Anvil XL"]
+
+
+def test_each_database_has_its_own_cache(db, conn, new_product, tmp_path):
+    product_id = new_product(name="Anvil")
+    ProductQueries.get_product_by_id(conn, product_id)
+
+    other_db = DatabaseManager(str(tmp_path / "other.db"), archive_path=None, backup_dir=None)
+    try:
+        other_conn = other_db.get_connection()
+        with other_conn:
+            other_conn.execute("INSERT INTO products (product_id, name, category, price, stock_quantity) "
+                               "VALUES (?, 'Bolt', 'Tools', 10, 0)", (product_id,))
+        assert product_cache(other_conn) is not product_cache(conn)
+        assert ProductQueries.get_product_by_id(other_conn, product_id).name == "Bolt"
+    finally:
+        other_db.close()
+    assert ProductQueries.get_product_by_id(conn, product_id).name == "Anvil"
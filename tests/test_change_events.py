@@ -0,0 +1,70 @@
+import sqlite3
+import pytest
+from database.events import EXTERNAL, INSERT, UPDATE, ChangeBus, ChangeEvent, DataVersionMonitor
+
+
+@pytest.fixture
+def bus():
+    return ChangeBus()
+
+
+@pytest.fixture
+def events(bus):
+    received = []
+    bus.subscribe(received.append)
+    return received
+
+
+@pytest.fixture
+def other_conn(db):
+    """A second connection, standing in for another process"""
+    other = sqlite3.connect(db.db_path)
+    yield other
+    other.close()
+
+
+def test_commits_from_other_connections_are_published(conn, other_conn, new_product, bus, events):
+    product_id = new_product(name="Anvil")
+    monitor = DataVersionMonitor(bus)
+    assert monitor.poll(conn) == 0  # The first poll only notes where change_log is
+
+    with other_conn:
+        other_conn.execute("UPDATE products SET name = 'Anvil XL' WHERE product_id = ?", (product_id,))
+        supplier_id = other_conn.execute("INSERT INTO suppliers (name, email) VALUES ('Acme', 'a@acme.example')"
+                                         ).lastrowid
+    monitor.poll(conn)
+    assert events == [
+        ChangeEvent("product", product_id, UPDATE),
+        ChangeEvent("supplier", supplier_id, INSERT),
+        ChangeEvent("low_stock", None, UPDATE),
+    ]
+
+    events.clear()
+    assert monitor.poll(conn) == 0
+    assert events == []
+
+
+def test_large_external_changes_become_one_event_per_entity(conn, other_conn, new_product, bus, events):
+    for number in range(5):
+        new_product(name=f"Screw {number}")
+    monitor = DataVersionMonitor(bus, event_limit=3)
+    monitor.poll(conn)
+
+    with other_conn:
+        other_conn.execute("UPDATE products SET price = price + 1")
+    monitor.poll(conn)
+    assert events == [ChangeEvent("product", None, EXTERNAL)]
+
+
+def test_pruned_entries_mean_anything_may_have_changed(conn, other_conn, new_product, bus, events):
+    product_id = new_product(name="Anvil")
+    monitor = DataVersionMonitor(bus)
+    monitor.poll(conn)
+
+    with other_conn:
+        other_conn.execute("UPDATE products SET name = 'Anvil XL' WHERE product_id = ?", (product_id,))
+        other_conn.execute("UPDATE products SET name = 'Anvil XXL' WHERE product_id = ?", (product_id,))
+        # Pruned before the monitor saw it
+        other_conn.execute("DELETE FROM change_log WHERE change_id = (SELECT MAX(change_id) - 1 FROM change_log)")
+    monitor.poll(conn)
+    assert events == [ChangeEvent(None, None, EXTERNAL)]
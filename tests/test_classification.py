@@ -0,0 +1,55 @@
+import numpy as np
+from database.queries import ProductQueries
+from utils.analytics.classification import classification_due, classify, run_classification
+
+
+def letters(codes, classes):
+    return "".join(classes[code - 1] for code in codes)
+
+
+def test_abc_limits_close_classes_at_80_and_95_percent_of_value():
+    # Sales values 70, 10, 10, 5, 5 and 0 out of 100
+    units = np.array([70, 10, 10, 5, 5, 0])
+    result = classify(np.arange(1, 7), np.ones(6, dtype=np.int64), np.zeros(6, dtype=np.int64),
+                      units[:, None].astype(np.float32))
+    # The product crossing 80% still completes A; one starting at exactly 95% is C
+    assert letters(result.abc, "ABC") == "AABBCC"
+    assert result.sales_value.tolist() == [70, 10, 10, 5, 5, 0]
+
+
+def test_abc_ranks_by_value_not_units():
+    units = np.array([[100], [1]], dtype=np.float32)
+    result = classify(np.array([1, 2]), np.array([1, 1000]), np.array([0, 0]), units)
+    assert letters(result.abc, "ABC") == "BA"  # 100 of 1,100 sold is the last 9%
+
+
+def test_xyz_limits_grade_the_variation_of_weekly_demand():
+    weekly = np.array([
+        [1, 1, 1, 1],  # No variation
+        [1, 3, 1, 3],  # Variation 0.5, the X limit
+        [0, 2, 0, 2],  # Variation 1.0, the Y limit
+        [0, 0, 0, 4],  # Variation 1.73
+        [0, 0, 0, 0],  # No demand
+    ], dtype=np.float32)
+    result = classify(np.arange(1, 6), np.ones(5, dtype=np.int64), np.zeros(5, dtype=np.int64), weekly)
+    assert letters(result.xyz, "XYZ") == "XXYZZ"
+    assert result.variation[:3].tolist() == [0, 0.5, 1]
+    assert np.isinf(result.variation[4])
+
+
+def test_classes_are_stored_and_only_changes_rewritten(conn, new_product):
+    seller = new_product(name="Seller", stock_quantity=100, price="3.00")
+    idle = new_product(name="Idle", stock_quantity=4, price="1.00")
+    ProductQueries.update_stock_quantity(conn, seller, 10)
+    assert classification_due(conn)
+
+    result = run_classification(conn, weeks=4)
+    assert result.value_by_class() == {"A": 27000, "B": 0, "C": 400}
+    assert result.matrix()["AZ"] == 1 and result.matrix()["CZ"] == 1  # One week of four had sales
+    classes = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT product_id, abc_class, xyz_class FROM products")}
+    assert classes == {seller: ("A", "Z"), idle: ("C", "Z")}
+    assert not classification_due(conn)
+
+    run_classification(conn, weeks=4)
+    runs = conn.execute("SELECT products, changed FROM classification_runs ORDER BY run_id").fetchall()
+    assert [tuple(run) for run in runs] == [(2, 2), (2, 0)]
@@ -0,0 +1,73 @@
+from datetime import datetime
+import pytest
+from database.exceptions import ConflictError
+from database.models import Order
+from database.money import Money
+from database.queries import OrderQueries, ProductQueries, StockQueries, SupplierQueries
+
+
+def test_product_update_bumps_the_version(conn, new_product):
+    product = ProductQueries.get_product_by_id(conn, new_product())
+    product.name = "Renamed"
+    assert ProductQueries.update_product(conn, product) == 2
+
+    saved = ProductQueries.get_product_by_id(conn, product.product_id)
+    assert (saved.name, saved.version) == ("Renamed", 2)
+
+
+def test_stale_product_update_raises_conflict(conn, new_product):
+    product_id = new_product()
+    first = ProductQueries.get_product_by_id(conn, product_id)
+    second = ProductQueries.get_product_by_id(conn, product_id)
+    first.name = "First"
+    ProductQueries.update_product(conn, first)
+
+    second.name = "Second"
+    with pytest.raises(ConflictError) as error:
+        ProductQueries.update_product(conn, second, stock_delta=5)
+    assert (error.value.entity, error.value.entity_id) == ("product", product_id)
+
+    # Nothing from the rejected save is kept, including its stock change
+    saved = ProductQueries.get_product_by_id(conn, product_id)
+    assert (saved.name, saved.version, saved.stock_quantity) == ("First", 2, 10)
+    assert StockQueries.reconcile(conn)[0] == []
+
+
+def test_stock_movements_do_not_cause_conflicts(conn, new_product):
+    product = ProductQueries.get_product_by_id(conn, new_product(stock_quantity=10))
+    StockQueries.receive_stock(conn, product.product_id, 5)
+
+    product.name = "Renamed"
+    ProductQueries.update_product(conn, product, stock_delta=-2)
+    assert ProductQueries.get_product_by_id(conn, product.product_id).stock_quantity == 13
+
+
+def test_updating_a_missing_product_is_not_a_conflict(conn, new_product):
+    product = ProductQueries.get_product_by_id(conn, new_product())
+    ProductQueries.delete_product(conn, product.product_id)
+    with pytest.raises(ValueError):
+        ProductQueries.update_product(conn, product)
+
+
+def test_stale_supplier_update_raises_conflict(conn, new_supplier):
+    supplier_id = new_supplier()
+    first = SupplierQueries.get_supplier_by_id(conn, supplier_id)
+    second = SupplierQueries.get_supplier_by_id(conn, supplier_id)
+    first.phone = "555-0100"
+    assert SupplierQueries.update_supplier(conn, first) == 2
+
+    second.phone = "555-0199"
+    with pytest.raises(ConflictError) as error:
+        SupplierQueries.update_supplier(conn, second)
+    assert error.value.entity == "supplier"
+    assert SupplierQueries.get_supplier_by_id(conn, supplier_id).phone == "555-0100"
+
+
+def test_stale_order_status_change_raises_conflict(conn):
+    order_id = OrderQueries.create_order(conn, Order(
+        order_id=None, user_id=None, order_date=datetime.now(), status="Pending", total_amount=Money(500)
+    ))
+    OrderQueries.update_order_status(conn, order_id, "Processing", expected_version=1)
+    with pytest.raises(ConflictError):
+        OrderQueries.update_order_status(conn, order_id, "Cancelled", expected_version=1)
+    assert OrderQueries.get_order_by_id(conn, order_id).status == "Processing"
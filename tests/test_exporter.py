@@ -0,0 +1,91 @@
+import csv
+import gzip
+import json
+from datetime import datetime
+import pytest
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import OrderQueries
+from utils.export.exporter import ExportFilters, export_file, export_table
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as export:
+        return list(csv.DictReader(export))
+
+
+def read_jsonl_gz(path):
+    with gzip.open(path, "rt", encoding="utf-8") as export:
+        return [json.loads(line) for line in export]
+
+
+def place(conn, product_id, quantity, unit_price="2.50"):
+    price = Money.parse(unit_price)
+    order = Order(order_id=None, user_id=None, order_date=datetime.now(), status="Pending",
+                  total_amount=Money(price.cents * quantity))
+    return OrderQueries.place_order(conn, order, [OrderItem(None, None, product_id, quantity, price)])
+
+
+@pytest.fixture
+def archived_and_recent(db, conn, new_product, new_supplier):
+    """(archived order of Acme's Anvil, recent order of Bolts Ltd's Bolt)"""
+    anvil = new_product(name="Anvil", stock_quantity=10, price="12.05", supplier_id=new_supplier())
+    bolt = new_product(name="Bolt", stock_quantity=10, price="0.10",
+                       supplier_id=new_supplier(name="Bolts Ltd", email="sales@bolts.example"))
+    archived, recent = place(conn, anvil, 2, "12.05"), place(conn, bolt, 3, "0.10")
+    with conn:
+        conn.execute("UPDATE orders SET status = 'Delivered', order_date = '2020-06-01 12:00:00' WHERE order_id = ?",
+                     (archived,))
+    assert db.archive.archive_orders(conn, older_than_days=365) == 1
+    return archived, recent
+
+
+def test_products_are_exported_in_key_pages(conn, new_product, tmp_path):
+    for number in range(5):
+        new_product(name=f"Product {number}", price=f"{number}.05", category="Tools" if number % 2 else "Hardware")
+    pages = []
+    path = str(tmp_path / "products.csv")
+
+    assert export_table(conn, "products", path, chunk_size=2, progress=pages.append) == 5
+    assert pages == [2, 4, 5]
+    rows = read_csv(path)
+    assert [row["name"] for row in rows] == [f"Product {number}" for number in range(5)]
+    assert [row["price"] for row in rows] == ["0.05", "1.05", "2.05", "3.05", "4.05"]
+    assert not (tmp_path / "products.csv.partial").exists()
+
+    assert export_table(conn, "products", path, ExportFilters(category="Tools"), chunk_size=1) == 2
+    assert [row["name"] for row in read_csv(path)] == ["Product 1", "Product 3"]
+
+
+def test_orders_include_the_archive_when_the_range_reaches_it(conn, archived_and_recent, tmp_path):
+    archived, recent = archived_and_recent
+    path = str(tmp_path / "orders.jsonl.gz")
+
+    export_table(conn, "orders", path, chunk_size=1)
+    orders = read_jsonl_gz(path)
+    assert [order["order_id"] for order in orders] == [archived, recent]
+    assert [order["total_amount"] for order in orders] == ["24.10", "0.30"]
+
+    export_table(conn, "orders", path, ExportFilters(start=datetime(2021, 1, 1)))
+    assert [order["order_id"] for order in read_jsonl_gz(path)] == [recent]
+    export_table(conn, "orders", path, ExportFilters(start=datetime(2020, 1, 1), end=datetime(2021, 1, 1)))
+    assert [order["order_id"] for order in read_jsonl_gz(path)] == [archived]
+
+
+def test_order_items_filter_on_their_products(db, conn, archived_and_recent, tmp_path):
+    archived, _ = archived_and_recent
+    path = str(tmp_path / "items.csv")
+
+    acme = conn.execute("SELECT supplier_id FROM suppliers WHERE name = 'Acme'").fetchone()[0]
+    rows = export_file(db.db_path, "order_items", path, ExportFilters(supplier_id=acme), db.archive.archive_path)
+    assert rows == 1
+    assert [(row["order_id"], row["quantity"], row["unit_price"]) for row in read_csv(path)] == [
+        (str(archived), "2", "12.05")
+    ]
+
+
+def test_date_filters_only_apply_to_orders(conn, tmp_path):
+    with pytest.raises(ValueError, match="Date filters"):
+        export_table(conn, "products", str(tmp_path / "products.csv"), ExportFilters(start=datetime(2024, 1, 1)))
+    with pytest.raises(ValueError, match="format"):
+        export_table(conn, "products", str(tmp_path / "products.xlsx"))
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from statistics import NormalDist
+import numpy as np
+import pytest
+from database.queries import ProductQueries
+from utils.analytics.forecasting import (exponential_smoothing, load_daily_sales, moving_average,
+                                         plan_catalog_reorders, plan_reorders)
+
+
+def test_moving_average_matches_a_plain_mean():
+    sales = np.array([[1, 2, 3, 4, 5], [0, 0, 10, 0, 0]], dtype=np.float32)
+    assert moving_average(sales, 3).tolist() == [[2, 3, 4], [10 / 3, 10 / 3, 10 / 3]]
+    # A window longer than the history averages all of it
+    assert moving_average(sales, 9).tolist() == [[3], [2]]
+
+
+def test_exponential_smoothing_matches_the_recursion():
+    sales = np.random.default_rng(7).integers(0, 20, size=(4, 30)).astype(np.float32)
+    level = sales[:, 0].astype(np.float64)
+    for day in range(1, sales.shape[1]):
+        level = 0.3 * sales[:, day] + 0.7 * level
+    assert exponential_smoothing(sales, 0.3) == pytest.approx(level, rel=1e-5)
+    assert exponential_smoothing(np.zeros((2, 0), dtype=np.float32), 0.3).tolist() == [0, 0]
+
+
+def test_steady_demand_is_reordered_up_to_lead_time_plus_review():
+    product_ids = np.array([1, 2, 3])
+    stock = np.array([10, 20, 5])
+    sales = np.array([[2] * 28, [2] * 28, [0] * 28], dtype=np.float32)
+
+    plan = plan_reorders(product_ids, stock, sales, lead_time_days=7, review_days=7)
+    assert plan.forecast.tolist() == pytest.approx([2, 2, 0])
+    assert plan.safety_stock.tolist() == [0, 0, 0]  # No variability to cover
+    assert plan.reorder_level.tolist() == [14, 14, 0]
+    assert plan.order_up_to.tolist() == [28, 28, 0]
+    # Product 2 is above its reorder level, and product 3 sells nothing
+    assert plan.suggested_quantity.tolist() == [18, 0, 0]
+    assert plan.suggestions() == [(1, 10, pytest.approx(2.0), 0, 14, 18)]
+
+
+def test_variable_demand_adds_safety_stock():
+    sales = np.array([[0, 4] * 14], dtype=np.float32)
+    plan = plan_reorders(np.array([1]), np.array([0]), sales, lead_time_days=4, service_level=0.95)
+    # z * std * sqrt(lead time), rounded up
+    assert plan.safety_stock[0] == np.ceil(NormalDist().inv_cdf(0.95) * sales.std(ddof=1, dtype=np.float64) * 2)
+    assert plan.reorder_level[0] == np.ceil(plan.forecast[0] * 4) + plan.safety_stock[0]
+
+
+def test_catalog_plan_reads_sales_from_the_ledger(conn, new_product):
+    busy = new_product(name="Busy", stock_quantity=100)
+    idle = new_product(name="Idle", stock_quantity=100)
+    today = datetime.utcnow().date()
+    for days_ago in range(14):
+        ProductQueries.update_stock_quantity(conn, busy, 6)
+        with conn:
+            conn.execute("UPDATE stock_movements SET created_at = ? WHERE movement_id = "
+                         "(SELECT MAX(movement_id) FROM stock_movements)",
+                         (f"{today - timedelta(days=days_ago)} 10:00:00",))
+
+    sales = load_daily_sales(conn, np.array([busy, idle]), days=14)
+    assert sales.tolist() == [[6] * 14, [0] * 14]
+
+    plan = plan_catalog_reorders(conn, days=14)
+    assert plan.product_ids.tolist() == [busy, idle]
+    assert plan.suggestions() == [(busy, 16, pytest.approx(6.0), 0, 42, 68)]
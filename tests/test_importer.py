@@ -0,0 +1,125 @@
+import csv
+import pytest
+from database.events import EXTERNAL, INSERT, UPDATE, ChangeEvent, change_bus
+from database.money import Money
+from database.queries import ProductQueries, StockQueries
+from utils.catalog.importer import import_catalog_file
+
+HEADER = "sku,name,category,price,stock_quantity,reorder_point\n"
+
+
+def write_csv(tmp_path, text, name="catalog.csv"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def product_by_sku(conn, sku):
+    return ProductQueries.get_by_code(conn, sku)
+
+
+def read_rejects(path):
+    with open(path, newline="", encoding="utf-8") as rejects_file:
+        return [(row["line"], row["sku"], row["error"]) for row in csv.DictReader(rejects_file)]
+
+
+@pytest.fixture
+def events():
+    received = []
+    unsubscribe = change_bus.subscribe(received.append)
+    yield received
+    unsubscribe()
+
+
+def test_new_products_are_inserted_with_initial_stock(db, conn, tmp_path):
+    result = import_catalog_file(db.db_path, write_csv(tmp_path, HEADER + "A-1,Anvil,Tools,12.50,4,1\n"
+                                                                          "B-2,Bolt,Tools,0.10,0,0\n"))
+    assert (result.inserted, result.updated, result.rejected, result.reject_path) == (2, 0, 0, None)
+
+    anvil = product_by_sku(conn, "A-1")
+    assert (anvil.name, anvil.price, anvil.stock_quantity, anvil.reorder_point) == ("Anvil", Money(1250), 4, 1)
+    assert [(m["movement_type"], m["quantity"]) for m in StockQueries.get_movements(conn, anvil.product_id)] == [
+        ("receipt", 4)
+    ]
+    assert StockQueries.get_movements(conn, product_by_sku(conn, "B-2").product_id) == []
+
+
+def test_existing_products_are_updated_by_sku(db, conn, tmp_path, new_product):
+    product_id = new_product(name="Anvil", stock_quantity=10, sku="A-1", description="Heavy")
+    unchanged_id = new_product(name="Bolt", stock_quantity=3, price="0.10", sku="B-2")
+    catalog = write_csv(tmp_path, HEADER + "A-1,Anvil XL,Tools,13.00,7,2\n"
+                                           "B-2,Bolt,Hardware,0.10,3,0\n")
+    result = import_catalog_file(db.db_path, catalog)
+    assert (result.inserted, result.updated) == (0, 2)
+    assert ProductQueries.get_product_by_id(conn, unchanged_id).version == 1
+
+    anvil = ProductQueries.get_product_by_id(conn, product_id)
+    assert (anvil.name, anvil.price, anvil.stock_quantity, anvil.reorder_point) == ("Anvil XL", Money(1300), 7, 2)
+    # A column left out of the file keeps its value
+    assert anvil.description == "Heavy"
+    assert anvil.version == 2
+    latest = StockQueries.get_movements(conn, product_id)[0]
+    assert (latest["movement_type"], latest["quantity"], latest["note"]) == ("adjustment", -3, "Catalog import")
+    assert StockQueries.reconcile(conn)[0] == []
+
+    # Importing the same file again changes nothing, so open edit forms stay valid
+    import_catalog_file(db.db_path, catalog)
+    assert ProductQueries.get_product_by_id(conn, product_id).version == 2
+    assert len(StockQueries.get_movements(conn, product_id)) == 2
+
+
+def test_the_last_row_for_a_sku_wins(db, conn, tmp_path):
+    import_catalog_file(db.db_path, write_csv(tmp_path, HEADER + "A-1,Anvil,Tools,1.00,4,0\n"
+                                                                 "A-1,Anvil v2,Tools,2.00,6,0\n"))
+    anvil = product_by_sku(conn, "A-1")
+    assert (anvil.name, anvil.stock_quantity) == ("Anvil v2", 6)
+    assert StockQueries.reconcile(conn)[0] == []
+
+
+def test_invalid_rows_are_rejected_and_the_rest_imported(db, conn, tmp_path, new_supplier):
+    new_supplier(email="orders@acme.example")
+    catalog = write_csv(tmp_path, "sku,name,category,price,stock_quantity,supplier_email,barcode\n"
+                                  "A-1,Anvil,Tools,1.00,4,orders@acme.example,4006381333931\n"
+                                  ",Nameless,Tools,1.00,1,,\n"
+                                  "C-3,Chisel,Tools,-1,1,,\n"
+                                  "D-4,Drill,Tools,1.00,1,nobody@example.com,\n"
+                                  "E-5,Eraser,Tools,1.00,1,,4006381333932\n"
+                                  "F-6,File,Tools,1.00,1,,4006381333931\n")
+    result = import_catalog_file(db.db_path, catalog, str(tmp_path / "rejects.csv"))
+    assert (result.inserted, result.rejected, result.reject_path) == (1, 5, str(tmp_path / "rejects.csv"))
+    assert read_rejects(result.reject_path) == [
+        ("3", "", "Missing SKU"),
+        ("4", "C-3", "Price cannot be negative"),
+        ("6", "E-5", "Invalid barcode check digit: 4006381333932"),
+        ("5", "D-4", "Unknown supplier email: nobody@example.com"),
+        ("7", "F-6", "Barcode 4006381333931 belongs to another product"),
+    ]
+    assert product_by_sku(conn, "A-1").barcode == "4006381333931"
+
+
+def test_missing_required_columns_fail_the_import(db, tmp_path):
+    with pytest.raises(ValueError, match="stock_quantity"):
+        import_catalog_file(db.db_path, write_csv(tmp_path, "sku,name,category,price\nA-1,Anvil,Tools,1.00\n"))
+
+
+def test_import_publishes_product_and_low_stock_events(db, conn, tmp_path, new_product, events):
+    product_id = new_product(name="Anvil", stock_quantity=10, reorder_point=2, sku="A-1")
+    change_bus.dispatch()
+    events.clear()
+
+    import_catalog_file(db.db_path, write_csv(tmp_path, HEADER + "A-1,Anvil,Tools,2.50,1,2\n"
+                                                                 "B-2,Bolt,Tools,0.10,5,0\n"))
+    change_bus.dispatch()
+    new_id = product_by_sku(conn, "B-2").product_id
+    assert events == [
+        ChangeEvent("product", product_id, UPDATE),
+        ChangeEvent("product", new_id, INSERT),
+        ChangeEvent("low_stock", product_id, INSERT),
+    ]
+
+
+def test_large_imports_are_delivered_as_one_event_per_entity(db, tmp_path, events):
+    rows = "".join(f"S-{number},Screw {number},Tools,0.05,0,10\n" for number in range(change_bus.batch_limit + 1))
+    import_catalog_file(db.db_path, write_csv(tmp_path, HEADER + rows))
+    change_bus.dispatch()
+    assert events == [ChangeEvent("product", None, EXTERNAL), ChangeEvent("low_stock", None, UPDATE)]
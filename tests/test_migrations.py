@@ -0,0 +1,109 @@
+import sqlite3
+from database.database import SCHEMA_VERSION, DatabaseManager
+from database.money import Money
+from database.queries import OrderQueries, ProductQueries, StockQueries
+
+# Schema written by the first release, before any migration existed
+BASELINE_SCHEMA = """
+    CREATE TABLE users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        age INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE products (
+        product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        category TEXT NOT NULL,
+        price DECIMAL(10,2) NOT NULL,
+        stock_quantity INTEGER NOT NULL,
+        qr_code_path TEXT,
+        supplier_id INTEGER,
+        FOREIGN KEY (supplier_id) REFERENCES suppliers(supplier_id)
+    );
+    CREATE TABLE suppliers (
+        supplier_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        contact_person TEXT,
+        email TEXT UNIQUE NOT NULL,
+        phone TEXT,
+        address TEXT
+    );
+    CREATE TABLE orders (
+        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status TEXT NOT NULL,
+        total_amount DECIMAL(10,2) NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+    INSERT INTO suppliers (name, email) VALUES ('Acme', 'orders@acme.example');
+    INSERT INTO products (name, category, price, stock_quantity, supplier_id)
+    VALUES ('Widget', 'Hardware', 12.5, 7, 1), ('Gadget', 'Hardware', 0.99, 0, 1);
+    INSERT INTO orders (user_id, status, total_amount) VALUES (NULL, 'Delivered', 19.99);
+"""
+
+
+def open_database(path):
+    return DatabaseManager(str(path), archive_path=None, backup_dir=None)
+
+
+def create_baseline_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.close()
+
+
+def test_baseline_database_is_migrated(tmp_path):
+    path = tmp_path / "inventory.db"
+    create_baseline_database(path)
+
+    db = open_database(path)
+    try:
+        conn = db.get_connection()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+        widget = ProductQueries.get_product_by_id(conn, 1)
+        assert widget.price == Money(1250)
+        assert widget.stock_quantity == 7
+        assert (widget.version, widget.reorder_point, widget.sku, widget.barcode) == (1, 0, None, None)
+        assert ProductQueries.get_product_by_id(conn, 2).price == Money(99)
+
+        # Existing stock becomes an opening balance, so the ledger agrees with it
+        movements = StockQueries.get_movements(conn, 1)
+        assert [(m["movement_type"], m["quantity"], m["note"]) for m in movements] == [
+            ("adjustment", 7, "Opening balance")
+        ]
+        assert StockQueries.get_movements(conn, 2) == []
+        assert StockQueries.reconcile(conn) == ([], movements[0]["movement_id"])
+
+        order = OrderQueries.get_order_by_id(conn, 1)
+        assert order.total_amount == Money(1999)
+        assert order.version == 1
+        history = OrderQueries.get_status_history(conn, 1)
+        assert [(change.from_status, change.to_status) for change in history] == [(None, "Delivered")]
+    finally:
+        db.close()
+
+
+def test_migration_runs_once(tmp_path):
+    path = tmp_path / "inventory.db"
+    create_baseline_database(path)
+    open_database(path).close()
+
+    db = open_database(path)
+    try:
+        conn = db.get_connection()
+        assert ProductQueries.get_product_by_id(conn, 1).price == Money(1250)
+        assert len(StockQueries.get_movements(conn, 1)) == 1
+        assert len(OrderQueries.get_status_history(conn, 1)) == 1
+    finally:
+        db.close()
+
+
+def test_new_database_starts_at_current_version(conn):
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM stock_movements").fetchone()[0] == 0
@@ -0,0 +1,52 @@
+from decimal import Decimal
+import pytest
+from database.money import Money
+from database.queries import ProductQueries
+
+
+@pytest.mark.parametrize("value, cents", [
+    ("12.5", 1250),
+    (" 0.99 ", 99),
+    ("0.005", 1),  # Half a cent rounds up
+    ("-1.005", -101),
+    (Decimal("3.14159"), 314),
+    (7, 700),
+    (0.1, 10),  # Floats go through their shortest repr, not their binary value
+])
+def test_parse(value, cents):
+    assert Money.parse(value) == Money(cents)
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1,50", "inf", "NaN"])
+def test_parse_rejects_invalid_amounts(value):
+    with pytest.raises(ValueError):
+        Money.parse(value)
+
+
+@pytest.mark.parametrize("cents", [1.5, "150", True])
+def test_cents_must_be_an_integer(cents):
+    with pytest.raises(TypeError):
+        Money(cents)
+
+
+def test_arithmetic_is_exact():
+    assert sum([Money.parse("0.10")] * 3) == Money.parse("0.30")
+    assert Money(250) * 3 == 3 * Money(250) == Money(750)
+    assert Money(100) - Money(250) == -Money(150)
+    assert Money(1) < Money(2)
+    assert not Money(0)
+
+
+def test_formatting():
+    assert str(Money(123456)) == "1234.56"
+    assert str(Money(-5)) == "-0.05"
+    assert f"{Money(1999):,.1f}" == "20.0"
+    assert Money.parse("2.5").to_decimal() == Decimal("2.50")
+
+
+def test_prices_are_stored_as_integer_cents(conn, new_product):
+    product_id = new_product(price="19.99")
+    stored = conn.execute("SELECT price, typeof(price) FROM products WHERE product_id = ?",
+                          (product_id,)).fetchone()
+    assert tuple(stored) == (1999, "integer")
+    assert ProductQueries.get_product_by_id(conn, product_id).price == Money(1999)
@@ -0,0 +1,79 @@
+from datetime import datetime
+import pytest
+from database.exceptions import InvalidTransitionError
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import OrderQueries
+
+
+@pytest.fixture
+def new_order(conn, new_product):
+    product_id = new_product(stock_quantity=100)
+
+    def create():
+        order = Order(order_id=None, user_id=None, order_date=datetime.now(), status="Pending",
+                      total_amount=Money(250))
+        return OrderQueries.place_order(conn, order, [OrderItem(None, None, product_id, 1, Money(250))])
+    return create
+
+
+def statuses(conn, order_ids):
+    return [OrderQueries.get_order_by_id(conn, order_id).status for order_id in order_ids]
+
+
+def set_history_times(conn, order_id, *times):
+    """Backdate an order's status entries, oldest first"""
+    with conn:
+        rows = conn.execute("SELECT history_id FROM order_status_history WHERE order_id = ? ORDER BY history_id",
+                            (order_id,)).fetchall()
+        assert len(rows) == len(times)
+        for row, changed_at in zip(rows, times):
+            conn.execute("UPDATE order_status_history SET changed_at = ? WHERE history_id = ?",
+                         (changed_at, row[0]))
+
+
+def test_transitions_apply_to_every_order_or_none(conn, new_order):
+    pending, shipped = new_order(), new_order()
+    OrderQueries.transition_orders(conn, [shipped], "Processing")
+    OrderQueries.transition_orders(conn, [shipped], "Shipped")
+
+    with pytest.raises(InvalidTransitionError) as error:
+        OrderQueries.transition_orders(conn, [pending, shipped], "Cancelled")
+    assert error.value.invalid == {shipped: "Shipped"}
+    assert statuses(conn, [pending, shipped]) == ["Pending", "Shipped"]
+    assert conn.execute("SELECT COUNT(*) FROM order_status_history WHERE to_status = 'Cancelled'").fetchone()[0] == 0
+
+    assert OrderQueries.transition_orders(conn, [pending], "Cancelled") == 1
+    with pytest.raises(InvalidTransitionError):
+        OrderQueries.transition_orders(conn, [pending], "Processing")
+    with pytest.raises(ValueError):
+        OrderQueries.transition_orders(conn, [pending], "Lost")
+
+
+def test_time_in_status_measures_each_entry_until_the_next(conn, new_order):
+    first, second = new_order(), new_order()
+    OrderQueries.transition_orders(conn, [first, second], "Processing")
+    OrderQueries.transition_orders(conn, [first], "Shipped")
+    set_history_times(conn, first, "2024-01-01 00:00:00", "2024-01-01 06:00:00", "2024-01-02 06:00:00")
+    set_history_times(conn, second, "2024-03-01 00:00:00", "2024-03-01 02:00:00")
+
+    report = {row[0]: row[1:] for row in OrderQueries.time_in_status(conn)}
+    assert report["Pending"] == (2, pytest.approx(4.0), pytest.approx(6.0), 0)
+    assert report["Processing"][0] == 2 and report["Processing"][3] == 1
+    assert report["Shipped"][3] == 1
+
+    # Only the first order's Pending entry was made before ``since``
+    report = {row[0]: row[1:] for row in OrderQueries.time_in_status(conn, since=datetime(2024, 1, 1, 3))}
+    assert sorted(report) == ["Pending", "Processing", "Shipped"]
+    assert report["Pending"] == (1, pytest.approx(2.0), pytest.approx(2.0), 0)
+    assert report["Processing"][0] == 2
+
+
+def test_time_in_status_orders_same_second_entries_by_insertion(conn, new_order):
+    order_id = new_order()
+    OrderQueries.transition_orders(conn, [order_id], "Cancelled")
+    set_history_times(conn, order_id, "2024-01-01 00:00:00", "2024-01-01 00:00:00")
+
+    report = {row[0]: row[1:] for row in OrderQueries.time_in_status(conn)}
+    assert report["Pending"] == (1, 0.0, 0.0, 0)
+    assert report["Cancelled"][0::3] == (1, 1)
@@ -0,0 +1,38 @@
+import pytest
+from database.queries import ProductQueries
+from utils.catalog.validation import validate_barcode
+
+
+def test_lookup_by_barcode_or_sku(conn, new_product):
+    anvil = new_product(name="Anvil", sku="A-1", barcode="4006381333931")
+    bolt = new_product(name="Bolt", sku="B-2")
+
+    assert ProductQueries.get_by_code(conn, "4006381333931").product_id == anvil
+    assert ProductQueries.get_by_code(conn, " A-1\n").product_id == anvil  # Scanners often add whitespace
+    assert ProductQueries.get_by_code(conn, "B-2").product_id == bolt
+    assert ProductQueries.get_by_code(conn, "C-3") is None
+
+
+def test_barcode_wins_over_a_matching_sku(conn, new_product):
+    by_barcode = new_product(name="Anvil", barcode="036000291452")
+    new_product(name="Bolt", sku="036000291452")
+    assert ProductQueries.get_by_code(conn, "036000291452").product_id == by_barcode
+
+
+def test_upc_a_and_ean_13_forms_match_each_other(conn, new_product):
+    upc = new_product(name="Anvil", barcode="036000291452")
+    ean = new_product(name="Bolt", barcode="0012345678905")
+
+    assert ProductQueries.get_by_code(conn, "0036000291452").product_id == upc
+    assert ProductQueries.get_by_code(conn, "012345678905").product_id == ean
+
+
+@pytest.mark.parametrize("barcode", ["4006381333931", "036000291452", "0036000291452", "96385074", "INTERNAL-7"])
+def test_valid_and_unchecked_barcodes_are_accepted(barcode):
+    validate_barcode(barcode)
+
+
+@pytest.mark.parametrize("barcode", ["4006381333932", "036000291453", "0036000291450"])
+def test_wrong_check_digits_are_rejected(barcode):
+    with pytest.raises(ValueError, match="Invalid barcode check digit"):
+        validate_barcode(barcode)
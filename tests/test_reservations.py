@@ -0,0 +1,85 @@
+import time
+from datetime import datetime
+import pytest
+from database.exceptions import InsufficientStockError
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import OrderQueries, ReservationQueries
+from database.sweeper import ReservationSweeper
+
+
+def expire(conn, cart_id):
+    with conn:
+        conn.execute("UPDATE stock_reservations SET expires_at = datetime('now', '-1 minute') WHERE cart_id = ?",
+                     (cart_id,))
+
+
+def reservation_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM stock_reservations").fetchone()[0]
+
+
+def test_reservations_hold_stock(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    ReservationQueries.reserve(conn, "cart-a", product_id, 6)
+
+    assert ReservationQueries.available_to_promise(conn, product_id) == 4
+    assert ReservationQueries.available_to_promise(conn, product_id, exclude_cart="cart-a") == 10
+    with pytest.raises(InsufficientStockError) as error:
+        ReservationQueries.reserve(conn, "cart-b", product_id, 5)
+    assert (error.value.requested, error.value.available) == (5, 4)
+    ReservationQueries.reserve(conn, "cart-b", product_id, 4)
+    assert ReservationQueries.available_to_promise(conn, product_id) == 0
+
+
+def test_reserve_refuses_bad_quantities(conn, new_product):
+    product_id = new_product()
+    with pytest.raises(ValueError):
+        ReservationQueries.reserve(conn, "cart-a", product_id, 0)
+
+
+def test_expired_reservations_stop_holding_stock(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    ReservationQueries.reserve(conn, "cart-a", product_id, 6)
+    ReservationQueries.reserve(conn, "cart-b", product_id, 3)
+    expire(conn, "cart-a")
+
+    assert ReservationQueries.available_to_promise(conn, product_id) == 7
+    assert ReservationQueries.extend_cart(conn, "cart-a") == 0
+    assert ReservationQueries.release_expired(conn) == 1
+    assert reservation_count(conn) == 1
+    assert ReservationQueries.release_cart(conn, "cart-b") == 1
+    assert ReservationQueries.available_to_promise(conn, product_id) == 10
+
+
+def test_placing_an_order_consumes_its_cart(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    ReservationQueries.reserve(conn, "cart-a", product_id, 8)
+    ReservationQueries.reserve(conn, "cart-b", product_id, 2)
+
+    order = Order(order_id=None, user_id=None, order_date=datetime.now(), status="Pending",
+                  total_amount=Money(800))
+    item = OrderItem(order_item_id=None, order_id=None, product_id=product_id, quantity=8, unit_price=Money(100))
+    OrderQueries.place_order(conn, order, [item], cart_id="cart-a")
+
+    assert reservation_count(conn) == 1
+    assert ReservationQueries.available_to_promise(conn, product_id) == 0
+    # Another cart cannot buy units held by cart-b
+    with pytest.raises(InsufficientStockError):
+        OrderQueries.place_order(conn, order, [OrderItem(None, None, product_id, 1, Money(100))], cart_id="cart-c")
+
+
+def test_sweeper_releases_expired_reservations(db, conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    ReservationQueries.reserve(conn, "cart-a", product_id, 6)
+    ReservationQueries.reserve(conn, "cart-b", product_id, 1)
+    expire(conn, "cart-a")
+
+    sweeper = ReservationSweeper(db.db_path, interval=0.05)
+    sweeper.start()
+    try:
+        deadline = time.monotonic() + 5
+        while reservation_count(conn) > 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        sweeper.stop()
+    assert [row["cart_id"] for row in conn.execute("SELECT cart_id FROM stock_reservations")] == ["cart-b"]
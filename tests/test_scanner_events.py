@@ -0,0 +1,21 @@
+import logging
+import queue
+from utils.qr_code import pipeline
+
+
+def test_full_queue_drops_metrics_quietly(caplog):
+    events = queue.Queue(maxsize=1)
+    pipeline._put_event(events, "metrics", {"frames": 1})
+    with caplog.at_level(logging.WARNING, logger="utils.qr_code.pipeline"):
+        pipeline._put_event(events, "metrics", {"frames": 2})
+    assert events.get_nowait() == ("metrics", {"frames": 1})
+    assert caplog.text == ""
+
+
+def test_payloads_wait_for_room_and_are_logged_if_dropped(caplog, monkeypatch):
+    monkeypatch.setattr(pipeline, "PAYLOAD_PUT_TIMEOUT", 0.01)
+    events = queue.Queue(maxsize=1)
+    pipeline._put_event(events, "metrics", {"frames": 1})
+    with caplog.at_level(logging.WARNING, logger="utils.qr_code.pipeline"):
+        pipeline._put_event(events, "payload", "4006381333931")
+    assert "dropped scanner payload: '4006381333931'" in caplog.text
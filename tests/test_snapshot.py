@@ -0,0 +1,42 @@
+from datetime import datetime
+import numpy as np
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import OrderQueries
+from utils.analytics.snapshot import Snapshot, export_snapshot
+
+
+def place(conn, product_id, quantity):
+    order = Order(order_id=None, user_id=None, order_date=datetime.now(), status="Pending",
+                  total_amount=Money(250 * quantity))
+    return OrderQueries.place_order(conn, order, [OrderItem(None, None, product_id, quantity, Money(250))])
+
+
+def test_snapshot_round_trip_includes_archived_orders(db, conn, new_product, tmp_path):
+    anvil = new_product(name="Anvil", stock_quantity=20, sku="A-1")
+    new_product(name="Ünïcode glue", price="1.25", category="Adhesives", stock_quantity=0)
+    archived, recent = place(conn, anvil, 1), place(conn, anvil, 2)
+    with conn:
+        conn.execute("UPDATE orders SET status = 'Delivered', order_date = '2020-01-02 03:04:05' WHERE order_id = ?",
+                     (archived,))
+    assert db.archive.archive_orders(conn, older_than_days=365) == 1
+
+    snapshot = Snapshot(export_snapshot(db.db_path, str(tmp_path / "snapshots"), db.archive.archive_path))
+    assert Snapshot.latest(str(tmp_path / "snapshots")).path == snapshot.path
+    assert snapshot.manifest["includes_archive"] is True
+    assert {table: snapshot.rows(table) for table in snapshot.tables} == {
+        "products": 2, "orders": 2, "order_items": 2
+    }
+
+    assert snapshot.column("products", "name").to_list() == ["Anvil", "Ünïcode glue"]
+    assert snapshot.column("products", "sku").to_list() == ["A-1", ""]
+    assert snapshot.column("products", "price").tolist() == [250, 125]
+    assert snapshot.column("products", "supplier_id").tolist() == [0, 0]  # NULL is stored as 0
+    categories = snapshot.categories("products", "category")
+    assert [categories[code] for code in snapshot.column("products", "category")] == ["Hardware", "Adhesives"]
+
+    assert snapshot.column("orders", "order_id").tolist() == [archived, recent]
+    assert snapshot.column("orders", "order_date")[0] == np.datetime64("2020-01-02T03:04:05")
+    statuses = snapshot.categories("orders", "status")
+    assert [statuses[code] for code in snapshot.column("orders", "status")] == ["Delivered", "Pending"]
+    assert snapshot.column("order_items", "quantity").tolist() == [1, 2]
@@ -0,0 +1,92 @@
+from datetime import datetime
+import pytest
+from database.models import Order, OrderItem
+from database.money import Money
+from database.queries import ChangeSet, OrderQueries, ProductQueries, StockQueries
+
+
+def stock(conn, product_id):
+    return ProductQueries.get_product_by_id(conn, product_id).stock_quantity
+
+
+def place_order(conn, product_id, quantity, price="2.50"):
+    unit_price = Money.parse(price)
+    order = Order(order_id=None, user_id=None, order_date=datetime.now(), status="Pending",
+                  total_amount=unit_price * quantity)
+    item = OrderItem(order_item_id=None, order_id=None, product_id=product_id, quantity=quantity,
+                     unit_price=unit_price)
+    return OrderQueries.place_order(conn, order, [item])
+
+
+def test_initial_stock_is_a_receipt(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    movements = StockQueries.get_movements(conn, product_id)
+    assert [(m["movement_type"], m["quantity"], m["note"]) for m in movements] == [
+        ("receipt", 10, "Initial stock")
+    ]
+
+
+def test_movements_update_materialized_stock(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    StockQueries.receive_stock(conn, product_id, 5)
+    ProductQueries.update_stock_quantity(conn, product_id, 3)
+    order_id = place_order(conn, product_id, 4)
+
+    assert stock(conn, product_id) == 8
+    latest = StockQueries.get_movements(conn, product_id)[0]
+    assert (latest["movement_type"], latest["quantity"], latest["reference_id"]) == ("sale", -4, order_id)
+    assert StockQueries.reconcile(conn)[0] == []
+
+
+def test_invalid_movements_are_refused(conn, new_product):
+    product_id = new_product()
+    with pytest.raises(ValueError):
+        StockQueries.receive_stock(conn, product_id, 0)
+    with pytest.raises(ValueError):
+        StockQueries.record_movement(conn, product_id, "theft", -1, changes=ChangeSet())
+    with pytest.raises(ValueError):
+        StockQueries.receive_stock(conn, product_id + 1, 5)
+    assert stock(conn, product_id) == 10
+
+
+def test_reconcile_reports_stock_changed_outside_the_ledger(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    with conn:
+        conn.execute("UPDATE products SET stock_quantity = 99 WHERE product_id = ?", (product_id,))
+    mismatches, _ = StockQueries.reconcile(conn)
+    assert mismatches == [(product_id, 99, 10)]
+
+
+def test_incremental_reconcile_checks_only_products_with_new_movements(conn, new_product):
+    tampered = new_product(name="Tampered")
+    moved = new_product(name="Moved")
+    _, high_water = StockQueries.reconcile(conn)
+    with conn:
+        conn.execute("UPDATE products SET stock_quantity = 99 WHERE product_id = ?", (tampered,))
+    StockQueries.receive_stock(conn, moved, 1)
+
+    mismatches, new_high_water = StockQueries.reconcile(conn, high_water)
+    assert mismatches == []
+    assert new_high_water > high_water
+    assert StockQueries.reconcile(conn)[0] == [(tampered, 99, 10)]
+
+
+def test_checkpoints_keep_the_ledger_balance(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    assert StockQueries.create_checkpoints(conn) == 1
+    ProductQueries.update_stock_quantity(conn, product_id, 4)
+    assert StockQueries.create_checkpoints(conn) == 1
+    assert StockQueries.create_checkpoints(conn) == 0
+    assert StockQueries.reconcile(conn)[0] == []
+
+
+def test_deleting_an_order_returns_its_stock(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    order_id = place_order(conn, product_id, 4)
+    OrderQueries.delete_order(conn, order_id)
+
+    assert stock(conn, product_id) == 10
+    latest = StockQueries.get_movements(conn, product_id)[0]
+    assert (latest["movement_type"], latest["quantity"]) == ("return", 4)
+    assert StockQueries.reconcile(conn)[0] == []
+    assert OrderQueries.get_order_by_id(conn, order_id) is None
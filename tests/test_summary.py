@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from database.money import Money
+from database.queries import ProductQueries, StockQueries
+from database.summary import monthly_trend, rebuild
+
+
+def today_rows(conn):
+    return sorted(tuple(row) for row in conn.execute("""
+        SELECT category, supplier_id, stock_units, stock_value FROM daily_summary WHERE day = date('now')
+    """))
+
+
+def group_totals(conn):
+    return sorted(tuple(row) for row in conn.execute("""
+        SELECT category, COALESCE(supplier_id, 0), SUM(stock_quantity), SUM(stock_quantity * price)
+        FROM products GROUP BY category, COALESCE(supplier_id, 0)
+    """))
+
+
+def test_stock_changes_keep_todays_closing_stock(conn, new_product, new_supplier):
+    supplier_id = new_supplier()
+    hammer = new_product(name="Hammer", stock_quantity=10, price="5.00")
+    nails = new_product(name="Nails", stock_quantity=100, price="0.05", supplier_id=supplier_id)
+    new_product(name="Glue", stock_quantity=3, price="2.00", category="Adhesives")
+
+    StockQueries.receive_stock(conn, hammer, 5)
+    ProductQueries.update_stock_quantity(conn, nails, 40)
+    assert today_rows(conn) == group_totals(conn)
+    assert ("Hardware", 0, 15, 7500) in today_rows(conn)
+
+
+def test_price_and_group_changes_revalue_both_groups(conn, new_product):
+    product = ProductQueries.get_product_by_id(conn, new_product(stock_quantity=10, price="5.00"))
+    new_product(name="Other", stock_quantity=1, price="1.00")
+
+    product.price = Money.parse("6.00")
+    product.category = "Tools"
+    ProductQueries.update_product(conn, product, stock_delta=2)
+    assert today_rows(conn) == [("Hardware", 0, 1, 100), ("Tools", 0, 12, 7200)]
+
+
+def test_movements_do_not_rescan_the_group(conn, new_product):
+    product_id = new_product(stock_quantity=10)
+    for number in range(20):
+        new_product(name=f"Filler {number}")
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        StockQueries.receive_stock(conn, product_id, 5)
+    finally:
+        conn.set_trace_callback(None)
+    assert not any("SUM(" in statement for statement in statements)
+    assert today_rows(conn) == group_totals(conn)
+
+
+def test_rebuild_carries_each_groups_stock_to_month_end(conn, new_product):
+    today = datetime.utcnow().date()
+    long_ago, recently = today - timedelta(days=70), today - timedelta(days=35)
+    hammer = new_product(name="Hammer", stock_quantity=10, price="5.00")
+    glue = new_product(name="Glue", stock_quantity=3, price="2.00", category="Adhesives")
+    StockQueries.receive_stock(conn, hammer, 5)
+    # Glue only ever moves on the day it was added; Hammer also moves a month later
+    with conn:
+        conn.execute("UPDATE stock_movements SET created_at = ? WHERE product_id = ? AND movement_type = 'receipt'"
+                     " AND quantity = 5", (f"{recently} 12:00:00", hammer))
+        conn.execute("UPDATE stock_movements SET created_at = ? WHERE created_at > ?",
+                     (f"{long_ago} 12:00:00", f"{recently} 23:59:59"))
+
+    rebuild(conn)
+
+    day_count = (today - long_ago).days + 1
+    assert conn.execute("SELECT COUNT(*) FROM daily_summary").fetchone()[0] == 2 * day_count
+    expected = []
+    month = long_ago.replace(day=1)
+    while month <= today:
+        next_month = (month + timedelta(days=31)).replace(day=1)
+        close = min(next_month - timedelta(days=1), today)
+        hammer_units = 15 if close >= recently else 10
+        expected.append((month.strftime("%Y-%m"), hammer_units + 3, hammer_units * 500 + 600))
+        month = next_month
+    trend = monthly_trend(conn, months=len(expected))
+    assert [(month, units, value) for month, _, _, _, units, value in trend] == expected
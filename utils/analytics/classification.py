@@ -0,0 +1,178 @@
+"""
+ABC/XYZ classification and inventory valuation for the whole catalog.
+
+ABC ranks products by sales value: the products making up the first 80% of
+value are A, the next 15% B and the rest C. XYZ grades demand variability
+by the coefficient of variation of weekly units sold. Prices, stock and
+sales are read as columnar NumPy arrays in chunks, classified in bulk, and
+only changed classes are written back in one executemany.
+
+Usage:
+    python -m utils.analytics.classification [--db inventory.db] [--weeks 52]
+"""
+import argparse
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import numpy as np
+from utils.analytics.loading import CHUNK_SIZE, load_sales, read_columns
+
+ABC_CLASSES = ("A", "B", "C")
+XYZ_CLASSES = ("X", "Y", "Z")
+ABC_LIMITS = (0.80, 0.95)  # Cumulative share of sales value closing classes A and B
+XYZ_LIMITS = (0.5, 1.0)  # Coefficient of variation closing classes X and Y
+DEFAULT_WEEKS = 52
+CLASSIFICATION_INTERVAL_DAYS = 7
+
+# Class codes are 1-based indexes into ABC_CLASSES / XYZ_CLASSES; 0 means unclassified
+_ABC_LETTERS = np.array(("",) + ABC_CLASSES, dtype=object)
+_XYZ_LETTERS = np.array(("",) + XYZ_CLASSES, dtype=object)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Classification:
+    """Per-product results; every array is aligned with product_ids"""
+    product_ids: np.ndarray
+    abc: np.ndarray  # Class codes 1..3
+    xyz: np.ndarray  # Class codes 1..3
+    sales_value: np.ndarray  # Cents sold over the window, at current prices
+    variation: np.ndarray  # Coefficient of variation of weekly demand; inf without sales
+    stock_value: np.ndarray  # Cents of stock on hand
+
+    def value_by_class(self) -> Dict[str, int]:
+        """Stock value in cents per ABC class"""
+        totals = np.bincount(self.abc, weights=self.stock_value, minlength=len(ABC_CLASSES) + 1)
+        return {letter: int(total) for letter, total in zip(ABC_CLASSES, totals[1:])}
+
+    def matrix(self) -> Dict[str, int]:
+        """Number of products in each combined class, e.g. {"AX": 120, ...}"""
+        counts = np.bincount(self.abc * 4 + self.xyz, minlength=16)
+        return {
+            abc + xyz: int(counts[(i + 1) * 4 + j + 1])
+            for i, abc in enumerate(ABC_CLASSES)
+            for j, xyz in enumerate(XYZ_CLASSES)
+        }
+
+
+def classify(product_ids: np.ndarray, prices: np.ndarray, stock: np.ndarray,
+             weekly_sales: np.ndarray) -> Classification:
+    """
+    Classify every product at once.
+
+    Args:
+        product_ids: product IDs
+        prices: unit prices in cents
+        stock: stock on hand
+        weekly_sales: (products, weeks) units sold per week
+    """
+    units = weekly_sales.sum(axis=1, dtype=np.float64)
+    sales_value = units * prices
+
+    # ABC: share of total value sold before each product, in descending value order,
+    # so the product that crosses a limit still belongs to the class it completes
+    order = np.argsort(-sales_value, kind="stable")
+    ranked = sales_value[order]
+    total = ranked.sum()
+    share_before = (np.cumsum(ranked) - ranked) / total if total > 0 else np.ones_like(ranked)
+    abc = np.empty(len(product_ids), dtype=np.int64)
+    abc[order] = 1 + np.searchsorted(ABC_LIMITS, share_before, side="right")
+    abc[sales_value <= 0] = len(ABC_CLASSES)
+
+    # XYZ: coefficient of variation of weekly demand; no demand at all is Z
+    mean = weekly_sales.mean(axis=1, dtype=np.float64)
+    std = weekly_sales.std(axis=1, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variation = np.where(mean > 0, std / mean, np.inf)
+    xyz = 1 + np.searchsorted(XYZ_LIMITS, variation, side="left")
+
+    return Classification(
+        product_ids=product_ids,
+        abc=abc,
+        xyz=xyz,
+        sales_value=sales_value,
+        variation=variation,
+        stock_value=np.maximum(stock, 0) * prices,
+    )
+
+
+def write_classes(conn: sqlite3.Connection, result: Classification, current_abc: np.ndarray,
+                  current_xyz: np.ndarray) -> int:
+    """
+    Store classes that differ from ``current_abc``/``current_xyz`` (codes as
+    read from the database) with one executemany. Product versions are not
+    bumped, so classification never conflicts with edits.
+
+    Returns:
+        int: number of products updated
+    """
+    changed = np.flatnonzero((result.abc != current_abc) | (result.xyz != current_xyz))
+    conn.executemany(
+        "UPDATE products SET abc_class = ?, xyz_class = ? WHERE product_id = ?",
+        zip(_ABC_LETTERS[result.abc[changed]].tolist(),
+            _XYZ_LETTERS[result.xyz[changed]].tolist(),
+            result.product_ids[changed].tolist())
+    )
+    return len(changed)
+
+
+def run_classification(conn: sqlite3.Connection, weeks: int = DEFAULT_WEEKS,
+                       chunk_size: int = CHUNK_SIZE) -> Classification:
+    """Classify the catalog on ``weeks`` of sales, store the classes and record the run"""
+    columns = read_columns(conn, """
+        SELECT product_id, price, stock_quantity,
+               COALESCE(instr('ABC', abc_class), 0), COALESCE(instr('XYZ', xyz_class), 0)
+        FROM products ORDER BY product_id
+    """, columns=5, chunk_size=chunk_size)
+    product_ids = columns[:, 0].copy()
+    weekly_sales = load_sales(conn, product_ids, weeks, 7, chunk_size=chunk_size)
+    result = classify(product_ids, columns[:, 1], columns[:, 2], weekly_sales)
+
+    with conn:
+        changed = write_classes(conn, result, columns[:, 3], columns[:, 4])
+        conn.execute("""
+            INSERT INTO classification_runs (products, changed, sales_value, stock_value)
+            VALUES (?, ?, ?, ?)
+        """, (len(product_ids), changed, int(result.sales_value.sum()), int(result.stock_value.sum())))
+    logger.info(f"Classified {len(product_ids)} products, {changed} changed class")
+    return result
+
+
+def last_classified_at(conn: sqlite3.Connection) -> Optional[datetime]:
+    row = conn.execute("SELECT MAX(ran_at) FROM classification_runs").fetchone()
+    return datetime.fromisoformat(row[0]) if row[0] else None
+
+
+def classification_due(conn: sqlite3.Connection, interval_days: int = CLASSIFICATION_INTERVAL_DAYS) -> bool:
+    last_run = last_classified_at(conn)
+    return last_run is None or datetime.utcnow() - last_run >= timedelta(days=interval_days)
+
+
+def classify_database(db_path: str, weeks: int = DEFAULT_WEEKS) -> Classification:
+    """Run the classification on its own connection, so it is safe from a worker thread"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return run_classification(conn, weeks)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify products by sales value and demand variability")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS, help="weeks of sales history")
+    args = parser.parse_args()
+
+    result = classify_database(args.db, args.weeks)
+    print(f"Classified {len(result.product_ids):,} products")
+    for combined, count in result.matrix().items():
+        print(f"  {combined}: {count:,}")
+    for letter, value in result.value_by_class().items():
+        print(f"  stock value {letter}: {value / 100:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Demand forecasting and reorder suggestions for the whole catalog.
+
+Daily sales are loaded into a (products x days) array and every statistic
+is computed for all products at once with array operations, so cost grows
+with the array size rather than with per-product Python work.
+"""
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from statistics import NormalDist
+from typing import List, Optional, Tuple
+import numpy as np
+from utils.analytics.loading import load_sales, read_columns
+
+DEFAULT_HISTORY_DAYS = 365
+
+
+def load_catalog(conn: sqlite3.Connection) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns:
+        tuple: (product IDs ascending, stock on hand) as int64 arrays
+    """
+    catalog = read_columns(conn, "SELECT product_id, stock_quantity FROM products ORDER BY product_id",
+                           columns=2)
+    return catalog[:, 0].copy(), catalog[:, 1].copy()
+
+
+def load_daily_sales(conn: sqlite3.Connection, product_ids: np.ndarray,
+                     days: int = DEFAULT_HISTORY_DAYS, end: Optional[date] = None) -> np.ndarray:
+    """Units sold per product per day for the ``days`` days ending with ``end``, see load_sales"""
+    return load_sales(conn, product_ids, days, 1, end)
+
+
+def moving_average(sales: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing ``window``-day mean of every row, via a cumulative sum.
+
+    Returns:
+        np.ndarray: shape (products, days - window + 1); column i averages
+        days i .. i + window - 1
+    """
+    window = min(window, sales.shape[1])
+    totals = np.zeros((sales.shape[0], sales.shape[1] + 1))
+    np.cumsum(sales, axis=1, dtype=np.float64, out=totals[:, 1:])
+    return (totals[:, window:] - totals[:, :-window]) / window
+
+
+def exponential_smoothing(sales: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Final level of simple exponential smoothing for every row.
+
+    The recursive level_t = alpha * x_t + (1 - alpha) * level_t-1, seeded
+    with the first day, unrolls to fixed weights per day, so all products are
+    smoothed by one matrix-vector product.
+    """
+    days = sales.shape[1]
+    if days == 0:
+        return np.zeros(sales.shape[0])
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (days - 1)
+    # Matching dtypes keep matmul from copying the whole sales array
+    return (sales @ weights.astype(sales.dtype)).astype(np.float64)
+
+
+@dataclass(slots=True)
+class ReorderPlan:
+    """Per-product forecast figures; every array is aligned with product_ids"""
+    product_ids: np.ndarray
+    stock: np.ndarray
+    moving_average: np.ndarray  # Mean daily demand over the last window
+    forecast: np.ndarray  # Exponentially smoothed daily demand
+    demand_std: np.ndarray  # Standard deviation of daily demand
+    safety_stock: np.ndarray
+    reorder_level: np.ndarray  # Order when stock falls to this
+    order_up_to: np.ndarray  # Target stock after ordering
+    suggested_quantity: np.ndarray  # Units to order now, 0 when not needed
+
+    def suggestions(self, limit: Optional[int] = None) -> List[tuple]:
+        """
+        Products that should be reordered, most units first, as (product_id,
+        stock, daily forecast, safety stock, reorder level, suggested quantity)
+        """
+        indexes = np.flatnonzero(self.suggested_quantity > 0)
+        indexes = indexes[np.argsort(-self.suggested_quantity[indexes], kind="stable")][:limit]
+        return [
+            (int(self.product_ids[i]), int(self.stock[i]), float(self.forecast[i]),
+             int(self.safety_stock[i]), int(self.reorder_level[i]), int(self.suggested_quantity[i]))
+            for i in indexes
+        ]
+
+
+def plan_reorders(product_ids: np.ndarray, stock: np.ndarray, sales: np.ndarray,
+                  lead_time_days: int = 7, review_days: int = 7, service_level: float = 0.95,
+                  window: int = 28, alpha: float = 0.3) -> ReorderPlan:
+    """
+    Forecast demand and size replenishment orders for every product.
+
+    Safety stock covers demand variability over the lead time at the given
+    service level. A product is reordered when stock is at or below expected
+    lead-time demand plus safety stock, up to enough to also last the review
+    period.
+
+    Args:
+        product_ids: product IDs, one per row of ``sales``
+        stock: stock on hand per product
+        sales: (products, days) units sold per day, oldest first
+        lead_time_days: days between ordering and receiving stock
+        review_days: days until the next purchasing review
+        service_level: probability of not running out during the lead time
+        window: days in the moving average
+        alpha: exponential smoothing factor, 0 < alpha <= 1
+    """
+    z = NormalDist().inv_cdf(service_level)
+    days = sales.shape[1]
+    # Only the latest moving average is needed, so only its window is summed
+    recent_average = (moving_average(sales[:, -window:], window)[:, -1] if days
+                      else np.zeros(len(product_ids)))
+    forecast = exponential_smoothing(sales, alpha)
+    demand_std = (sales.std(axis=1, ddof=1, dtype=np.float64) if days > 1
+                  else np.zeros(len(product_ids)))
+
+    safety_stock = np.ceil(z * demand_std * math.sqrt(lead_time_days))
+    reorder_level = np.ceil(forecast * lead_time_days) + safety_stock
+    order_up_to = np.ceil(forecast * (lead_time_days + review_days)) + safety_stock
+    suggested = np.where(
+        (stock <= reorder_level) & (order_up_to > 0),
+        np.maximum(order_up_to - stock, 0),
+        0
+    ).astype(np.int64)
+
+    return ReorderPlan(
+        product_ids=product_ids,
+        stock=stock,
+        moving_average=recent_average,
+        forecast=forecast,
+        demand_std=demand_std,
+        safety_stock=safety_stock.astype(np.int64),
+        reorder_level=reorder_level.astype(np.int64),
+        order_up_to=order_up_to.astype(np.int64),
+        suggested_quantity=suggested,
+    )
+
+
+def plan_catalog_reorders(conn: sqlite3.Connection, days: int = DEFAULT_HISTORY_DAYS, **options) -> ReorderPlan:
+    """Load the catalog and its sales history, then run plan_reorders over it"""
+    product_ids, stock = load_catalog(conn)
+    sales = load_daily_sales(conn, product_ids, days)
+    return plan_reorders(product_ids, stock, sales, **options)
@@ -0,0 +1,291 @@
+"""
+Columnar snapshots of products, orders and order items for analytics.
+
+The exporter reads every table inside one read transaction, so the
+snapshot is consistent, and streams rows in chunks into one ``.npy`` file
+per column plus a ``manifest.json``. Readers memory-map the column files
+and never open the live database.
+
+Column kinds:
+    int       int64; NULL is stored as 0
+    datetime  datetime64[s] (UTC)
+    category  int32 codes into the manifest's category list; -1 is NULL
+    text      UTF-8 bytes in ``<column>.data.npy`` with int64 start offsets
+              in ``<column>.offsets.npy`` (one more offset than rows)
+
+Usage:
+    python -m utils.analytics.snapshot [--db inventory.db] [--archive inventory_archive.db] [--out snapshots]
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from database.archive import default_archive_path
+from utils.analytics.loading import CHUNK_SIZE
+
+MANIFEST = "manifest.json"
+SNAPSHOT_FORMAT = 1
+
+# Exported tables: (column, kind) pairs, in the order they are selected
+SNAPSHOT_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "products": [("product_id", "int"), ("name", "text"), ("category", "category"),
+                 ("price", "int"), ("stock_quantity", "int"), ("reorder_point", "int"),
+                 ("supplier_id", "int"), ("abc_class", "category"), ("xyz_class", "category"),
+                 ("sku", "text"), ("barcode", "text")],
+    "orders": [("order_id", "int"), ("user_id", "int"), ("order_date", "datetime"),
+               ("status", "category"), ("total_amount", "int")],
+    "order_items": [("order_item_id", "int"), ("order_id", "int"), ("product_id", "int"),
+                    ("quantity", "int"), ("unit_price", "int")],
+}
+ARCHIVED_TABLES = ("orders", "order_items")
+KEY_COLUMNS = {"products": "product_id", "orders": "order_id", "order_items": "order_item_id"}
+
+
+def _select_expression(column: str, kind: str) -> str:
+    if kind == "int":
+        return f"COALESCE({column}, 0) AS {column}"
+    if kind == "datetime":
+        return f"CAST(strftime('%s', {column}) AS INTEGER) AS {column}"
+    return column
+
+
+def _source_sql(table: str, archived: bool) -> str:
+    """Rows of ``table`` from the main database, plus the archive when attached"""
+    columns = ", ".join(_select_expression(column, kind) for column, kind in SNAPSHOT_COLUMNS[table])
+    sql = f"SELECT {columns} FROM main.{table}"
+    if archived and table in ARCHIVED_TABLES:
+        sql += f" UNION ALL SELECT {columns} FROM archive.{table}"
+    return f"{sql} ORDER BY {KEY_COLUMNS[table]}"
+
+
+def _text_bytes(conn: sqlite3.Connection, table: str, column: str, archived: bool) -> int:
+    sources = [f"main.{table}"] + ([f"archive.{table}"] if archived and table in ARCHIVED_TABLES else [])
+    return sum(
+        conn.execute(f"SELECT COALESCE(SUM(length(CAST({column} AS BLOB))), 0) FROM {source}").fetchone()[0]
+        for source in sources
+    )
+
+
+def _export_table(conn: sqlite3.Connection, directory: str, table: str, archived: bool,
+                  chunk_size: int) -> dict:
+    columns = SNAPSHOT_COLUMNS[table]
+    rows = sum(
+        conn.execute(f"SELECT COUNT(*) FROM {schema}.{table}").fetchone()[0]
+        for schema in (["main", "archive"] if archived and table in ARCHIVED_TABLES else ["main"])
+    )
+
+    # Files are sized up front from counts taken in the same transaction,
+    # so each chunk is written straight into its memory-mapped slice
+    arrays, entries, categories, text_offsets = {}, {}, {}, {}
+    for column, kind in columns:
+        base = os.path.join(directory, f"{table}.{column}")
+        if kind == "text":
+            size = _text_bytes(conn, table, column, archived)
+            arrays[column] = (
+                np.lib.format.open_memmap(f"{base}.offsets.npy", mode="w+", dtype=np.int64, shape=(rows + 1,)),
+                np.lib.format.open_memmap(f"{base}.data.npy", mode="w+", dtype=np.uint8, shape=(size,)),
+            )
+            arrays[column][0][0] = 0
+            text_offsets[column] = 0
+            entries[column] = {"kind": kind, "offsets": f"{table}.{column}.offsets.npy",
+                               "data": f"{table}.{column}.data.npy"}
+        else:
+            dtype = {"int": np.int64, "datetime": "datetime64[s]", "category": np.int32}[kind]
+            arrays[column] = np.lib.format.open_memmap(f"{base}.npy", mode="w+", dtype=dtype, shape=(rows,))
+            entries[column] = {"kind": kind, "file": f"{table}.{column}.npy"}
+            if kind == "category":
+                categories[column] = {}
+
+    cursor = conn.execute(_source_sql(table, archived))
+    position = 0
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        end = position + len(chunk)
+        values_by_column = list(zip(*chunk))
+        for (column, kind), values in zip(columns, values_by_column):
+            if kind == "int":
+                arrays[column][position:end] = np.array(values, dtype=np.int64)
+            elif kind == "datetime":
+                arrays[column][position:end] = np.array(values, dtype="datetime64[s]")
+            elif kind == "category":
+                codes = categories[column]
+                arrays[column][position:end] = [
+                    -1 if value is None else codes.setdefault(value, len(codes)) for value in values
+                ]
+            else:
+                encoded = [(value or "").encode("utf-8") for value in values]
+                offsets, data = arrays[column]
+                lengths = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+                start = text_offsets[column]
+                offsets[position + 1:end + 1] = start + np.cumsum(lengths)
+                text_offsets[column] = int(offsets[end])
+                data[start:text_offsets[column]] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        position = end
+
+    for column, array in arrays.items():
+        for part in (array if isinstance(array, tuple) else (array,)):
+            part.flush()
+    for column, codes in categories.items():
+        entries[column]["categories"] = list(codes)
+    return {"rows": rows, "columns": entries}
+
+
+def export_snapshot(db_path: str, output_dir: str, archive_path: Optional[str] = None,
+                    chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Write a snapshot of the database to a new directory under ``output_dir``.
+
+    Every table is read inside one read transaction on a read-only
+    connection. The main and archive databases are both read by the
+    transaction's first statement, so an archive batch (which commits to
+    both in one transaction) is seen in both or neither. That holds with
+    SQLite's default rollback journal; in WAL mode SQLite commits attached
+    databases one at a time, so an order archived at that moment may appear
+    twice or not at all. The manifest is written last and the directory
+    renamed into place, so a snapshot directory is either complete or absent.
+
+    Returns:
+        str: path of the snapshot directory
+    """
+    created_at = datetime.utcnow()
+    final_dir = os.path.join(output_dir, f"snapshot-{created_at:%Y%m%d-%H%M%S-%f}")
+    partial_dir = final_dir + ".partial"
+    os.makedirs(partial_dir)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    conn.isolation_level = None  # Transactions are managed explicitly below
+    try:
+        archived = archive_path is not None and os.path.exists(archive_path)
+        if archived:
+            conn.execute("ATTACH DATABASE ? AS archive", (f"file:{archive_path}?mode=ro",))
+
+        conn.execute("BEGIN")
+        try:
+            # A deferred BEGIN takes no locks; start reading both files together, before any table
+            conn.execute("SELECT (SELECT COUNT(*) FROM main.sqlite_master)" +
+                         (", (SELECT COUNT(*) FROM archive.sqlite_master)" if archived else "")).fetchone()
+            tables = {
+                table: _export_table(conn, partial_dir, table, archived, chunk_size)
+                for table in SNAPSHOT_COLUMNS
+            }
+            schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.execute("COMMIT")
+    except Exception:
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "source": os.path.abspath(db_path),
+        "includes_archive": archived,
+        "schema_version": schema_version,
+        "tables": tables,
+    }
+    try:
+        with open(os.path.join(partial_dir, MANIFEST), "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.rename(partial_dir, final_dir)
+    except OSError:
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        raise
+    return final_dir
+
+
+class TextColumn:
+    """Memory-mapped UTF-8 strings; decodes only the rows that are accessed"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def to_list(self) -> List[str]:
+        return [self[index] for index in range(len(self))]
+
+
+class Snapshot:
+    """
+    Read-only view of an exported snapshot. Column files are memory-mapped
+    on first access, so opening a snapshot reads only the manifest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as manifest_file:
+            self.manifest = json.load(manifest_file)
+        if self.manifest["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {self.manifest['format']}")
+        self._columns = {}
+
+    @classmethod
+    def latest(cls, output_dir: str) -> "Snapshot":
+        """The newest complete snapshot under ``output_dir``"""
+        names = sorted(
+            name for name in os.listdir(output_dir)
+            if name.startswith("snapshot-") and os.path.exists(os.path.join(output_dir, name, MANIFEST))
+        )
+        if not names:
+            raise FileNotFoundError(f"No snapshots in {output_dir}")
+        return cls(os.path.join(output_dir, names[-1]))
+
+    @property
+    def tables(self) -> List[str]:
+        return list(self.manifest["tables"])
+
+    def rows(self, table: str) -> int:
+        return self.manifest["tables"][table]["rows"]
+
+    def categories(self, table: str, column: str) -> List[str]:
+        """Values of a category column, indexed by code"""
+        return self.manifest["tables"][table]["columns"][column]["categories"]
+
+    def column(self, table: str, column: str):
+        """A memory-mapped array, or a TextColumn for text columns"""
+        key = (table, column)
+        if key not in self._columns:
+            entry = self.manifest["tables"][table]["columns"][column]
+            if entry["kind"] == "text":
+                self._columns[key] = TextColumn(self._load(entry["offsets"]), self._load(entry["data"]))
+            else:
+                self._columns[key] = self._load(entry["file"])
+        return self._columns[key]
+
+    def _load(self, filename: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, filename), mmap_mode="r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a columnar analytics snapshot")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--archive", help="archive database to include, if it exists "
+                                          "(default: <db name>_archive.db next to the database)")
+    parser.add_argument("--out", default="snapshots", help="directory to create the snapshot in")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    path = export_snapshot(args.db, args.out, args.archive or default_archive_path(args.db))
+    snapshot = Snapshot(path)
+    print(f"Wrote {path}")
+    for table in snapshot.tables:
+        print(f"  {table}: {snapshot.rows(table):,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Streaming import of supplier catalogs from CSV.
+
+The file is read one row at a time by a generator, each row is checked
+with the same rules as the product form, and valid rows are upserted by
+SKU in chunked transactions, so memory use does not grow with the file.
+Rows that fail, or name a supplier email that does not exist, go to a
+reject file with the reason and the rest of the file is still imported.
+
+Columns, by header name in any order (other columns are ignored):
+    sku, name, category, price, stock_quantity         required
+    description, reorder_point, supplier_email, barcode optional
+
+An optional column left out of the file keeps existing products' values.
+stock_quantity is the count on hand: a new product receives it as initial
+stock and an existing product gets an adjustment for the difference, both
+recorded in the stock ledger. A barcode already used by another product
+rejects the row.
+
+The import writes through its own connection. After each chunk commits it
+publishes the same product and low-stock events, and drops the same cached
+products, as the product queries do.
+
+Usage:
+    python -m utils.catalog.importer catalog.csv [--db inventory.db] [--rejects catalog.rejects.csv]
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from database.events import INSERT, UPDATE
+from database.queries import ChangeSet
+from database.summary import record_group_stock
+from utils.catalog.validation import validate_barcode, validate_product_fields
+
+REQUIRED_COLUMNS = ("sku", "name", "category", "price", "stock_quantity")
+OPTIONAL_COLUMNS = ("description", "reorder_point", "supplier_email", "barcode")
+IMPORT_CHUNK_SIZE = 5_000
+
+# (sku, name, description, category, price cents, reorder_point, supplier email, barcode,
+# stock_quantity); the email is replaced by the supplier ID once resolved
+ParsedRow = Tuple[str, str, Optional[str], str, int, int, Optional[str], Optional[str], int]
+
+
+@dataclass(slots=True)
+class ImportResult:
+    inserted: int = 0
+    updated: int = 0  # Rows matching an existing SKU, whether or not anything changed
+    rejected: int = 0
+    reject_path: Optional[str] = None  # Only written when rows were rejected
+    seconds: float = 0.0
+
+    @property
+    def imported(self) -> int:
+        return self.inserted + self.updated
+
+
+class _RejectWriter:
+    """CSV of rejected rows with their line number and reason, created on the first reject"""
+
+    def __init__(self, path: str, header: List[str]):
+        self.path = path
+        self.header = header
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line: int, values: List[str], error: str):
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["line", "error"] + self.header)
+        self._writer.writerow([line, error] + values)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def read_header(reader) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Read the header row and check the required columns are present.
+
+    Returns:
+        tuple: (header as written, position of each column by lower-case name)
+    """
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The file is empty")
+    positions = {name.strip().lower(): position for position, name in enumerate(header)}
+    missing = [column for column in REQUIRED_COLUMNS if column not in positions]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return header, positions
+
+
+def read_rows(reader) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (line number, values) for each non-blank record; line numbers count the header"""
+    for values in reader:
+        if values:
+            yield reader.line_num, values
+
+
+def field_getter(positions: Dict[str, int]) -> Callable[[List[str]], Tuple[str, ...]]:
+    """
+    Build a function returning a record's REQUIRED_COLUMNS then
+    OPTIONAL_COLUMNS values, stripped, with "" for absent columns.
+    """
+    width = max(positions.values()) + 1
+    # Absent columns read the "" appended after the padded record
+    getter = itemgetter(*(positions.get(column, width) for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS))
+    padding = [""] * (width + 1)
+
+    def fields(values):
+        return tuple(value.strip() for value in getter(values[:width] + padding[min(len(values), width):]))
+    return fields
+
+
+def parse_row(fields: Tuple[str, ...]) -> ParsedRow:
+    """
+    Args:
+        fields: values as returned by a field_getter
+
+    Raises:
+        ValueError: with the reason the row is rejected
+    """
+    sku, name, category, price, stock, description, reorder_point, email, barcode = fields
+    if not sku:
+        raise ValueError("Missing SKU")
+    # A blank reorder point takes the product form's default
+    price, stock, reorder_point = validate_product_fields(name, category, price, stock, reorder_point or "0")
+    if barcode:
+        validate_barcode(barcode)
+    return (sku, name, description or None, category, price.cents, reorder_point, email or None,
+            barcode or None, stock)
+
+
+def _upsert_sql(columns: Dict[str, int]) -> str:
+    updated = ["name", "category", "price"]
+    updated += [column for column in ("description", "reorder_point") if column in columns]
+    if "supplier_email" in columns:
+        updated.append("supplier_id")
+    if "barcode" in columns:
+        updated.append("barcode")
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in updated)
+    current = ", ".join(updated)
+    incoming = ", ".join(f"excluded.{column}" for column in updated)
+    # Unchanged rows are left alone so their version, and open edit forms, stay valid
+    return f"""
+        INSERT INTO products (sku, name, description, category, price, reorder_point, supplier_id,
+                              barcode, stock_quantity)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (sku) DO UPDATE
+        SET {assignments}, version = version + 1
+        WHERE ({current}) IS NOT ({incoming})
+    """
+
+
+def _resolve_suppliers(conn: sqlite3.Connection, emails: set, suppliers: Dict[str, Optional[int]]):
+    """Add the supplier IDs of ``emails`` to ``suppliers`` (None if unknown) in one query"""
+    emails = emails - suppliers.keys()
+    if not emails:
+        return
+    found = dict(conn.execute("""
+        SELECT email, supplier_id FROM suppliers
+        WHERE email IN (SELECT value FROM json_each(?))
+    """, (json.dumps(sorted(emails)),)).fetchall())
+    for email in emails:
+        suppliers[email] = found.get(email)
+
+
+def _write_chunk(conn: sqlite3.Connection, chunk: List[Tuple[int, List[str], ParsedRow]], upsert_sql: str,
+                 suppliers: Dict[str, Optional[int]], rejects: _RejectWriter, result: ImportResult):
+    _resolve_suppliers(conn, {parsed[6] for _, _, parsed in chunk if parsed[6] is not None}, suppliers)
+
+    products = {}  # sku -> row to store; a later row for the same SKU wins
+    sources = {}  # sku -> (line, values) of that row, for rejecting it later
+    for line, values, parsed in chunk:
+        email = parsed[6]
+        supplier_id = suppliers[email] if email is not None else None
+        if email is not None and supplier_id is None:
+            rejects.write(line, values, f"Unknown supplier email: {email}")
+            continue
+        products[parsed[0]] = parsed[:6] + (supplier_id,) + parsed[7:]
+        sources[parsed[0]] = (line, values)
+    if not products:
+        return
+
+    changes = ChangeSet()
+    with conn:
+        # Take the write lock first, so stock and barcodes read here cannot change before they are written
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.cursor()
+
+        # A barcode can belong to one product only; rows that would take another's are rejected
+        barcodes = {values[7] for values in products.values() if values[7] is not None}
+        if barcodes:
+            cursor.execute("""
+                SELECT barcode, sku FROM products
+                WHERE barcode IN (SELECT value FROM json_each(?))
+            """, (json.dumps(sorted(barcodes)),))
+            owners = dict(cursor.fetchall())  # barcode -> sku (None for a product without one)
+            for sku, values in list(products.items()):
+                barcode = values[7]
+                if barcode is not None and owners.setdefault(barcode, sku) != sku:
+                    rejects.write(*sources[sku], f"Barcode {barcode} belongs to another product")
+                    del products[sku]
+            if not products:
+                return
+        skus = json.dumps(list(products))
+
+        cursor.execute("""
+            SELECT sku, product_id, stock_quantity, category, supplier_id, reorder_point, version FROM products
+            WHERE sku IN (SELECT value FROM json_each(?))
+        """, (skus,))
+        existing = {row[0]: row[1:] for row in cursor.fetchall()}
+        # New products are inserted with their stock; existing ones keep theirs until adjusted below
+        cursor.executemany(upsert_sql, products.values())
+
+        # Every stock change is recorded in the ledger
+        movements = [
+            (product_id, "adjustment", products[sku][8] - stock_quantity, "Catalog import")
+            for sku, (product_id, stock_quantity, *_) in existing.items()
+            if products[sku][8] != stock_quantity
+        ]
+        cursor.executemany(
+            "UPDATE products SET stock_quantity = stock_quantity + ? WHERE product_id = ?",
+            ((quantity, product_id) for product_id, _, quantity, _ in movements)
+        )
+
+        # The same product and low-stock events the product queries publish
+        cursor.execute("""
+            SELECT sku, product_id, stock_quantity, reorder_point, version FROM products
+            WHERE sku IN (SELECT value FROM json_each(?))
+        """, (skus,))
+        for sku, product_id, stock_quantity, reorder_point, version in cursor.fetchall():
+            if sku not in existing:
+                if stock_quantity != 0:
+                    movements.append((product_id, "receipt", stock_quantity, "Initial stock"))
+                changes.add("product", product_id, INSERT)
+                changes.low_stock(product_id, False, stock_quantity <= reorder_point)
+                continue
+            _, old_stock, _, _, old_reorder_point, old_version = existing[sku]
+            if (stock_quantity, version) != (old_stock, old_version):
+                changes.add("product", product_id, UPDATE)
+                changes.low_stock(product_id, old_stock <= old_reorder_point, stock_quantity <= reorder_point)
+        cursor.executemany("""
+            INSERT INTO stock_movements (product_id, movement_type, quantity, note)
+            VALUES (?, ?, ?, ?)
+        """, movements)
+
+        # Once per group rather than per product
+        groups = {(values[3], values[6]) for values in products.values()}
+        groups.update((category, supplier_id) for _, _, category, supplier_id, _, _ in existing.values())
+        for category, supplier_id in groups:
+            record_group_stock(cursor, category, supplier_id)
+
+    changes.publish(conn)
+    result.updated += len(existing)
+    result.inserted += len(products) - len(existing)
+
+
+def import_catalog(conn: sqlite3.Connection, csv_path: str, reject_path: Optional[str] = None,
+                   chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportResult:
+    """
+    Import a catalog CSV, committing every ``chunk_size`` rows. If a chunk
+    fails to write, earlier chunks stay imported and the error is raised.
+
+    Args:
+        conn: connection to write through
+        csv_path: catalog file, UTF-8 with or without a byte order mark
+        reject_path: where to write rejected rows; next to the file by default
+    """
+    started = time.perf_counter()
+    if reject_path is None:
+        reject_path = os.path.splitext(csv_path)[0] + ".rejects.csv"
+    result = ImportResult(reject_path=reject_path)
+    suppliers = {}  # email -> supplier_id, cached across chunks
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.reader(csv_file)
+        header, positions = read_header(reader)
+        upsert_sql = _upsert_sql(positions)
+        fields = field_getter(positions)
+        rejects = _RejectWriter(reject_path, header)
+        try:
+            def parsed_rows():
+                for line, values in read_rows(reader):
+                    try:
+                        yield line, values, parse_row(fields(values))
+                    except ValueError as e:
+                        rejects.write(line, values, str(e))
+
+            rows = parsed_rows()
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                _write_chunk(conn, chunk, upsert_sql, suppliers, rejects, result)
+        finally:
+            rejects.close()
+
+    result.rejected = rejects.count
+    if not result.rejected:
+        result.reject_path = None
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_catalog_file(db_path: str, csv_path: str, reject_path: Optional[str] = None) -> ImportResult:
+    """Run the import on its own connection, so it is safe from a worker thread"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return import_catalog(conn, csv_path, reject_path)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or update products from a supplier catalog CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--rejects", help="file for rejected rows (default: <csv name>.rejects.csv)")
+    args = parser.parse_args()
+
+    result = import_catalog_file(args.db, args.csv_path, args.rejects)
+    rate = result.imported / result.seconds if result.seconds else 0
+    print(f"Imported {result.imported:,} rows ({result.inserted:,} new, {result.updated:,} updated) "
+          f"in {result.seconds:.1f} s, {rate:,.0f} rows/s")
+    if result.rejected:
+        print(f"Rejected {result.rejected:,} rows, see {result.reject_path}")
+
+
+if __name__ == "__main__":
+    main()
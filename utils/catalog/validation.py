@@ -0,0 +1,52 @@
+from typing import Tuple
+from database.money import Money
+
+
+def validate_product_fields(name: str, category: str, price: str, stock: str,
+                            reorder_point: str) -> Tuple[Money, int, int]:
+    """
+    Check product fields entered as text, as in the product form or an
+    imported catalog row.
+
+    Returns:
+        tuple: (price, stock quantity, reorder point) parsed
+
+    Raises:
+        ValueError: with a message for the user if a field is missing or invalid
+    """
+    if not all([name, category, price, stock, reorder_point]):
+        raise ValueError("Please fill in all required fields")
+
+    try:
+        amount = Money.parse(price)
+        quantity = int(stock)
+        reorder_level = int(reorder_point)
+    except ValueError:
+        raise ValueError("Invalid price, stock quantity or reorder point") from None
+
+    if amount < Money(0):
+        raise ValueError("Price cannot be negative")
+
+    if quantity < 0:
+        raise ValueError("Stock quantity cannot be negative")
+
+    if reorder_level < 0:
+        raise ValueError("Reorder point cannot be negative")
+
+    return amount, quantity, reorder_level
+
+
+def validate_barcode(barcode: str) -> None:
+    """
+    Check the check digit of a 12 or 13 digit UPC-A/EAN-13 code. Other
+    codes, such as EAN-8, UPC-E or internal labels, are accepted as they are.
+
+    Raises:
+        ValueError: if the check digit does not match
+    """
+    if barcode.isdigit() and len(barcode) in (12, 13):
+        digits = [int(digit) for digit in barcode.zfill(13)]
+        # Weights alternate 1, 3 from the left of the 13-digit form
+        total = sum(digit * (3 if position % 2 else 1) for position, digit in enumerate(digits[:12]))
+        if (10 - total % 10) % 10 != digits[12]:
+            raise ValueError(f"Invalid barcode check digit: {barcode}")
@@ -0,0 +1,247 @@
+"""
+Streaming export of products, suppliers, orders and order items to CSV or
+JSON Lines, optionally gzip-compressed.
+
+Rows are read in keyset pages (``key > last key ORDER BY key LIMIT n``),
+each page a short read of its own, and written as they arrive. Memory use
+does not depend on the size of the export, and the read lock is released
+between pages, so writers are never held up for the length of a long
+export. Archived orders and their items are included when the archive is
+attached and the date range reaches it.
+
+Money is written as decimal strings (e.g. "12.50") in both formats, so
+amounts never pass through floats.
+
+Usage:
+    python -m utils.export.exporter products products.csv.gz [--db inventory.db]
+        [--category Tools] [--supplier 3] [--from 2024-01-01] [--to 2024-01-31]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from database.archive import ARCHIVE_SCHEMA, OrderArchive, archived_before, default_archive_path
+from database.money import Money
+
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_CHUNK_SIZE = 5_000
+
+EXPORT_COLUMNS = {
+    "products": ["product_id", "sku", "barcode", "name", "category", "description", "price",
+                 "stock_quantity", "reorder_point", "supplier_id", "abc_class", "xyz_class"],
+    "suppliers": ["supplier_id", "name", "contact_person", "email", "phone", "address"],
+    "orders": ["order_id", "user_id", "order_date", "status", "total_amount"],
+    "order_items": ["order_item_id", "order_id", "product_id", "quantity", "unit_price"],
+}
+KEY_COLUMNS = {"products": "product_id", "suppliers": "supplier_id",
+               "orders": "order_id", "order_items": "order_item_id"}
+MONEY_COLUMNS = ("price", "total_amount", "unit_price")
+ARCHIVED_TABLES = ("orders", "order_items")
+
+
+@dataclass(slots=True)
+class ExportFilters:
+    """Row filters; each applies to the tables listed"""
+    start: Optional[datetime] = None  # orders, order_items: placed at or after (UTC)
+    end: Optional[datetime] = None  # orders, order_items: placed before (UTC)
+    category: Optional[str] = None  # all: products in, suppliers of, orders/items containing
+    supplier_id: Optional[int] = None  # all: products from, that supplier, orders/items containing
+
+
+def export_format(path: str) -> str:
+    """Format implied by a file name such as ``orders.jsonl.gz``"""
+    base = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(base)[1].lstrip(".").lower()
+    if extension == "ndjson":
+        return "jsonl"
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Cannot tell the export format from '{path}'; use .csv or .jsonl (optionally .gz)")
+    return extension
+
+
+def _conditions(table: str, schema: str, filters: ExportFilters) -> Tuple[List[str], list]:
+    """WHERE conditions and parameters for ``table`` (aliased "t") in ``schema``"""
+    conditions, params = [], []
+    if (filters.start or filters.end) and table not in ARCHIVED_TABLES:
+        raise ValueError(f"Date filters do not apply to {table}")
+    if table == "orders":
+        placed = "t.order_date"
+    elif table == "order_items":
+        placed = f"(SELECT o.order_date FROM {schema}.orders o WHERE o.order_id = t.order_id)"
+    if filters.start:
+        conditions.append(f"{placed} >= ?")
+        params.append(filters.start.strftime("%Y-%m-%d %H:%M:%S"))
+    if filters.end:
+        conditions.append(f"{placed} < ?")
+        params.append(filters.end.strftime("%Y-%m-%d %H:%M:%S"))
+
+    if table == "suppliers":
+        if filters.supplier_id is not None:
+            conditions.append("t.supplier_id = ?")
+            params.append(filters.supplier_id)
+        if filters.category is not None:
+            conditions.append("EXISTS (SELECT 1 FROM products p WHERE p.supplier_id = t.supplier_id AND p.category = ?)")
+            params.append(filters.category)
+        return conditions, params
+
+    # The other tables match on their products
+    matching = []
+    if filters.category is not None:
+        matching.append("p.category = ?")
+        params.append(filters.category)
+    if filters.supplier_id is not None:
+        matching.append("p.supplier_id = ?")
+        params.append(filters.supplier_id)
+    if not matching:
+        return conditions, params
+    matching = " AND ".join(matching)
+    if table == "products":
+        conditions.append(matching.replace("p.", "t."))
+    elif table == "orders":
+        conditions.append(f"EXISTS (SELECT 1 FROM {schema}.order_items i JOIN products p ON p.product_id = i.product_id "
+                          f"WHERE i.order_id = t.order_id AND {matching})")
+    else:
+        conditions.append(f"EXISTS (SELECT 1 FROM products p WHERE p.product_id = t.product_id AND {matching})")
+    return conditions, params
+
+
+def _page_query(conn: sqlite3.Connection, table: str, filters: ExportFilters) -> Tuple[str, Callable[[int], list]]:
+    """
+    SQL for one page of ``table`` and a function building its parameters
+    from the last key of the previous page
+    """
+    schemas = ["main"]
+    if table in ARCHIVED_TABLES:
+        cutoff = archived_before(conn)
+        if cutoff is not None and (filters.start is None or filters.start.strftime("%Y-%m-%d %H:%M:%S") < cutoff):
+            schemas.append(ARCHIVE_SCHEMA)
+
+    key = KEY_COLUMNS[table]
+    columns = ", ".join(f"t.{column}" for column in EXPORT_COLUMNS[table])
+    branches, branch_params = [], []
+    for schema in schemas:
+        conditions, params = _conditions(table, schema, filters)
+        conditions.append(f"t.{key} > ?")
+        branches.append(f"SELECT {columns} FROM {schema}.{table} t WHERE {' AND '.join(conditions)}")
+        branch_params.append(params)
+
+    def page_params(after):
+        return [value for params in branch_params for value in params + [after]]
+    return f"{' UNION ALL '.join(branches)} ORDER BY {key} LIMIT ?", page_params
+
+
+def _open_output(path: str, compress: bool):
+    if compress:
+        return gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_table(conn: sqlite3.Connection, table: str, path: str, filters: Optional[ExportFilters] = None,
+                 chunk_size: int = EXPORT_CHUNK_SIZE,
+                 progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Write the rows of ``table`` matching ``filters`` to ``path``, in the
+    format given by its extension. The file is written under a temporary
+    name and renamed when complete.
+
+    Args:
+        progress: called with the number of rows written after each page
+
+    Returns:
+        int: number of rows written
+    """
+    if table not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown export table '{table}'. Available: {', '.join(EXPORT_COLUMNS)}")
+    fmt = export_format(path)
+    filters = filters or ExportFilters()
+    sql, page_params = _page_query(conn, table, filters)
+    columns = EXPORT_COLUMNS[table]
+    key_position = columns.index(KEY_COLUMNS[table])
+    money_positions = [position for position, column in enumerate(columns) if column in MONEY_COLUMNS]
+
+    partial_path = path + ".partial"
+    rows_written = 0
+    try:
+        with _open_output(partial_path, path.endswith(".gz")) as output:
+            if fmt == "csv":
+                writer = csv.writer(output)
+                writer.writerow(columns)
+            after = 0
+            while True:
+                rows = conn.execute(sql, page_params(after) + [chunk_size]).fetchall()
+                if not rows:
+                    break
+                after = rows[-1][key_position]
+
+                if money_positions:
+                    rows = [list(row) for row in rows]
+                    for row in rows:
+                        for position in money_positions:
+                            if row[position] is not None:
+                                row[position] = str(Money(row[position]))
+                if fmt == "csv":
+                    writer.writerows(rows)
+                else:
+                    output.writelines(
+                        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows
+                    )
+                rows_written += len(rows)
+                if progress is not None:
+                    progress(rows_written)
+        os.replace(partial_path, path)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return rows_written
+
+
+def export_file(db_path: str, table: str, path: str, filters: Optional[ExportFilters] = None,
+                archive_path: Optional[str] = None,
+                progress: Optional[Callable[[int], None]] = None) -> int:
+    """Run an export on its own connection, so it is safe from a worker thread"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if archive_path and os.path.exists(archive_path):
+            OrderArchive(archive_path).attach(conn)
+        return export_table(conn, table, path, filters, progress=progress)
+    finally:
+        conn.close()
+
+
+def parse_day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export data to CSV or JSON Lines (add .gz to compress)")
+    parser.add_argument("table", choices=list(EXPORT_COLUMNS))
+    parser.add_argument("path", help="output file, e.g. orders.csv, orders.jsonl.gz")
+    parser.add_argument("--db", default="inventory.db")
+    parser.add_argument("--archive", help="archive database to include, if it exists "
+                                          "(default: <db name>_archive.db next to the database)")
+    parser.add_argument("--category")
+    parser.add_argument("--supplier", type=int, help="supplier ID")
+    parser.add_argument("--from", dest="start", type=parse_day, help="first day, YYYY-MM-DD (orders only)")
+    parser.add_argument("--to", dest="last", type=parse_day, help="last day, YYYY-MM-DD (orders only)")
+    args = parser.parse_args()
+
+    filters = ExportFilters(
+        start=args.start,
+        end=args.last + timedelta(days=1) if args.last else None,
+        category=args.category,
+        supplier_id=args.supplier,
+    )
+    started = time.perf_counter()
+    rows = export_file(args.db, args.table, args.path, filters, args.archive or default_archive_path(args.db))
+    print(f"Exported {rows:,} {args.table} rows to {args.path} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Tuple
+import cv2
+
+# Symbologies the scanner reads: our QR labels, manufacturer EAN/UPC
+# barcodes and Code 128 SKU labels
+SYMBOL_TYPES = ("QRCODE", "EAN13", "EAN8", "UPCA", "UPCE", "CODE128")
+
+
+@dataclass
+class DecodedSymbol:
+    data: str
+    rect: Tuple[int, int, int, int]  # (x, y, width, height) in frame pixels
+    symbol_type: str = "QRCODE"
+
+
+class QRDecoder(ABC):
+    """Base class for QR and barcode decoder backends used by the scanner"""
+
+    name = "base"
+
+    @abstractmethod
+    def decode(self, frame_rgb) -> List[DecodedSymbol]:
+        """
+        Decode every symbol visible in a frame.
+
+        Args:
+            frame_rgb: RGB frame as a NumPy array
+
+        Returns:
+            list: DecodedSymbol for each successfully decoded symbol
+        """
+
+
+class PyzbarDecoder(QRDecoder):
+    name = "pyzbar"
+
+    def __init__(self):
+        # pyzbar needs the native zbar library, so only load it when selected
+        from pyzbar.pyzbar import decode, ZBarSymbol
+        self._decode = decode
+        self._symbols = [getattr(ZBarSymbol, name) for name in SYMBOL_TYPES]
+
+    def decode(self, frame_rgb) -> List[DecodedSymbol]:
+        return [
+            DecodedSymbol(
+                data=obj.data.decode("utf-8"),
+                rect=tuple(obj.rect),
+                symbol_type=obj.type
+            )
+            for obj in self._decode(frame_rgb, symbols=self._symbols)
+        ]
+
+
+class OpenCVDecoder(QRDecoder):
+    """Single-symbol decoder built on cv2.QRCodeDetector"""
+
+    name = "opencv"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def decode(self, frame_rgb) -> List[DecodedSymbol]:
+        data, points, _ = self.detector.detectAndDecode(frame_rgb)
+        if not data or points is None:
+            return []
+        return [DecodedSymbol(data=data, rect=_bounding_rect(points))]
+
+
+class OpenCVMultiDecoder(QRDecoder):
+    """Decodes several QR codes per frame with cv2.QRCodeDetector"""
+
+    name = "opencv-multi"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def decode(self, frame_rgb) -> List[DecodedSymbol]:
+        found, decoded_info, points, _ = self.detector.detectAndDecodeMulti(frame_rgb)
+        if not found or points is None:
+            return []
+        return [
+            DecodedSymbol(data=data, rect=_bounding_rect(corners))
+            for data, corners in zip(decoded_info, points)
+            if data
+        ]
+
+
+def _bounding_rect(points):
+    x, y, width, height = cv2.boundingRect(points.reshape(-1, 2).astype("float32"))
+    return (x, y, width, height)
+
+
+DECODERS = {
+    PyzbarDecoder.name: PyzbarDecoder,
+    OpenCVDecoder.name: OpenCVDecoder,
+    OpenCVMultiDecoder.name: OpenCVMultiDecoder,
+}
+
+
+def create_decoder(name: str = PyzbarDecoder.name) -> QRDecoder:
+    """Create a decoder backend by name (see DECODERS)"""
+    try:
+        return DECODERS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown QR decoder '{name}'. Available: {', '.join(DECODERS)}"
+        ) from None
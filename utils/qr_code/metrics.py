@@ -0,0 +1,237 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Pipeline stages timed by the scanner, in processing order
+STAGES = ("capture", "convert", "decode", "lookup", "resize", "render")
+
+
+class LatencyHistogram:
+    """Rolling histogram of the most recent latency samples (milliseconds)"""
+
+    # Upper bounds of the histogram buckets; the last bucket is open-ended
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+    def __init__(self, window=300):
+        self.samples = deque(maxlen=window)
+
+    def record(self, latency_ms):
+        self.samples.append(latency_ms)
+
+    def bucket_counts(self):
+        counts = [0] * (len(self.BUCKETS_MS) + 1)
+        for sample in self.samples:
+            for index, bound in enumerate(self.BUCKETS_MS):
+                if sample <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def percentile(self, percent):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        count = len(self.samples)
+        labels = [f"<={bound}ms" for bound in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            "count": count,
+            "mean_ms": round(sum(self.samples) / count, 3) if count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "max_ms": round(max(self.samples), 3) if count else 0.0,
+            "buckets": dict(zip(labels, self.bucket_counts())),
+        }
+
+
+class ScannerMetrics:
+    """
+    Collects per-stage timings and frame counters for the QR scanner.
+
+    Stages are recorded from both the capture thread and the Tk main thread,
+    so every update is guarded by a lock. The multi-camera scanner keeps
+    one instance per lane, named by ``lane``.
+    """
+
+    def __init__(self, window=300, lane=None):
+        self.window = window
+        self.lane = lane
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {stage: LatencyHistogram(self.window) for stage in STAGES}
+            self.frame_times = deque(maxlen=self.window)
+            self.frames_captured = 0
+            self.frames_rendered = 0
+            self.failed_reads = 0
+            self.decode_attempts = 0
+            self.decode_hits = 0
+            self.started_at = time.perf_counter()
+
+    @contextmanager
+    def time_stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.histograms[stage].record(seconds * 1000)
+
+    def frame_captured(self, timestamp=None):
+        with self._lock:
+            self.frames_captured += 1
+            self.frame_times.append(timestamp if timestamp is not None else time.perf_counter())
+
+    def frame_rendered(self):
+        with self._lock:
+            self.frames_rendered += 1
+
+    def read_failed(self):
+        with self._lock:
+            self.failed_reads += 1
+
+    def decode_result(self, hit):
+        with self._lock:
+            self.decode_attempts += 1
+            if hit:
+                self.decode_hits += 1
+
+    def merge(self, batch):
+        """Fold in a batch recorded by a MetricsBatch in another process"""
+        with self._lock:
+            for stage, samples in batch["stages"].items():
+                for latency_ms in samples:
+                    self.histograms[stage].record(latency_ms)
+            self.frames_captured += len(batch["frames"])
+            self.frame_times.extend(batch["frames"])
+            self.failed_reads += batch["failed_reads"]
+            self.decode_attempts += batch["decode_attempts"]
+            self.decode_hits += batch["decode_hits"]
+
+    def fps(self):
+        with self._lock:
+            return self._fps()
+
+    def _fps(self):
+        if len(self.frame_times) < 2:
+            return 0.0
+        elapsed = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "lane": self.lane,
+                "uptime_s": round(time.perf_counter() - self.started_at, 1),
+                "fps": round(self._fps(), 2),
+                "frames_captured": self.frames_captured,
+                "frames_rendered": self.frames_rendered,
+                # Frames the capture thread produced that never reached the screen
+                "dropped_frames": max(0, self.frames_captured - self.frames_rendered),
+                "failed_reads": self.failed_reads,
+                "decode_hit_rate": round(self.decode_hits / self.decode_attempts, 4)
+                if self.decode_attempts else 0.0,
+                "stages": {stage: hist.summary() for stage, hist in self.histograms.items()},
+            }
+
+    def overlay_text(self):
+        """Short multi-line summary for the on-screen overlay"""
+        snapshot = self.snapshot()
+        lines = [
+            (f"{self.lane}: " if self.lane else "") +
+            f"FPS {snapshot['fps']:.1f}  dropped {snapshot['dropped_frames']}  "
+            f"hit rate {snapshot['decode_hit_rate'] * 100:.1f}%"
+        ]
+        for stage, summary in snapshot["stages"].items():
+            lines.append(f"{stage:<8} p50 {summary['p50_ms']:.1f}ms  p95 {summary['p95_ms']:.1f}ms")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Append the current snapshot to a JSON Lines metrics file"""
+        with open(path, "a", encoding="utf-8") as metrics_file:
+            metrics_file.write(json.dumps(self.snapshot()) + "\n")
+
+
+class MetricsBatch:
+    """
+    Recording side of ScannerMetrics for a scanner worker process.
+
+    Exposes the same recording methods as ScannerMetrics, but buffers the raw
+    samples and hands them to ``flush`` at most every ``interval`` seconds so
+    they can be sent to the GUI process and merged there.
+    """
+
+    def __init__(self, flush, interval=0.5):
+        self.flush = flush
+        self.interval = interval
+        # The capture and decode workers both record into the same batch
+        self._lock = threading.Lock()
+        self._last_flush = time.perf_counter()
+        self._clear()
+
+    def _clear(self):
+        self.stages = {stage: [] for stage in STAGES}
+        self.frames = []
+        self.failed_reads = 0
+        self.decode_attempts = 0
+        self.decode_hits = 0
+
+    @contextmanager
+    def time_stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.stages[stage].append(seconds * 1000)
+
+    def frame_captured(self):
+        with self._lock:
+            self.frames.append(time.perf_counter())
+        self._maybe_flush()
+
+    def read_failed(self):
+        with self._lock:
+            self.failed_reads += 1
+        self._maybe_flush()
+
+    def decode_result(self, hit):
+        with self._lock:
+            self.decode_attempts += 1
+            if hit:
+                self.decode_hits += 1
+
+    def _maybe_flush(self):
+        now = time.perf_counter()
+        if now - self._last_flush >= self.interval:
+            self._last_flush = now
+            self.flush(self.drain())
+
+    def drain(self):
+        with self._lock:
+            batch = {
+                "stages": self.stages,
+                "frames": self.frames,
+                "failed_reads": self.failed_reads,
+                "decode_attempts": self.decode_attempts,
+                "decode_hits": self.decode_hits,
+            }
+            self._clear()
+        return batch
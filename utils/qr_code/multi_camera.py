@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from utils.qr_code.metrics import ScannerMetrics
+from utils.qr_code.pipeline import DISPLAY_SIZE, ProcessScannerPipeline, ScannerPipeline
+
+# Single lane that keeps the original behaviour of using the first working camera
+DEFAULT_LANES = {"Camera": (0, 1)}
+
+
+@dataclass
+class ScanEvent:
+    lane: str
+    data: str
+    timestamp: float = field(default_factory=time.time)
+
+
+class ScanEventStream:
+    """
+    Merges payloads from every lane into one deduplicated stream.
+
+    A payload seen again within ``dedup_window`` seconds is dropped, whichever
+    lane it came from, so a label passing in front of two cameras is reported
+    once, tagged with the lane that saw it first.
+    """
+
+    def __init__(self, dedup_window=2.0):
+        self.dedup_window = dedup_window
+        self._last_seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def accept(self, event: ScanEvent) -> bool:
+        with self._lock:
+            last_seen = self._last_seen.get(event.data)
+            self._last_seen[event.data] = event.timestamp
+            if last_seen is not None and event.timestamp - last_seen < self.dedup_window:
+                return False
+
+            # Forget payloads that have fallen out of the window
+            if len(self._last_seen) > 1024:
+                cutoff = event.timestamp - self.dedup_window
+                self._last_seen = {
+                    data: seen for data, seen in self._last_seen.items() if seen >= cutoff
+                }
+            return True
+
+
+class MultiCameraScanner:
+    """
+    Runs one independent capture/decode pipeline per lane.
+
+    In process mode every lane gets its own child process, so CPU use scales
+    with the number of cameras instead of all lanes sharing one GIL. Each
+    lane records into its own ScannerMetrics, so one slow camera does not
+    hide behind the others' frame rates.
+    """
+
+    def __init__(self, lanes=None, decoder="pyzbar", use_process=False,
+                 dedup_window=2.0, display_size=DISPLAY_SIZE):
+        self.metrics: Dict[str, ScannerMetrics] = {}
+        self.stream = ScanEventStream(dedup_window)
+        self.logger = logging.getLogger(__name__)
+
+        pipeline_class = ProcessScannerPipeline if use_process else ScannerPipeline
+        self.pipelines = {}
+        for lane, cameras in (lanes or DEFAULT_LANES).items():
+            camera_indices = tuple(cameras) if isinstance(cameras, (list, tuple)) else (cameras,)
+            self.metrics[lane] = ScannerMetrics(lane=lane)
+            self.pipelines[lane] = pipeline_class(
+                self.metrics[lane],
+                decoder=decoder,
+                camera_indices=camera_indices,
+                display_size=display_size
+            )
+        self.start_errors: Dict[str, str] = {}
+
+    @property
+    def lanes(self) -> List[str]:
+        return list(self.pipelines)
+
+    def start(self):
+        """Start every lane; fails only if no lane could open its camera"""
+        self.start_errors = {}
+        for lane in self.pipelines:
+            self._start_lane(lane)
+
+        if len(self.start_errors) == len(self.pipelines):
+            raise Exception("; ".join(f"{lane}: {error}" for lane, error in self.start_errors.items()))
+
+    def _start_lane(self, lane):
+        try:
+            self.pipelines[lane].start()
+            self.start_errors.pop(lane, None)
+        except Exception as e:
+            self.logger.error(f"Failed to start lane {lane}: {str(e)}")
+            self.start_errors[lane] = str(e)
+
+    def stop(self):
+        for pipeline in self.pipelines.values():
+            pipeline.stop()
+
+    def restart(self, lane: Optional[str] = None):
+        lanes = [lane] if lane is not None else self.lanes
+        for name in lanes:
+            self.pipelines[name].stop()
+            self._start_lane(name)
+
+        if len(self.start_errors) == len(self.pipelines):
+            raise Exception("; ".join(f"{name}: {error}" for name, error in self.start_errors.items()))
+
+    def is_alive(self):
+        return any(pipeline.is_alive() for pipeline in self.pipelines.values())
+
+    def read_frame(self, lane, out, last_seq):
+        return self.pipelines[lane].read_frame(out, last_seq)
+
+    def poll_events(self) -> List[ScanEvent]:
+        events = []
+        for lane, pipeline in self.pipelines.items():
+            for data in pipeline.poll_payloads():
+                event = ScanEvent(lane=lane, data=data)
+                if self.stream.accept(event):
+                    events.append(event)
+        return events
+
+    def errors(self) -> Dict[str, str]:
+        errors = dict(self.start_errors)
+        for lane, pipeline in self.pipelines.items():
+            if pipeline.error:
+                errors[lane] = pipeline.error
+        return errors
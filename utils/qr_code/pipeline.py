@@ -0,0 +1,413 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+# Suppress OpenCV warnings (must be set before cv2 is imported)
+os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+
+import cv2
+import numpy as np
+from utils.qr_code.decoders import create_decoder
+from utils.qr_code.metrics import MetricsBatch
+
+DISPLAY_SIZE = (426, 240)  # Slightly larger display size (2/3 of 640x360)
+# Seconds a code must be out of view before it is reported again
+REPEAT_AFTER = 2.0
+
+
+class FrameStore:
+    """
+    Double-buffered display frames shared by a capture loop and the GUI.
+
+    The producer resizes into the back buffer, then swaps it to the front and
+    bumps the sequence number under the lock. Backed by plain memory for the
+    threaded pipeline and by shared memory for the process pipeline.
+    """
+
+    def __init__(self, display_size=DISPLAY_SIZE, buffer=None, state=None, lock=None):
+        width, height = display_size
+        self.display_size = display_size
+        self.buffer = buffer if buffer is not None else bytearray(2 * height * width * 3)
+        self.frames = np.frombuffer(self.buffer, dtype=np.uint8).reshape(2, height, width, 3)
+        self.state = state if state is not None else [0, 0]  # [sequence number, front index]
+        self.lock = lock if lock is not None else threading.Lock()
+
+    def back(self):
+        # Only the producer swaps buffers, so it can read the index unlocked
+        return self.frames[1 - self.state[1]]
+
+    def publish(self):
+        with self.lock:
+            self.state[1] = 1 - self.state[1]
+            self.state[0] += 1
+
+    def copy_latest(self, out, last_seq):
+        """Copy the front frame into ``out`` if it is newer than ``last_seq``"""
+        with self.lock:
+            seq = self.state[0]
+            if seq != last_seq:
+                np.copyto(out, self.frames[self.state[1]])
+        return seq
+
+
+class CaptureLoop:
+    """
+    Capture, colour conversion, decoding and display resizing for one camera.
+
+    Frames are captured and previewed on the calling thread while a separate
+    decode worker always takes the most recent frame, so a slow decoder drops
+    stale frames instead of stalling the preview.
+
+    A code is reported when it comes into view; one held in front of the
+    camera is not reported again until it has been out of view for
+    ``repeat_after`` seconds, so the same item can be scanned twice.
+    """
+
+    MAX_FAILED_FRAMES = 30
+
+    def __init__(self, camera_indices, decoder, frames, metrics, on_payload, repeat_after=REPEAT_AFTER):
+        self.camera_indices = camera_indices
+        self.decoder = decoder
+        self.frames = frames
+        self.metrics = metrics
+        self.on_payload = on_payload
+        self.repeat_after = repeat_after
+        self.cap = None
+        self._last_seen = {}  # Decoded data -> monotonic time it was last in view
+        self.logger = logging.getLogger(__name__)
+
+        # Hand-off slot between the capture and decode workers
+        self._decode_ready = threading.Condition()
+        self._pending_frame = None
+        self._stopped = False
+        self._boxes = []  # Bounding boxes from the most recent decode
+
+    def open_camera(self):
+        # Try different camera indices
+        for camera_index in self.camera_indices:
+            cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+            if cap.isOpened():
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # 16:9 resolution
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
+                cap.set(cv2.CAP_PROP_FPS, 30)
+                self.cap = cap
+                self.logger.info(f"Camera {camera_index} initialized successfully")
+                return
+            cap.release()
+
+        raise Exception("No working camera found")
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def run(self, should_stop):
+        failed_frames = 0
+        self._stopped = False
+        decode_thread = threading.Thread(target=self._decode_worker, daemon=True)
+        decode_thread.start()
+        try:
+            if self.cap is None:
+                self.open_camera()
+
+            while not should_stop():
+                try:
+                    if self.process_next_frame():
+                        failed_frames = 0
+                        continue
+                except Exception as e:
+                    self.logger.error(f"Camera update error: {str(e)}")
+
+                failed_frames += 1
+                if failed_frames >= self.MAX_FAILED_FRAMES:
+                    self.logger.warning("Too many failed frames, reopening camera")
+                    self.release()
+                    self.open_camera()
+                    failed_frames = 0
+        finally:
+            with self._decode_ready:
+                self._stopped = True
+                self._decode_ready.notify()
+            decode_thread.join(timeout=1)
+            self.release()
+
+    def process_next_frame(self):
+        with self.metrics.time_stage("capture"):
+            ret, frame = self.cap.read()
+        if not ret:
+            self.metrics.read_failed()
+            return False
+
+        self.metrics.frame_captured()
+        with self.metrics.time_stage("convert"):
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        # Replace any frame the decode worker has not picked up yet
+        with self._decode_ready:
+            self._pending_frame = frame_rgb
+            self._decode_ready.notify()
+
+        with self.metrics.time_stage("resize"):
+            preview = self.frames.back()
+            cv2.resize(
+                frame_rgb,
+                self.frames.display_size,
+                dst=preview,
+                interpolation=cv2.INTER_AREA
+            )
+
+            # Highlight the QR codes found by the latest decode
+            scale_x = preview.shape[1] / frame_rgb.shape[1]
+            scale_y = preview.shape[0] / frame_rgb.shape[0]
+            for (x, y, w, h) in self._boxes:
+                cv2.rectangle(
+                    preview,
+                    (int(x * scale_x), int(y * scale_y)),
+                    (int((x + w) * scale_x), int((y + h) * scale_y)),
+                    (0, 255, 0),
+                    2
+                )
+        self.frames.publish()
+        return True
+
+    def _decode_worker(self):
+        while True:
+            with self._decode_ready:
+                self._decode_ready.wait_for(
+                    lambda: self._pending_frame is not None or self._stopped
+                )
+                if self._stopped:
+                    return
+                frame_rgb, self._pending_frame = self._pending_frame, None
+
+            try:
+                with self.metrics.time_stage("decode"):
+                    decoded_objects = self.decoder.decode(frame_rgb)
+            except Exception as e:
+                self.logger.error(f"Decode error: {str(e)}")
+                continue
+
+            self.metrics.decode_result(bool(decoded_objects))
+            self._boxes = [obj.rect for obj in decoded_objects]
+            now = time.monotonic()
+            for obj in decoded_objects:
+                last_seen = self._last_seen.get(obj.data)
+                self._last_seen[obj.data] = now
+                if last_seen is None or now - last_seen >= self.repeat_after:
+                    self.on_payload(obj.data)
+
+            # Forget codes that have been out of view long enough to count as new
+            if len(self._last_seen) > 64:
+                self._last_seen = {
+                    data: seen for data, seen in self._last_seen.items()
+                    if now - seen < self.repeat_after
+                }
+
+
+class ScannerPipeline:
+    """Runs the capture loop on a daemon thread inside the GUI process"""
+
+    def __init__(self, metrics, decoder="pyzbar", camera_indices=(0, 1), display_size=DISPLAY_SIZE):
+        self.metrics = metrics
+        self.decoder_name = decoder
+        self.camera_indices = camera_indices
+        self.frames = FrameStore(display_size)
+        self.error = None
+        self.decoder = create_decoder(decoder)
+        self._payloads = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.error = None
+        self._stop_event = threading.Event()
+        loop = CaptureLoop(
+            self.camera_indices, self.decoder, self.frames, self.metrics, self._payloads.put
+        )
+        # Open the camera up front so failures reach the caller
+        loop.open_camera()
+        self._thread = threading.Thread(target=self._run, args=(loop,), daemon=True)
+        self._thread.start()
+
+    def _run(self, loop):
+        try:
+            loop.run(self._stop_event.is_set)
+        except Exception as e:
+            self.error = str(e)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def read_frame(self, out, last_seq):
+        return self.frames.copy_latest(out, last_seq)
+
+    def poll_payloads(self):
+        payloads = []
+        while True:
+            try:
+                payloads.append(self._payloads.get_nowait())
+            except queue.Empty:
+                return payloads
+
+
+class ProcessScannerPipeline(ScannerPipeline):
+    """
+    Runs the capture loop in a child process so capture and decoding do not
+    compete with Tk for the GIL.
+
+    Preview frames travel through a shared-memory FrameStore; decoded payloads,
+    metrics batches and errors come back over a small multiprocessing queue.
+    """
+
+    START_TIMEOUT = 10
+    STOP_TIMEOUT = 2
+    QUEUE_SIZE = 256
+
+    def __init__(self, metrics, decoder="pyzbar", camera_indices=(0, 1), display_size=DISPLAY_SIZE):
+        self.metrics = metrics
+        self.decoder_name = decoder
+        self.camera_indices = camera_indices
+        self.display_size = display_size
+        self.error = None
+        # Spawn rather than fork: forking a process that runs Tk and threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        width, height = display_size
+        self.frames = FrameStore(
+            display_size,
+            buffer=self._context.RawArray('B', 2 * height * width * 3),
+            state=self._context.RawArray('q', 2),
+            lock=self._context.Lock()
+        )
+        self._events = None
+        self._stop_event = None
+        self._process = None
+        self._pending_payloads = []
+
+    def start(self):
+        self.error = None
+        self._pending_payloads = []
+        self._events = self._context.Queue(maxsize=self.QUEUE_SIZE)
+        self._stop_event = self._context.Event()
+        self._process = self._context.Process(
+            target=run_scanner_process,
+            args=(
+                self.decoder_name, self.camera_indices, self.display_size,
+                self.frames.buffer, self.frames.state, self.frames.lock,
+                self._events, self._stop_event
+            ),
+            daemon=True
+        )
+        self._process.start()
+
+        # Wait for the child to report whether it could open a camera
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                kind, value = self._events.get(timeout=0.1)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    break
+                continue
+            if kind == "ready":
+                return
+            if kind == "error":
+                self.stop()
+                raise Exception(value)
+            self._handle_event(kind, value)
+
+        self.stop()
+        raise Exception("Scanner process failed to start")
+
+    def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout=self.STOP_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        if self._events is not None:
+            self._events.cancel_join_thread()
+            self._events.close()
+            self._events = None
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def poll_payloads(self):
+        if self._events is not None:
+            while True:
+                try:
+                    kind, value = self._events.get_nowait()
+                except (queue.Empty, OSError, ValueError):
+                    break
+                self._handle_event(kind, value)
+
+        payloads, self._pending_payloads = self._pending_payloads, []
+        return payloads
+
+    def _handle_event(self, kind, value):
+        if kind == "payload":
+            self._pending_payloads.append(value)
+        elif kind == "metrics":
+            self.metrics.merge(value)
+        elif kind == "error":
+            self.error = value
+
+
+# How long a decoded payload may wait for room in a full event queue
+PAYLOAD_PUT_TIMEOUT = 0.5
+
+
+def _put_event(events, kind, value):
+    if kind == "metrics":
+        try:
+            events.put_nowait((kind, value))
+        except queue.Full:
+            pass  # The GUI is behind; a lost batch only costs some statistics
+        return
+    # A payload is a scan the user expects to see, so wait briefly before giving up on it
+    try:
+        events.put((kind, value), timeout=PAYLOAD_PUT_TIMEOUT)
+    except queue.Full:
+        logging.getLogger(__name__).warning(f"Event queue full, dropped scanner {kind}: {value!r}")
+
+
+def run_scanner_process(decoder_name, camera_indices, display_size,
+                        buffer, state, lock, events, stop_event):
+    """Entry point of the scanner child process"""
+    frames = FrameStore(display_size, buffer=buffer, state=state, lock=lock)
+    metrics = MetricsBatch(flush=lambda batch: _put_event(events, "metrics", batch))
+    try:
+        loop = CaptureLoop(
+            camera_indices,
+            create_decoder(decoder_name),
+            frames,
+            metrics,
+            lambda data: _put_event(events, "payload", data)
+        )
+        loop.open_camera()
+    except Exception as e:
+        events.put(("error", str(e)))
+        return
+
+    events.put(("ready", None))
+    try:
+        loop.run(stop_event.is_set)
+    except Exception as e:
+        events.put(("error", str(e)))
@@ -1,37 +1,54 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
-from pyzbar.pyzbar import decode, ZBarSymbol
+import numpy as np
 import json
 from PIL import Image, ImageTk
 from gui.base_window import BaseWindow, ScrollableFrame
-import threading
 import logging
-import os
-
-# Suppress OpenCV warnings
-os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
+from database.events import EXTERNAL, change_bus
+from database.queries import ProductQueries
+from utils.qr_code.multi_camera import MultiCameraScanner
+from utils.qr_code.pipeline import DISPLAY_SIZE
 
 class QRScannerDialog(tk.Toplevel, BaseWindow):
-    def __init__(self, parent):
+    METRICS_EXPORT_INTERVAL_MS = 10000
+
+    def __init__(self, parent, db=None, lanes=None, decoder="pyzbar", use_process=False,
+                 show_metrics=False, metrics_path="scanner_metrics.jsonl"):
         super().__init__(parent)
         self.parent = parent
+        self.db = db  # Optional connection for looking up current product details
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         # Setup logging
         self.setup_logging()
 
         # Initialize variables
-        self.cap = None
         self.is_running = False
-        self.failed_frames = 0
-        self.last_detected_data = None  # To store the last detected QR data
-        self.current_frame = None
+        self.lane_views = {}  # Preview widgets and buffers per lane
+        self.shown_scan = None  # (payload, lane) of the product on display
+
+        # Pipeline instrumentation, kept per lane by the scanner
+        self.metrics_path = metrics_path
+        self.show_metrics = tk.BooleanVar(value=show_metrics)
+
+        # One capture/decode pipeline per lane, on worker threads or in child processes
+        self.scanner = MultiCameraScanner(
+            lanes=lanes,
+            decoder=decoder,
+            use_process=use_process
+        )
 
         self.setup_window()
         self.create_widgets()
+        self.unsubscribe_changes = change_bus.subscribe(self.on_product_changed, entities=("product",))
         self.start_scanning()
 
+        if self.is_running:
+            self.update_gui()
+            self.update_metrics()
+            self.after(self.METRICS_EXPORT_INTERVAL_MS, self.export_metrics, True)
+
     def setup_logging(self):
         logging.basicConfig(
             level=logging.INFO,
@@ -61,7 +78,7 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
 
         ttk.Label(
             self.main_frame.scrollable_frame,
-            text="Hold a QR code up to the camera to scan",
+            text="Hold a QR code or product barcode up to the camera to scan",
             font=('Helvetica', 12)
         ).pack(pady=(0, 10))
 
@@ -69,9 +86,33 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
         self.video_frame = ttk.Frame(self.main_frame.scrollable_frame)
         self.video_frame.pack(pady=10)
 
-        # Label for video feed
-        self.video_label = ttk.Label(self.video_frame)
-        self.video_label.pack()
+        # Label for each lane's video feed, two lanes per row
+        width, height = DISPLAY_SIZE
+        show_lane_names = len(self.scanner.lanes) > 1
+        for index, lane in enumerate(self.scanner.lanes):
+            lane_frame = ttk.Frame(self.video_frame)
+            lane_frame.grid(row=index // 2, column=index % 2, padx=5, pady=5)
+            if show_lane_names:
+                ttk.Label(lane_frame, text=lane, font=('Helvetica', 10, 'bold')).pack()
+
+            photo = ImageTk.PhotoImage('RGB', DISPLAY_SIZE)
+            ttk.Label(lane_frame, image=photo).pack()
+            self.lane_views[lane] = {
+                'photo': photo,
+                'frame': np.zeros((height, width, 3), dtype=np.uint8),
+                'rendered_seq': 0
+            }
+
+        # Performance overlay drawn on top of the video feed
+        self.metrics_overlay = tk.Label(
+            self.video_frame,
+            justify='left',
+            anchor='nw',
+            font=('Courier', 9),
+            fg="#00ff00",
+            bg="#000000"
+        )
+        self.toggle_metrics_overlay()
 
         # Status label
         self.status_label = ttk.Label(
@@ -101,6 +142,21 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
         )
         self.restart_button.pack(side='left', padx=5, expand=True)
 
+        # Performance overlay toggle
+        ttk.Checkbutton(
+            buttons_frame,
+            text="Show Performance",
+            variable=self.show_metrics,
+            command=self.toggle_metrics_overlay
+        ).pack(side='left', padx=5, expand=True)
+
+        # Export metrics button
+        ttk.Button(
+            buttons_frame,
+            text="Export Metrics",
+            command=self.export_metrics
+        ).pack(side='left', padx=5, expand=True)
+
         # Close button
         ttk.Button(
             buttons_frame,
@@ -110,26 +166,11 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
 
     def start_scanning(self):
         try:
-            # Try different camera indices
-            for camera_index in range(2):
-                self.cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-                if self.cap.isOpened():
-                    self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # 16:9 resolution
-                    self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
-                    self.cap.set(cv2.CAP_PROP_FPS, 30)
-                    break
-
-            if not self.cap.isOpened():
-                raise Exception("No working camera found")
-
+            self.scanner.start()
             self.is_running = True
-            self.failed_frames = 0
-            self.logger.info("Camera initialized successfully")
+            self.logger.info(f"Scanner started on lanes: {', '.join(self.scanner.lanes)}")
 
-            threading.Thread(target=self.update_camera, daemon=True).start()
-            self.update_gui()
-
-            self.status_label.configure(text="🔍 Scanning for QR codes...")
+            self.status_label.configure(text=self.scanning_status())
 
         except Exception as e:
             self.logger.error(f"Failed to start scanner: {str(e)}")
@@ -137,59 +178,98 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
             self.destroy()
 
     def restart_camera(self):
-        if self.cap is not None:
-            self.cap.release()
-        self.start_scanning()
         self.status_label.configure(text="🔄 Restarting camera...")
-
-    def update_camera(self):
-        while self.is_running:
-            if self.cap is None or not self.cap.isOpened():
-                continue
-
-            try:
-                ret, frame = self.cap.read()
-                if ret:
-                    self.failed_frames = 0
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    # Highlight detected QR codes
-                    decoded_objects = decode(frame_rgb, symbols=[ZBarSymbol.QRCODE])
-                    for obj in decoded_objects:
-                        (x, y, w, h) = obj.rect
-                        cv2.rectangle(frame_rgb, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-                        # Decode QR code data
-                        qr_data = obj.data.decode("utf-8")
-                        if qr_data != self.last_detected_data:
-                            self.last_detected_data = qr_data
-                            try:
-                                product_data = json.loads(qr_data)
-                                self.after(0, lambda: self.show_results(product_data))
-                            except json.JSONDecodeError:
-                                self.logger.error(f"Invalid QR code data: {qr_data}")
-
-                    self.current_frame = frame_rgb
-                else:
-                    self.failed_frames += 1
-                    if self.failed_frames >= 30:
-                        self.restart_camera()
-                        break
-
-            except Exception as e:
-                self.logger.error(f"Camera update error: {str(e)}")
-                self.failed_frames += 1
-                if self.failed_frames >= 30:
-                    self.restart_camera()
-                    break
-
-    def show_results(self, data):
+        self.update_idletasks()
+        try:
+            self.scanner.restart()
+            self.status_label.configure(text=self.scanning_status())
+        except Exception as e:
+            self.logger.error(f"Failed to restart scanner: {str(e)}")
+            self.status_label.configure(text=f"❌ Camera error: {str(e)}")
+
+    def scanning_status(self):
+        errors = self.scanner.errors()
+        if errors:
+            return "⚠️ " + "; ".join(f"{lane}: {error}" for lane, error in errors.items())
+        return "🔍 Scanning for QR codes and barcodes..."
+
+    def handle_event(self, event):
+        with self.scanner.metrics[event.lane].time_stage("lookup"):
+            payload = self.parse_payload(event.data)
+            product_data = self.lookup_product(payload)
+        if product_data is None:
+            self.logger.info(f"No product for code {payload['code']} from {event.lane}")
+            self.status_label.configure(text=f"❓ No product with code {payload['code']}")
+            return
+        self.shown_scan = (payload, event.lane)
+        self.show_results(product_data, event.lane)
+
+    @staticmethod
+    def parse_payload(data):
+        """
+        Our QR labels carry a JSON object with the product details; anything
+        else (an EAN/UPC barcode or a SKU label) is a code to look up.
+        """
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError:
+            payload = None
+        # Numeric barcodes are valid JSON too
+        if isinstance(payload, dict):
+            return payload
+        return {'code': data.strip()}
+
+    def on_product_changed(self, event):
+        """Redraw the displayed product if it was just edited"""
+        if self.shown_scan is None:
+            return
+        payload, lane = self.shown_scan
+        if event.action == EXTERNAL or event.entity_id == payload.get('product_id'):
+            product_data = self.lookup_product(payload)
+            if product_data is not None:
+                self.show_results(product_data, lane)
+
+    def lookup_product(self, data):
+        """
+        Prefer current details from the (cached) database over the QR payload.
+        Barcode and SKU scans carry only the code, so they resolve to None
+        without a database or a matching product; a match records its
+        product_id in ``data`` so later edits are tracked.
+        """
+        fallback = None if 'code' in data else data
+        if self.db is None:
+            return fallback
+        try:
+            if data.get('product_id') is not None:
+                product = ProductQueries.get_product_by_id(self.db, data['product_id'])
+            elif 'code' in data:
+                product = ProductQueries.get_by_code(self.db, data['code'])
+            else:
+                return data
+        except Exception as e:
+            self.logger.error(f"Product lookup failed: {str(e)}")
+            return fallback
+        if product is None:
+            return fallback
+        data['product_id'] = product.product_id
+        return {
+            'product_id': product.product_id,
+            'name': product.name,
+            'category': product.category,
+            'price': str(product.price),
+            'stock_quantity': product.stock_quantity,
+            'description': product.description,
+            'sku': product.sku,
+            'barcode': product.barcode
+        }
+
+    def show_results(self, data, lane=None):
         try:
             for widget in self.results_frame.winfo_children():
                 widget.destroy()
 
             self.results_frame.pack(fill='x', padx=10, pady=10)
-            self.status_label.configure(text="✅ QR Code detected!")
+            self.status_label.configure(text="✅ Product found!")
 
             ttk.Label(
                 self.results_frame,
@@ -204,6 +284,18 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
                 ("Price", f"${data.get('price', '0.00')}")
             ]
 
+            if 'stock_quantity' in data:
+                details.append(("In Stock", data['stock_quantity']))
+
+            if data.get('sku'):
+                details.append(("SKU", data['sku']))
+
+            if data.get('barcode'):
+                details.append(("Barcode", data['barcode']))
+
+            if lane is not None and len(self.scanner.lanes) > 1:
+                details.insert(0, ("Lane", lane))
+
             if data.get('description'):
                 details.append(("Description", data['description']))
 
@@ -222,22 +314,72 @@ class QRScannerDialog(tk.Toplevel, BaseWindow):
             return
 
         try:
-            if self.current_frame is not None:
-                image = Image.fromarray(self.current_frame)
-                image = image.resize((426, 240))  # Slightly larger display size (2/3 of 640x360)
-                photo = ImageTk.PhotoImage(image=image)
-
-                self.video_label.configure(image=photo)
-                self.video_label.image = photo
+            # Only redraw lanes whose pipeline has published a new frame
+            for lane, view in self.lane_views.items():
+                seq = self.scanner.read_frame(lane, view['frame'], view['rendered_seq'])
+                if seq != view['rendered_seq']:
+                    metrics = self.scanner.metrics[lane]
+                    with metrics.time_stage("render"):
+                        view['photo'].paste(Image.fromarray(view['frame']))
+                    view['rendered_seq'] = seq
+                    metrics.frame_rendered()
+
+            for event in self.scanner.poll_events():
+                self.handle_event(event)
+
+            if any(pipeline.error for pipeline in self.scanner.pipelines.values()):
+                self.status_label.configure(text=self.scanning_status())
         except Exception as e:
             self.logger.error(f"GUI update error: {str(e)}")
 
         finally:
             self.after(67, self.update_gui)  # ~15 FPS
 
+    def toggle_metrics_overlay(self):
+        if self.show_metrics.get():
+            self.metrics_overlay.place(x=0, y=0)
+            self.metrics_overlay.lift()
+        else:
+            self.metrics_overlay.place_forget()
+
+    def update_metrics(self):
+        if not self.is_running:
+            return
+
+        if self.show_metrics.get():
+            self.metrics_overlay.configure(
+                text="\n\n".join(metrics.overlay_text() for metrics in self.scanner.metrics.values())
+            )
+        self.after(500, self.update_metrics)
+
+    def export_metrics(self, periodic=False):
+        if periodic and not self.is_running:
+            return
+
+        if self.write_metrics() and not periodic:
+            self.status_label.configure(text=f"📊 Metrics exported to {self.metrics_path}")
+
+        if periodic:
+            self.after(self.METRICS_EXPORT_INTERVAL_MS, self.export_metrics, True)
+
+    def write_metrics(self):
+        try:
+            for metrics in self.scanner.metrics.values():
+                metrics.export(self.metrics_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to export scanner metrics: {str(e)}")
+            return False
+
     def on_closing(self):
         self.logger.info("Shutting down scanner")
         self.is_running = False
-        if self.cap is not None:
-            self.cap.release()
+        self.write_metrics()
         self.destroy()
+
+    def destroy(self):
+        # Never leave a capture thread or scanner process behind the window
+        self.is_running = False
+        self.unsubscribe_changes()
+        self.scanner.stop()
+        super().destroy()
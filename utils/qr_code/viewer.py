@@ -2,15 +2,20 @@ import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
+from database.events import DELETE, EXTERNAL, change_bus
+from database.queries import ProductQueries
 from gui.base_window import BaseWindow
 
 class QRCodeViewer(tk.Toplevel, BaseWindow):
-    def __init__(self, parent, product):
+    def __init__(self, parent, product, db=None):
         super().__init__(parent)
         self.parent = parent
         self.product = product
+        self.db = db  # Optional connection for refreshing edited details
+        self.detail_labels = {}
         self.setup_window()
         self.create_widgets()
+        self.unsubscribe_changes = change_bus.subscribe(self.on_product_changed, entities=("product",))
 
     def setup_window(self):
         self.setup_window_base(f"QR Code - {self.product.name}", 400, 500)
@@ -61,10 +66,10 @@ class QRCodeViewer(tk.Toplevel, BaseWindow):
             details_frame.pack(fill='x', padx=10, pady=10)
 
             # Add product details
-            ttk.Label(details_frame, text=f"ID: {self.product.product_id}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(details_frame, text=f"Name: {self.product.name}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(details_frame, text=f"Category: {self.product.category}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(details_frame, text=f"Price: ${self.product.price}").pack(anchor='w', padx=5, pady=2)
+            for field in ("ID", "Name", "Category", "Price"):
+                self.detail_labels[field] = ttk.Label(details_frame)
+                self.detail_labels[field].pack(anchor='w', padx=5, pady=2)
+            self.show_details()
 
             # Save location
             path_label = ttk.Label(
@@ -77,3 +82,32 @@ class QRCodeViewer(tk.Toplevel, BaseWindow):
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load QR code: {str(e)}")
+
+    def show_details(self):
+        if not self.detail_labels:
+            return
+        self.detail_labels["ID"].configure(text=f"ID: {self.product.product_id}")
+        self.detail_labels["Name"].configure(text=f"Name: {self.product.name}")
+        self.detail_labels["Category"].configure(text=f"Category: {self.product.category}")
+        self.detail_labels["Price"].configure(text=f"Price: ${self.product.price}")
+
+    def on_product_changed(self, event):
+        if event.action != EXTERNAL and event.entity_id != self.product.product_id:
+            return
+        if event.action == DELETE:
+            self.destroy()
+            return
+        if self.db is None:
+            return
+
+        product = ProductQueries.get_product_by_id(self.db, self.product.product_id)
+        if product is None:
+            self.destroy()
+            return
+        self.product = product
+        self.title(f"QR Code - {self.product.name}")
+        self.show_details()
+
+    def destroy(self):
+        self.unsubscribe_changes()
+        super().destroy()